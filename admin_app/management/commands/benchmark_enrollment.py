@@ -0,0 +1,561 @@
+"""
+Management command to load-test the full enrollment wizard
+Usage:
+    python manage.py benchmark_enrollment --enrollments 50 --concurrency 4
+    python manage.py benchmark_enrollment --ocr-async --output bench.json
+    python manage.py benchmark_enrollment --output new.json --compare bench.json
+
+Each simulated applicant posts the real views in order with the Django test
+client (student_data_form -> family_data_form -> non_academic_form ->
+academic_form -> verify_grades_ajax -> confirm_program_selection_ajax).
+
+- LIS stand-in: the synthetic LRNs are put in the LRN lookup cache, so
+  student_data_form verifies them without the LIS database.
+- Fake OCR: with --ocr-async, report cards are queued and read by an
+  in-process OCR worker pool using the 'fixture' backend.
+
+Benchmark students, uploads and OCR cache entries are created in the
+configured database and directories and deleted afterwards (unless
+--keep-data). Run it against a development database.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from enrollment_app.models import (
+    Student, Parent, Guardian, FamilyData, EnrollmentDraft, OCRJob
+)
+from enrollment_app.services.enrollment_persistence import QueryCounter
+from enrollment_app.services.lrn_verification import lrn_lookup_cache
+from enrollment_app.services.ocr_cache import get_ocr_result_cache
+from enrollment_app.services.ocr_queue import OCRWorkerPool
+from enrollment_app.services.upload_store import get_temp_upload_store
+
+
+STEPS = [
+    'student_data_form',
+    'family_data_form',
+    'non_academic_form',
+    'academic_form',
+    'ocr_job_status_ajax',
+    'verify_grades_ajax',
+    'confirm_program_selection_ajax',
+]
+
+SUBJECTS = [
+    'mathematics', 'araling_panlipunan', 'english', 'edukasyon_sa_pagpapakatao',
+    'science', 'edukasyon_pangkabuhayan', 'filipino', 'mapeh',
+]
+
+# How the fake OCR "reads" each subject on the report card
+OCR_LABELS = {
+    'mathematics': 'Mathematics',
+    'araling_panlipunan': 'Araling Panlipunan',
+    'english': 'English',
+    'edukasyon_sa_pagpapakatao': 'Edukasyon sa Pagpapakatao',
+    'science': 'Science',
+    'edukasyon_pangkabuhayan': 'EPP',
+    'filipino': 'Filipino',
+    'mapeh': 'MAPEH',
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies_ms, queries):
+    return {
+        'count': len(latencies_ms),
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 2) if latencies_ms else 0.0,
+        'p50_ms': round(percentile(latencies_ms, 50), 2),
+        'p90_ms': round(percentile(latencies_ms, 90), 2),
+        'p95_ms': round(percentile(latencies_ms, 95), 2),
+        'p99_ms': round(percentile(latencies_ms, 99), 2),
+        'max_ms': round(max(latencies_ms), 2) if latencies_ms else 0.0,
+        'queries_mean': round(sum(queries) / len(queries), 1) if queries else 0.0,
+        'queries_max': max(queries) if queries else 0,
+    }
+
+
+class Applicant:
+    """Synthetic form data for one benchmark enrollment"""
+
+    def __init__(self, lrn, seed):
+        rng = random.Random(seed)
+        self.lrn = lrn
+        self.family_name = f"Bench{lrn}"
+        self.grades = {subject: rng.randint(80, 99) for subject in SUBJECTS}
+        self.report_card = self._report_card_image(lrn)
+
+    @staticmethod
+    def _report_card_image(lrn):
+        """Small JPEG that differs per applicant (so uploads are not deduplicated)"""
+        from PIL import Image, ImageDraw
+
+        image = Image.new('L', (800, 600), 255)
+        draw = ImageDraw.Draw(image)
+        draw.text((40, 40), f"REPORT CARD {lrn}", fill=0)
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=70)
+        return buffer.getvalue()
+
+    def lis_record(self):
+        return {
+            'lrn': self.lrn,
+            'first_name': 'Juan',
+            'last_name': self.family_name,
+            'birth_date': '2013-06-15',
+            'last_school': 'Benchmark Elementary School',
+        }
+
+    def ocr_text(self):
+        lines = ['REPORT ON LEARNING PROGRESS AND ACHIEVEMENT', 'Learning Areas Final Rating Remarks']
+        for subject, grade in self.grades.items():
+            lines.append(f"{OCR_LABELS[subject]} {grade} Passed")
+        return '\n'.join(lines)
+
+    def student_form(self):
+        return {
+            'lrn': self.lrn,
+            'email': f"{self.lrn}@example.com",
+            'enrolling_as': ['new'],
+            'is_sped': 'no',
+            'is_working_student': 'no',
+            'last_name': self.family_name,
+            'first_name': 'Juan',
+            'middle_name': 'Santos',
+            'gender': 'male',
+            'date_of_birth': '2013-06-15',
+            'place_of_birth': 'Zamboanga City',
+            'religion': 'Catholic',
+            'dialect_spoken': 'Chavacano',
+            'ethnic_tribe': '',
+            'address': 'Barangay Tetuan, Zamboanga City',
+            'last_school_attended': 'Benchmark Elementary School',
+            'previous_grade_section': 'Grade 6 - A',
+            'last_school_year': '2024-2025',
+        }
+
+    def family_form(self):
+        data = {'guardian_type': 'mother'}
+        for prefix, first_name, dob in [('father', 'Pedro', '1980-01-01'), ('mother', 'Maria', '1982-02-02')]:
+            data.update({
+                f'{prefix}_family_name': self.family_name,
+                f'{prefix}_first_name': first_name,
+                f'{prefix}_middle_name': 'Reyes',
+                f'{prefix}_dob': dob,
+                f'{prefix}_occupation': 'Vendor',
+                f'{prefix}_address': 'Barangay Tetuan, Zamboanga City',
+                f'{prefix}_contact_number': '09170000000',
+                f'{prefix}_email': f"{prefix}.{self.lrn}@example.com",
+            })
+        return data
+
+    def survey_form(self):
+        return {
+            'learning_style': 'visual',
+            'study_hours': '1-2 hours',
+            'study_environment': 'quiet',
+            'schoolwork_support': 'parents',
+            'enjoyed_subjects': ['Math', 'Science'],
+            'interested_program': 'STE',
+            'program_motivation': 'Interested in science',
+            'enjoyed_activities': ['Reading'],
+            'assignments_on_time': 'always',
+            'handle_difficult_lessons': 'ask teacher',
+            'device_availability': 'yes',
+            'internet_access': 'yes',
+            'absences': '0-2',
+            'absence_reason': 'none',
+            'participation': 'active',
+            'extra_support': 'no',
+            'quiet_place': 'yes',
+            'distance_from_school': 'near',
+            'travel_difficulty': 'no',
+        }
+
+    def academic_form(self):
+        data = {subject: str(grade) for subject, grade in self.grades.items()}
+        data['dost_exam_result'] = 'not_taken'
+        return data
+
+
+class Command(BaseCommand):
+    help = 'Drives the enrollment wizard views end to end and reports latency percentiles, query counts and throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--enrollments',
+            type=int,
+            default=20,
+            help='Number of complete enrollments to run (default: 20)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Applicants submitting at the same time (default: 1)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=1,
+            help='Enrollments run first and left out of the results (default: 1)',
+        )
+        parser.add_argument(
+            '--ocr-async',
+            action='store_true',
+            help='Queue report card OCR and process it with an in-process fixture OCR worker pool',
+        )
+        parser.add_argument(
+            '--lrn-prefix',
+            type=str,
+            default='99',
+            help='Prefix of the synthetic LRNs (default: 99)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1,
+            help='Random seed for the synthetic grades',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the results as JSON to this file',
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            metavar='PATH',
+            help='Print the change against an earlier --output file',
+        )
+        parser.add_argument(
+            '--keep-data',
+            action='store_true',
+            help='Do not delete the benchmark students afterwards',
+        )
+        parser.add_argument(
+            '--show-view-output',
+            action='store_true',
+            help="Do not silence the views' debug prints",
+        )
+
+    def handle(self, *args, **options):
+        total = options['warmup'] + options['enrollments']
+        prefix = options['lrn_prefix']
+        if not prefix.isdigit() or len(prefix) > 6:
+            raise CommandError('--lrn-prefix must be 1-6 digits')
+
+        lrns = [f"{prefix}{i:0{12 - len(prefix)}d}" for i in range(total)]
+        if Student.objects.filter(lrn__in=lrns).exists():
+            raise CommandError(
+                f'Students with LRNs {lrns[0]}..{lrns[-1]} already exist. Use another --lrn-prefix.'
+            )
+
+        applicants = [Applicant(lrn, options['seed'] * 100003 + i) for i, lrn in enumerate(lrns)]
+
+        # LIS stand-in: every synthetic LRN resolves from the lookup cache
+        for applicant in applicants:
+            lrn_lookup_cache.set(applicant.lrn, applicant.lis_record())
+
+        overrides = {
+            'ALLOWED_HOSTS': list(settings.ALLOWED_HOSTS) + ['testserver'],
+            'OCR_ASYNC_ENABLED': options['ocr_async'],
+            'OCR_BACKEND': 'fixture',
+        }
+
+        self.stdout.write('=' * 80)
+        self.stdout.write(
+            f"Enrollment benchmark: {options['enrollments']} enrollment(s), "
+            f"concurrency {options['concurrency']}, OCR {'async (fixture)' if options['ocr_async'] else 'off'}"
+        )
+        self.stdout.write('=' * 80)
+
+        pool = None
+        silence = contextlib.nullcontext() if options['show_view_output'] else contextlib.redirect_stdout(io.StringIO())
+        try:
+            with override_settings(**overrides), silence:
+                if options['ocr_async']:
+                    pool = OCRWorkerPool(backend='fixture', poll_interval=0.05)
+                    threading.Thread(target=pool.run, daemon=True).start()
+
+                warmup = applicants[:options['warmup']]
+                measured = applicants[options['warmup']:]
+                if warmup:
+                    self._run(warmup, options['concurrency'])
+                results, elapsed = self._run(measured, options['concurrency'])
+        finally:
+            if pool is not None:
+                pool.stop()
+            if not options['keep_data']:
+                self._cleanup(applicants)
+
+        report = self._report(results, elapsed, options)
+        self._print_report(report)
+
+        if options.get('compare'):
+            self._compare(report, options['compare'])
+
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✓ Results written to {options['output']}"))
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def _run(self, applicants, concurrency):
+        """Run the applicants on `concurrency` threads; returns (results, elapsed seconds)"""
+        pending = queue.Queue()
+        for applicant in applicants:
+            pending.put(applicant)
+
+        results = []
+        lock = threading.Lock()
+
+        def work():
+            try:
+                while True:
+                    try:
+                        applicant = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    result = self._enroll(applicant)
+                    with lock:
+                        results.append(result)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work, name=f'bench-{i}') for i in range(max(1, concurrency))]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.perf_counter() - started
+
+    def _step(self, result, name, call):
+        """Time one request and count its queries"""
+        with QueryCounter() as counter:
+            started = time.perf_counter()
+            response = call()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        step = result['steps'].setdefault(name, {'latency_ms': 0.0, 'queries': 0, 'requests': 0})
+        step['latency_ms'] += elapsed_ms
+        step['queries'] += counter.count
+        step['requests'] += 1
+
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name} returned {response.status_code}: {response.content[:200]!r}")
+        return response
+
+    def _enroll(self, applicant):
+        """One applicant through the whole wizard"""
+        client = Client()
+        result = {'lrn': applicant.lrn, 'steps': {}, 'ok': False, 'error': None}
+        started = time.perf_counter()
+
+        try:
+            self._step(result, 'student_data_form', lambda: client.post(
+                reverse('enrollment_app:student_data'), applicant.student_form()))
+            self._step(result, 'family_data_form', lambda: client.post(
+                reverse('enrollment_app:family_data'), applicant.family_form()))
+            self._step(result, 'non_academic_form', lambda: client.post(
+                reverse('enrollment_app:non_academic'), applicant.survey_form()))
+
+            # Fake OCR reads the sidecar text next to the stored upload
+            report_card = io.BytesIO(applicant.report_card)
+            report_card.name = 'report_card.jpg'
+            form = applicant.academic_form()
+            form['report_card'] = report_card
+            sidecar = self._write_ocr_sidecar(applicant) if settings.OCR_ASYNC_ENABLED else None
+            try:
+                response = self._step(result, 'academic_form', lambda: client.post(
+                    reverse('enrollment_app:academic'), form, HTTP_X_REQUESTED_WITH='XMLHttpRequest'))
+
+                if response.json().get('ocr_job_id'):
+                    deadline = time.monotonic() + 60
+                    while True:
+                        status = self._step(result, 'ocr_job_status_ajax', lambda: client.get(
+                            reverse('enrollment_app:ocr_job_status_ajax'))).json()
+                        if status.get('status') not in ('pending', 'processing'):
+                            break
+                        if time.monotonic() > deadline:
+                            raise RuntimeError('OCR job did not finish within 60s')
+                        time.sleep(0.05)
+            finally:
+                # The job has been read by now (or never queued)
+                if sidecar and os.path.exists(sidecar):
+                    os.remove(sidecar)
+
+            response = self._step(result, 'verify_grades_ajax', lambda: client.post(
+                reverse('enrollment_app:verify_grades_ajax')))
+            program_code = self._pick_program(response.json())
+
+            self._step(result, 'confirm_program_selection_ajax', lambda: client.post(
+                reverse('enrollment_app:confirm_program_ajax'),
+                json.dumps({'program_code': program_code, 'student_lrn': applicant.lrn}),
+                content_type='application/json',
+            ))
+            result['ok'] = True
+        except Exception as e:
+            result['error'] = str(e)
+
+        result['latency_ms'] = (time.perf_counter() - started) * 1000
+        return result
+
+    @staticmethod
+    def _write_ocr_sidecar(applicant):
+        """Expected OCR text for the fixture backend (<stored upload>.txt)"""
+        store = get_temp_upload_store()
+        name = f"{hashlib.sha256(applicant.report_card).hexdigest()}.jpg"
+        path = store.path_for(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sidecar = f"{path}.txt"
+        with open(sidecar, 'w', encoding='utf-8') as f:
+            f.write(applicant.ocr_text())
+        return sidecar
+
+    @staticmethod
+    def _pick_program(verify_response):
+        """Best recommendation that needs no extra database check"""
+        for rec in verify_response.get('recommendations', []):
+            if not any(check.get('action_required') for check in rec.get('special_checks', [])):
+                return rec['program_code']
+        raise RuntimeError('No selectable program was recommended')
+
+    def _cleanup(self, applicants):
+        lrns = [applicant.lrn for applicant in applicants]
+        family_names = [applicant.family_name for applicant in applicants]
+
+        students = Student.objects.filter(lrn__in=lrns).select_related('student_data', 'academic_data')
+        for student in students:
+            for attr, field in (('student_data', 'student_photo'), ('academic_data', 'report_card')):
+                record = getattr(student, attr, None)
+                file = getattr(record, field, None) if record else None
+                if file:
+                    file.delete(save=False)
+
+        FamilyData.objects.filter(student__lrn__in=lrns).delete()
+        deleted = students.delete()[0]
+        Parent.objects.filter(family_name__in=family_names).delete()
+        Guardian.objects.filter(family_name__in=family_names).delete()
+        EnrollmentDraft.objects.filter(lrn__in=lrns).delete()
+        OCRJob.objects.filter(student_lrn__in=lrns).delete()
+
+        store = get_temp_upload_store()
+        ocr_cache = get_ocr_result_cache()
+        for applicant in applicants:
+            content_hash = hashlib.sha256(applicant.report_card).hexdigest()
+            path = store.path_for(f"{content_hash}.jpg")
+            if os.path.exists(path):
+                os.remove(path)
+            if ocr_cache is not None:
+                ocr_cache.delete(content_hash, namespace='fixture')
+            lrn_lookup_cache.invalidate(applicant.lrn)
+
+        self.stdout.write(f'Cleaned up {len(lrns)} benchmark applicant(s) ({deleted} row(s) deleted)')
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def _report(self, results, elapsed, options):
+        succeeded = [r for r in results if r['ok']]
+        steps = {}
+        for name in STEPS:
+            latencies = [r['steps'][name]['latency_ms'] for r in succeeded if name in r['steps']]
+            queries = [r['steps'][name]['queries'] for r in succeeded if name in r['steps']]
+            if latencies:
+                steps[name] = summarize(latencies, queries)
+
+        errors = {}
+        for r in results:
+            if not r['ok']:
+                errors[r['error']] = errors.get(r['error'], 0) + 1
+
+        return {
+            'created_at': timezone.now().isoformat(),
+            'config': {
+                'enrollments': options['enrollments'],
+                'concurrency': options['concurrency'],
+                'warmup': options['warmup'],
+                'ocr_async': options['ocr_async'],
+                'database': connection.vendor,
+            },
+            'succeeded': len(succeeded),
+            'failed': len(results) - len(succeeded),
+            'errors': errors,
+            'elapsed_s': round(elapsed, 3),
+            'throughput_per_s': round(len(succeeded) / elapsed, 3) if elapsed else 0.0,
+            'enrollment': summarize(
+                [r['latency_ms'] for r in succeeded],
+                [sum(step['queries'] for step in r['steps'].values()) for r in succeeded],
+            ),
+            'steps': steps,
+        }
+
+    def _print_report(self, report):
+        self.stdout.write(f"{'Step':<34}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'queries':>9}")
+        self.stdout.write('-' * 80)
+        for name, stats in list(report['steps'].items()) + [('TOTAL (per enrollment)', report['enrollment'])]:
+            self.stdout.write(
+                f"{name:<34}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+                f"{stats['max_ms']:>9.1f}{stats['queries_mean']:>9.1f}"
+            )
+        self.stdout.write('-' * 80)
+        self.stdout.write(
+            f"Succeeded: {report['succeeded']}  Failed: {report['failed']}  "
+            f"Elapsed: {report['elapsed_s']:.2f}s"
+        )
+        for error, count in report['errors'].items():
+            self.stdout.write(self.style.ERROR(f"  {count} x {error}"))
+        self.stdout.write(self.style.SUCCESS(f"Throughput: {report['throughput_per_s']:.2f} enrollments/s"))
+
+    def _compare(self, report, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        def change(new, old):
+            if not old:
+                return 'n/a'
+            return f"{(new - old) / old * 100:+.1f}%"
+
+        self.stdout.write('=' * 80)
+        self.stdout.write(f'Compared with {path} ({baseline.get("created_at", "?")})')
+        self.stdout.write(
+            f"  - Throughput: {baseline['throughput_per_s']:.2f} -> {report['throughput_per_s']:.2f}/s "
+            f"({change(report['throughput_per_s'], baseline['throughput_per_s'])})"
+        )
+        for name, stats in report['steps'].items():
+            old = baseline.get('steps', {}).get(name)
+            if not old:
+                continue
+            self.stdout.write(
+                f"  - {name}: p95 {old['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms "
+                f"({change(stats['p95_ms'], old['p95_ms'])}), "
+                f"queries {old['queries_mean']} -> {stats['queries_mean']}"
+            )
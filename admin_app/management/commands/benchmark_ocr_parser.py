@@ -0,0 +1,166 @@
+"""
+Management command to benchmark the OCR report card parser
+Usage:
+    python manage.py benchmark_ocr_parser path/to/texts/
+    python manage.py benchmark_ocr_parser --from-cache --show-diffs
+"""
+
+import json
+import os
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from enrollment_app.services.ocr_cache import get_ocr_result_cache
+from enrollment_app.services.ocr_service import OCRGradeVerifier
+
+
+# Used when no corpus is given
+SAMPLE_TEXTS = [
+    """REPORT ON LEARNING PROGRESS AND ACHIEVEMENT
+Learning Areas Quarter 1 2 3 4 Final Rating Remarks
+Filipino 88 89 90 91 90 Passed
+English 85 86 87 88 87 Passed
+Mathematics 95 94 96 97 96 Passed
+Science 90 90 91 92 91 Passed
+Araling Panlipunan (AP) 87 88 89 90 89 Passed
+Edukasyon sa Pagpapakatao (EsP) 92 92 93 94 93 Passed
+Edukasyon Pantahanan at Pangkabuhayan (EPP) 89 90 91 92 91 Passed
+MAPEH 93 94 95 96 95 Passed
+General Average 91.63 Passed""",
+    """Learner's Progress Report Card
+Name: DELA CRUZ, JUAN School Year 2024-2025
+SUBJECTS FINAL GRADE
+Filipino 86
+English 84
+Math 90
+Sci 88
+AP 85
+ESP 91
+TLE 87
+M.A.P.E.H 92""",
+    """Subject 1st 2nd 3rd 4th Final
+Mathematika 80 82 83 85 83
+Social Studies 78 80 81 82 80
+Music Arts PE Health 88 89 90 90 89
+Technology and Livelihood Education 85 86 86 87 86
+Attendance 200 days""",
+]
+
+
+def legacy_parse(text, subject_aliases, min_grade, max_grade):
+    """The previous per-line parser (substring match in alias order), for comparison"""
+    extracted = {}
+    lines = [line.strip().lower() for line in text.split('\n') if line.strip()]
+
+    for line in lines:
+        numbers = re.findall(r'(\d{2,3}(?:\.\d+)?)', line)
+        if not numbers:
+            continue
+        grade_val = float(numbers[-1])
+        if not (min_grade <= grade_val <= max_grade):
+            continue
+
+        matched_subject = None
+        for canonical, aliases in subject_aliases.items():
+            if any(alias in line for alias in aliases):
+                matched_subject = canonical
+                break
+        if matched_subject and matched_subject not in extracted:
+            extracted[matched_subject] = grade_val
+
+    return extracted
+
+
+class Command(BaseCommand):
+    help = 'Times the OCR grade parser against the previous per-line parser on a corpus of report card texts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='.txt files or directories of .txt files')
+        parser.add_argument(
+            '--from-cache',
+            action='store_true',
+            help='Also use the OCR text stored in the OCR result cache',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help='Times to parse the corpus (default: 200)',
+        )
+        parser.add_argument(
+            '--show-diffs',
+            action='store_true',
+            help='Print texts where the two parsers disagree',
+        )
+
+    def handle(self, *args, **options):
+        texts = self._load_corpus(options['paths'], options.get('from_cache'))
+        if not texts:
+            self.stdout.write(self.style.WARNING('No corpus given, using the built-in sample texts'))
+            texts = list(SAMPLE_TEXTS)
+
+        aliases = OCRGradeVerifier.SUBJECT_ALIASES
+        min_grade, max_grade = 70, 100
+        matcher = OCRGradeVerifier.get_subject_matcher()
+        repeat = options['repeat']
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for text in texts:
+                legacy_parse(text, aliases, min_grade, max_grade)
+        legacy_us = (time.perf_counter() - started) / (repeat * len(texts)) * 1e6
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for text in texts:
+                matcher.parse(text, min_grade, max_grade)
+        matcher_us = (time.perf_counter() - started) / (repeat * len(texts)) * 1e6
+
+        differences = 0
+        for text in texts:
+            old = legacy_parse(text, aliases, min_grade, max_grade)
+            new = matcher.parse(text, min_grade, max_grade)
+            if old != new:
+                differences += 1
+                if options.get('show_diffs'):
+                    self.stdout.write('-' * 80)
+                    self.stdout.write(text)
+                    self.stdout.write(f'  previous: {old}')
+                    self.stdout.write(f'  current:  {new}')
+
+        lines = sum(text.count('\n') + 1 for text in texts)
+        self.stdout.write('=' * 80)
+        self.stdout.write(f'Corpus: {len(texts)} text(s), {lines} line(s), {len(matcher.alias_to_subject)} alias(es)')
+        self.stdout.write(f'  - Previous parser:  {legacy_us:8.1f} µs per text')
+        self.stdout.write(f'  - Current parser:   {matcher_us:8.1f} µs per text')
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {legacy_us / matcher_us:.1f}x'))
+        self.stdout.write(f'Texts parsed differently: {differences} (run with --show-diffs to inspect)')
+
+    def _load_corpus(self, paths, from_cache):
+        texts = []
+        for path in paths:
+            if os.path.isdir(path):
+                files = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.txt')]
+            else:
+                files = [path]
+            for file_path in files:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    texts.append(f.read())
+
+        cache = get_ocr_result_cache() if from_cache else None
+        if cache is not None and os.path.isdir(cache.directory):
+            for root, _dirs, names in os.walk(cache.directory):
+                for name in names:
+                    if not name.endswith('.json'):
+                        continue
+                    try:
+                        with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                            text = json.load(f).get('text')
+                    except (OSError, ValueError):
+                        continue
+                    if text:
+                        texts.append(text)
+
+        return texts
@@ -0,0 +1,74 @@
+"""
+Management command to delete abandoned enrollment drafts and the temporary
+uploads no enrollment draft still uses
+Usage:
+    python manage.py cleanup_temp_uploads
+    python manage.py cleanup_temp_uploads --ttl-hours 6 --dry-run
+
+Run it periodically (e.g. hourly from cron) during enrollment season.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from enrollment_app.services.session_manager import EnrollmentSessionManager
+from enrollment_app.services.upload_store import (
+    get_referenced_upload_paths, get_temp_upload_store
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes abandoned enrollment drafts, then temp uploads that are not referenced '
+        'by a live enrollment draft or OCR job and are older than the TTL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ttl-hours',
+            type=float,
+            default=getattr(settings, 'TEMP_UPLOAD_TTL_HOURS', 24),
+            help='Keep unreferenced files younger than this many hours (default: 24)',
+        )
+        parser.add_argument(
+            '--draft-max-age-hours',
+            type=float,
+            default=None,
+            help='Delete drafts not updated for this many hours (default: session cookie age)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be deleted without actually deleting',
+        )
+
+    def handle(self, *args, **options):
+        store = get_temp_upload_store()
+        dry_run = options.get('dry_run')
+
+        draft_max_age = options.get('draft_max_age_hours')
+        if draft_max_age is not None:
+            draft_max_age *= 3600
+
+        stale_drafts = EnrollmentSessionManager.delete_stale_drafts(draft_max_age, dry_run=dry_run)
+        referenced = get_referenced_upload_paths(draft_max_age=draft_max_age)
+        self.stdout.write(f'{"Stale" if dry_run else "Deleted"} enrollment drafts: {stale_drafts}')
+        self.stdout.write(f'Directory: {store.directory}')
+        self.stdout.write(f'Files referenced by drafts/OCR jobs: {len(referenced)}')
+
+        stats = store.collect_garbage(
+            referenced,
+            ttl=options['ttl_hours'] * 3600,
+            dry_run=dry_run,
+        )
+
+        self.stdout.write('=' * 80)
+        self.stdout.write(f"  - Kept:    {stats['kept']} file(s), {stats['kept_bytes'] / 1024:.1f} KB")
+        if dry_run:
+            self.stdout.write(self.style.WARNING(
+                f"DRY RUN - would delete {stats['deleted']} file(s), {stats['deleted_bytes'] / 1024:.1f} KB"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Deleted {stats['deleted']} file(s), {stats['deleted_bytes'] / 1024:.1f} KB"
+            ))
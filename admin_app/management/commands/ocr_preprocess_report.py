@@ -0,0 +1,101 @@
+"""
+Management command to measure OCR image pre-processing on a set of report cards
+Usage:
+    python manage.py ocr_preprocess_report path/to/fixtures/
+    python manage.py ocr_preprocess_report card1.jpg card2.jpg --compare --backend vision
+"""
+
+import os
+
+from django.core.management.base import BaseCommand
+
+from enrollment_app.services.ocr_queue import get_ocr_verifier
+from enrollment_app.services.ocr_service import get_default_preprocessor, ReportCardPreprocessor
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff', '.heic', '.pdf')
+
+
+class Command(BaseCommand):
+    help = 'Reports byte sizes and timing of OCR pre-processing, and optionally checks extraction is unchanged'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Image files or directories of images')
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Run OCR with and without pre-processing and compare the extracted grades',
+        )
+        parser.add_argument(
+            '--backend',
+            type=str,
+            help='OCR backend for --compare (default: settings.OCR_BACKEND)',
+        )
+
+    def handle(self, *args, **options):
+        files = []
+        for path in options['paths']:
+            if os.path.isdir(path):
+                for name in sorted(os.listdir(path)):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        files.append(os.path.join(path, name))
+            else:
+                files.append(path)
+
+        if not files:
+            self.stdout.write(self.style.WARNING('No image files found.'))
+            return
+
+        preprocessor = get_default_preprocessor() or ReportCardPreprocessor()
+        verifier = None
+        if options.get('compare'):
+            verifier = get_ocr_verifier(options.get('backend'))
+            verifier.cache = None
+
+        total_before = 0
+        total_after = 0
+        total_ms = 0.0
+        differences = 0
+
+        for path in files:
+            with open(path, 'rb') as f:
+                content = f.read()
+
+            _, stats = preprocessor.process(content)
+            total_before += stats['original_bytes']
+            total_after += stats['processed_bytes']
+            total_ms += stats['elapsed_ms']
+
+            line = (
+                f'{os.path.basename(path)}: {stats["original_bytes"] / 1024:.0f} KB -> '
+                f'{stats["processed_bytes"] / 1024:.0f} KB in {stats["elapsed_ms"]:.0f} ms'
+            )
+            if not stats['applied']:
+                line += ' (sent unchanged)'
+
+            if verifier is not None:
+                verifier.preprocessor = None
+                original_grades = verifier.extract_grades_from_image(path)
+                verifier.preprocessor = preprocessor
+                processed_grades = verifier.extract_grades_from_image(path)
+
+                if original_grades == processed_grades:
+                    line += ' ✓ same grades'
+                else:
+                    differences += 1
+                    line += f' ✗ grades differ: {original_grades} vs {processed_grades}'
+
+            self.stdout.write(line)
+
+        self.stdout.write('=' * 80)
+        saved = (1 - total_after / total_before) * 100 if total_before else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(files)} file(s): {total_before / 1024 / 1024:.1f} MB -> '
+            f'{total_after / 1024 / 1024:.1f} MB ({saved:.0f}% smaller), '
+            f'{total_ms / len(files):.0f} ms average'
+        ))
+        if verifier is not None:
+            if differences:
+                self.stdout.write(self.style.ERROR(f'{differences} file(s) extracted different grades'))
+            else:
+                self.stdout.write(self.style.SUCCESS('Extraction unchanged on all files'))
@@ -0,0 +1,66 @@
+"""
+Management command to process queued report card OCR jobs
+Usage: python manage.py run_ocr_worker --workers 4
+"""
+
+from django.core.management.base import BaseCommand
+
+from enrollment_app.services.ocr_queue import OCRWorkerPool
+
+
+class Command(BaseCommand):
+    help = 'Runs a pool of workers that process pending OCR jobs (report card verification)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of concurrent workers (default: settings.OCR_WORKERS or 2)',
+        )
+        parser.add_argument(
+            '--backend',
+            type=str,
+            choices=['vision', 'easyocr', 'fixture', 'fake'],
+            help='OCR backend (default: settings.OCR_BACKEND). Use "fixture" to run offline.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the queue is empty (default: 1.0)',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=3,
+            help='Attempts before a job is marked failed (default: 3)',
+        )
+        parser.add_argument(
+            '--lease-seconds',
+            type=int,
+            help='Seconds before a job left processing by a dead worker is retried '
+                 '(default: settings.OCR_JOB_LEASE_SECONDS or 300)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty instead of waiting for new jobs',
+        )
+
+    def handle(self, *args, **options):
+        pool = OCRWorkerPool(
+            num_workers=options.get('workers'),
+            backend=options.get('backend'),
+            poll_interval=options['poll_interval'],
+            max_attempts=options['max_attempts'],
+            lease_seconds=options.get('lease_seconds'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Starting {pool.num_workers} OCR worker(s)...'))
+        pool.warm_up()
+        self.stdout.write(f'OCR backend ready: {pool.backend_name}')
+
+        stats = pool.run(once=options.get('once'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Processed {stats["processed"]} job(s), {stats["failed"]} failed'
+        ))
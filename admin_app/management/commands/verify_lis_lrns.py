@@ -0,0 +1,181 @@
+"""
+Management command to re-verify student LRNs against the LIS in bulk
+Usage:
+    python manage.py verify_lis_lrns --school-year 2025-2026
+    python manage.py verify_lis_lrns --build-snapshot lis_snapshot.npz
+    python manage.py verify_lis_lrns --snapshot lis_snapshot.npz --dry-run
+    python manage.py verify_lis_lrns --snapshot lis_snapshot.npz --allow-unverify
+
+With --snapshot, LRNs missing from the snapshot are only un-verified when
+--allow-unverify is given and the snapshot is newer than
+--max-snapshot-age-hours, so a stale or wrong snapshot cannot clear the
+flags of a whole school year.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from admin_app.models import SchoolYear
+from enrollment_app.models import Student
+from enrollment_app.services.bulk_lrn_verification import (
+    BulkLRNVerifier, LISSnapshot, iter_chunks
+)
+
+
+class Command(BaseCommand):
+    help = 'Re-verifies the LRNs of a school year against the LIS (or a local LIS snapshot) and updates is_lis_verified'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--school-year',
+            type=str,
+            help='School year label (e.g., 2025-2026). If not provided, uses the active school year.',
+        )
+        parser.add_argument(
+            '--snapshot',
+            type=str,
+            help='Verify offline against a snapshot file created with --build-snapshot',
+        )
+        parser.add_argument(
+            '--allow-unverify',
+            action='store_true',
+            help='With --snapshot, also clear is_lis_verified for LRNs missing from the snapshot',
+        )
+        parser.add_argument(
+            '--max-snapshot-age-hours',
+            type=float,
+            default=24,
+            help='With --allow-unverify, refuse to un-verify from a snapshot older than this (default: 24)',
+        )
+        parser.add_argument(
+            '--build-snapshot',
+            type=str,
+            metavar='PATH',
+            help='Download all LIS LRNs into a snapshot file and exit',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of LRNs per LIS query and per update (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be updated without actually updating',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        if options.get('build_snapshot'):
+            self._build_snapshot(options['build_snapshot'], chunk_size)
+            return
+
+        school_year_label = options.get('school_year')
+        try:
+            if school_year_label:
+                school_year = SchoolYear.objects.get(year_label=school_year_label)
+            else:
+                school_year = SchoolYear.objects.filter(is_active=True).first()
+                if not school_year:
+                    self.stdout.write(self.style.ERROR('No active school year found. Please specify --school-year'))
+                    return
+        except SchoolYear.DoesNotExist:
+            self.stdout.write(self.style.ERROR(f'School year "{school_year_label}" not found.'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Using school year: {school_year.year_label}'))
+
+        students = Student.objects.filter(school_year=school_year).order_by('lrn')
+        current = dict(students.values_list('lrn', 'is_lis_verified'))
+        if not current:
+            self.stdout.write(self.style.WARNING('No students found for this school year.'))
+            return
+
+        started = time.perf_counter()
+        lrns = list(current.keys())
+
+        if options.get('snapshot'):
+            snapshot = LISSnapshot.load(options['snapshot'])
+            self.stdout.write(
+                f'Loaded snapshot with {len(snapshot)} LRN(s)'
+                + (f' built at {snapshot.built_at:%Y-%m-%d %H:%M}' if snapshot.built_at else '')
+            )
+            verified = dict(zip(lrns, snapshot.contains_many(lrns).tolist()))
+            can_unverify = self._can_unverify_from(snapshot, options)
+        else:
+            verifier = BulkLRNVerifier(chunk_size=chunk_size, warm_cache=False)
+            verified = {
+                lrn: result['is_valid']
+                for lrn, result in verifier.iter_results(lrns)
+            }
+            can_unverify = True
+
+        elapsed = time.perf_counter() - started
+
+        newly_verified = [lrn for lrn in lrns if verified[lrn] and not current[lrn]]
+        no_longer_verified = [lrn for lrn in lrns if not verified[lrn] and current[lrn]]
+        not_in_lis = sum(1 for lrn in lrns if not verified[lrn])
+
+        self.stdout.write('=' * 80)
+        self.stdout.write(f'Checked {len(lrns)} student(s) in {elapsed:.2f}s')
+        self.stdout.write(f'  - In LIS:               {len(lrns) - not_in_lis}')
+        self.stdout.write(f'  - Not in LIS:           {not_in_lis}')
+        self.stdout.write(f'  - Newly verified:       {len(newly_verified)}')
+        self.stdout.write(f'  - No longer verified:   {len(no_longer_verified)}')
+
+        if no_longer_verified and not can_unverify:
+            self.stdout.write(self.style.WARNING(
+                f'Keeping {len(no_longer_verified)} verified flag(s): pass --allow-unverify with a fresh snapshot to clear them'
+            ))
+            no_longer_verified = []
+
+        if options.get('dry_run'):
+            self.stdout.write(self.style.WARNING('DRY RUN: No changes were made. Remove --dry-run to apply changes.'))
+            return
+
+        now = timezone.now()
+        updated_count = 0
+        with transaction.atomic():
+            for chunk in iter_chunks(newly_verified, chunk_size):
+                updated_count += Student.objects.filter(lrn__in=chunk).update(
+                    is_lis_verified=True, lis_verified_at=now
+                )
+            for chunk in iter_chunks(no_longer_verified, chunk_size):
+                updated_count += Student.objects.filter(lrn__in=chunk).update(
+                    is_lis_verified=False, lis_verified_at=None
+                )
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Updated {updated_count} student(s)'))
+
+    def _can_unverify_from(self, snapshot, options):
+        """Whether LRNs missing from the snapshot may lose their verified flag"""
+        if not options.get('allow_unverify'):
+            return False
+        if not len(snapshot):
+            self.stdout.write(self.style.ERROR('Snapshot is empty; not un-verifying anyone'))
+            return False
+        if not snapshot.built_at:
+            self.stdout.write(self.style.ERROR('Snapshot has no build time; not un-verifying anyone'))
+            return False
+
+        max_age = timedelta(hours=options['max_snapshot_age_hours'])
+        if timezone.now() - snapshot.built_at > max_age:
+            self.stdout.write(self.style.ERROR(
+                f'Snapshot is older than {options["max_snapshot_age_hours"]:g} hour(s); not un-verifying anyone'
+            ))
+            return False
+        return True
+
+    def _build_snapshot(self, path, chunk_size):
+        started = time.perf_counter()
+        snapshot = LISSnapshot.build(chunk_size=chunk_size)
+        snapshot.save(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Saved {len(snapshot)} LRN(s) to {path} in {time.perf_counter() - started:.2f}s'
+        ))
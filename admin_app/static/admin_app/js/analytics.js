@@ -11,7 +11,7 @@ document.addEventListener('DOMContentLoaded', function () {
  */
 async function loadHeaderData() {
     try {
-        const response = await fetch('/admin-portal/api/analytics/header/');
+        const response = await fetch('/admin-portal/api/header/');
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
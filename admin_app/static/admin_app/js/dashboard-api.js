@@ -63,7 +63,7 @@ function updateDashboardDate() {
  */
 async function loadHeaderData() {
     try {
-        const response = await fetch(window.API_BASE + 'header/');
+        const response = await fetch('/admin-portal/api/header/');
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -157,6 +157,8 @@ async function loadStatistics() {
  * Update grade level breakdown
  */
 function updateGradeBreakdown(breakdown) {
+    if (!breakdown) return;
+    
     const gradeElements = {
         'grade_7': document.querySelector('[data-grade="7"]'),
         'grade_8': document.querySelector('[data-grade="8"]'),
@@ -164,9 +166,22 @@ function updateGradeBreakdown(breakdown) {
         'grade_10': document.querySelector('[data-grade="10"]')
     };
     
-    // For now, use the existing static HTML elements
-    // You can add data attributes to the HTML and update them here
-    // This is a placeholder for future enhancement
+    const total = Object.values(breakdown).reduce((sum, count) => sum + count, 0);
+    
+    Object.entries(gradeElements).forEach(([key, element]) => {
+        if (!element) return;
+        
+        const count = breakdown[key] || 0;
+        const countElement = element.querySelector('[data-grade-count]');
+        const barElement = element.querySelector('[data-grade-bar]');
+        
+        if (countElement) {
+            countElement.textContent = count;
+        }
+        if (barElement) {
+            barElement.style.width = total > 0 ? `${(count / total * 100).toFixed(1)}%` : '0%';
+        }
+    });
 }
 
 /**
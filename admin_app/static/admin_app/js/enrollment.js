@@ -7,12 +7,33 @@ document.addEventListener('DOMContentLoaded', () => {
     const statusFilter = document.getElementById('statusFilter');
     const schoolYearFilter = document.getElementById('schoolYearFilter');
 
+    const sortFilter = document.getElementById('sortFilter');
+
     [programFilter, statusFilter].forEach((el) => {
         if (el) {
             el.addEventListener('change', loadAllData);
         }
     });
 
+    if (sortFilter) {
+        sortFilter.addEventListener('change', () => loadRequests());
+    }
+
+    // Search as the user types (debounced)
+    const requestSearch = document.getElementById('requestSearch');
+    if (requestSearch) {
+        let searchTimer = null;
+        requestSearch.addEventListener('input', () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => loadRequests(), 300);
+        });
+    }
+
+    const loadMoreBtn = document.getElementById('loadMoreRequests');
+    if (loadMoreBtn) {
+        loadMoreBtn.addEventListener('click', () => loadRequests(true));
+    }
+
     const refreshBtn = document.querySelector('button[onclick="refreshData()"]');
     if (refreshBtn) {
         refreshBtn.addEventListener('click', loadAllData);
@@ -43,7 +64,7 @@ async function initializeEnrollment() {
  */
 async function loadHeaderData() {
     try {
-        const response = await fetch(window.ENROLLMENT_API_BASE + 'header/');
+        const response = await fetch('/admin-portal/api/header/');
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -102,49 +123,69 @@ function getFilters() {
 
 async function loadAllData() {
     setRefreshLoading(true);
-    await Promise.all([loadSummary(), loadRequests()]);
+    // The first page of requests carries the summary counts as well
+    await loadRequests();
     setRefreshLoading(false);
 }
 
-async function loadSummary() {
-    try {
-        const params = new URLSearchParams(getFilters());
-        const response = await fetch(`${window.ENROLLMENT_API_BASE}summary/?${params.toString()}`);
-        if (!response.ok) throw new Error('Failed to load summary');
-        const data = await response.json();
-
-        document.getElementById('totalRequestsCount').textContent = data.total_requests ?? 0;
-        document.getElementById('approvedCount').textContent = data.approved ?? 0;
-        document.getElementById('pendingCount').textContent = data.pending ?? 0;
-        document.getElementById('rejectedCount').textContent = data.rejected ?? 0;
-    } catch (err) {
-        console.error(err);
-        showNotification('Unable to load summary data', 'error');
-    }
+function updateSummary(data) {
+    document.getElementById('totalRequestsCount').textContent = data.total_requests ?? 0;
+    document.getElementById('approvedCount').textContent = data.approved ?? 0;
+    document.getElementById('pendingCount').textContent = data.pending ?? 0;
+    document.getElementById('rejectedCount').textContent = data.rejected ?? 0;
 }
 
-async function loadRequests() {
+// Keyset pagination state of the requests table
+const requestsState = {
+    nextCursor: null,
+    loaded: 0,
+    total: null,
+};
+
+/**
+ * Load the first page of requests, or the next one when append is true
+ */
+async function loadRequests(append = false) {
     const tbody = document.getElementById('requestsTbody');
     if (!tbody) return;
-    tbody.innerHTML = '<tr><td colspan="8" class="px-6 py-4 text-center text-gray-500 text-sm">Loading...</td></tr>';
+    if (!append) {
+        requestsState.nextCursor = null;
+        requestsState.loaded = 0;
+        tbody.innerHTML = '<tr><td colspan="8" class="px-6 py-4 text-center text-gray-500 text-sm">Loading...</td></tr>';
+    }
 
     try {
         const params = new URLSearchParams(getFilters());
+        params.set('sort', document.getElementById('sortFilter')?.value || '-created_at');
+        const search = document.getElementById('requestSearch')?.value.trim();
+        if (search) params.set('q', search);
+        if (append) {
+            params.set('cursor', requestsState.nextCursor);
+        } else {
+            params.set('include_summary', '1');
+        }
+
         const response = await fetch(`${window.ENROLLMENT_API_BASE}requests/?${params.toString()}`);
         if (!response.ok) throw new Error('Failed to load requests');
-        const { results } = await response.json();
+        const data = await response.json();
+        const results = data.results || [];
 
-        if (!results || results.length === 0) {
+        if (!append) {
+            requestsState.total = data.total;
+            if (data.summary) updateSummary(data.summary);
+            tbody.innerHTML = '';
+        }
+
+        if (!append && results.length === 0) {
             tbody.innerHTML = '<tr><td colspan="8" class="px-6 py-4 text-center text-gray-500 text-sm">No enrollment requests found.</td></tr>';
-            return;
         }
 
-        tbody.innerHTML = '';
-        results.forEach((item, index) => {
+        results.forEach((item) => {
+            requestsState.loaded += 1;
             const row = document.createElement('tr');
             row.className = 'hover:bg-gray-50 transition-colors';
             row.innerHTML = `
-                <td class="px-6 py-4 text-sm text-gray-500">${index + 1}</td>
+                <td class="px-6 py-4 text-sm text-gray-500">${requestsState.loaded}</td>
                 <td class="px-6 py-4 text-sm font-medium text-gray-900">${item.lrn}</td>
                 <td class="px-6 py-4 text-sm text-gray-900">${item.student_name}</td>
                 <td class="px-6 py-4 text-sm font-medium text-gray-900">${item.program}</td>
@@ -161,13 +202,32 @@ async function loadRequests() {
             `;
             tbody.appendChild(row);
         });
+
+        requestsState.nextCursor = data.has_more ? data.next_cursor : null;
+        updateRequestsFooter();
     } catch (err) {
         console.error(err);
-        tbody.innerHTML = '<tr><td colspan="8" class="px-6 py-4 text-center text-red-500 text-sm">Failed to load enrollment requests.</td></tr>';
+        if (!append) {
+            tbody.innerHTML = '<tr><td colspan="8" class="px-6 py-4 text-center text-red-500 text-sm">Failed to load enrollment requests.</td></tr>';
+        }
         showNotification('Unable to load enrollment requests', 'error');
     }
 }
 
+function updateRequestsFooter() {
+    const showing = document.getElementById('requestsShowing');
+    if (showing) {
+        showing.textContent = requestsState.total !== null
+            ? `Showing ${requestsState.loaded} of ${requestsState.total} requests`
+            : `Showing ${requestsState.loaded} requests`;
+    }
+
+    const loadMoreBtn = document.getElementById('loadMoreRequests');
+    if (loadMoreBtn) {
+        loadMoreBtn.classList.toggle('hidden', !requestsState.nextCursor);
+    }
+}
+
 function statusBadge(status) {
     const normalized = (status || '').toLowerCase();
     if (['submitted', 'under_review', 'pending'].includes(normalized)) {
@@ -198,6 +258,18 @@ function refreshData() {
     loadAllData();
 }
 
+/**
+ * Download the requests matching the current filters (streamed CSV/XLSX)
+ */
+function exportRequests(format = 'csv') {
+    const params = new URLSearchParams(getFilters());
+    params.set('sort', document.getElementById('sortFilter')?.value || '-created_at');
+    const search = document.getElementById('requestSearch')?.value.trim();
+    if (search) params.set('q', search);
+    params.set('format', format);
+    window.location.href = `${window.ENROLLMENT_API_BASE}requests/export/?${params.toString()}`;
+}
+
 function showNotification(message, type = 'info') {
     const container = document.getElementById('notificationContainer');
     if (!container) return;
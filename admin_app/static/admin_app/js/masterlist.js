@@ -214,21 +214,14 @@ document.addEventListener('DOMContentLoaded', function () {
         }
 
         function exportToExcel() {
-            // Show loading state
-            const button = document.querySelector('button[onclick="exportToExcel()"]');
-            const originalText = button.innerHTML;
-            button.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Exporting...';
-            button.disabled = true;
-
-            // Simulate export process
-            setTimeout(() => {
-                // Reset button
-                button.innerHTML = originalText;
-                button.disabled = false;
+            if (!window.MASTERLIST_SECTION_ID) {
+                showNotification('Open a section to export its masterlist', 'info');
+                return;
+            }
 
-                // Show success notification
-                showNotification('Masterlist exported successfully!', 'success');
-            }, 1500);
+            // Streamed by the server; the browser shows the download progress
+            const params = new URLSearchParams({ format: 'xlsx' });
+            window.location.href = `/admin-portal/masterlist/${window.MASTERLIST_SECTION_ID}/export/?${params.toString()}`;
         }
 
         function printMasterlist() {
@@ -3,7 +3,7 @@
  */
 async function loadHeaderData() {
     try {
-        const response = await fetch('/admin-portal/api/reports/header/');
+        const response = await fetch('/admin-portal/api/header/');
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
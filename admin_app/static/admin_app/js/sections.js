@@ -20,7 +20,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
 async function loadHeaderData() {
     try {
-        const response = await fetch('/admin-portal/api/sections/header/');
+        const response = await fetch('/admin-portal/api/header/');
         if (!response.ok) throw new Error('Failed to load header');
         
         const data = await response.json();
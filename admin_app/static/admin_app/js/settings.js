@@ -33,7 +33,7 @@ async function apiCall(endpoint, method = 'GET', data = null) {
 
 async function loadHeaderData() {
     try {
-        const response = await fetch('/admin-portal/api/settings/header/');
+        const response = await fetch('/admin-portal/api/header/');
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
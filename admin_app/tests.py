@@ -1,3 +1,43 @@
+from base64 import urlsafe_b64encode
+from datetime import datetime, timezone as dt_timezone
+
 from django.test import TestCase
 
-# Create your tests here.
+from .views.enrollment_views import REQUEST_SORTS, _decode_cursor, _encode_cursor
+
+
+class EnrollmentRequestCursorTests(TestCase):
+    """Keyset cursors of the enrollment requests API"""
+
+    row = {
+        'lrn': '123456789012',
+        'created_at': datetime(2025, 6, 3, 8, 15, 30, 123456, tzinfo=dt_timezone.utc),
+        'sort_last_name': 'Dela Cruz',
+        'sort_first_name': 'Juan Ñino',
+    }
+
+    def test_round_trip_for_every_sort(self):
+        for sort, sort_fields in REQUEST_SORTS.items():
+            with self.subTest(sort=sort):
+                cursor = _encode_cursor(self.row, sort_fields)
+                decoded = _decode_cursor(cursor, sort_fields)
+                self.assertEqual(decoded, {field: self.row[field] for field, _ in sort_fields})
+
+    def test_cursor_is_url_safe(self):
+        cursor = _encode_cursor(self.row, REQUEST_SORTS['name'])
+        self.assertRegex(cursor, r'^[A-Za-z0-9_=-]+$')
+
+    def test_malformed_cursors_are_rejected(self):
+        sort_fields = REQUEST_SORTS['-created_at']
+        cursors = [
+            'not base64!',
+            urlsafe_b64encode(b'not json').decode(),
+            urlsafe_b64encode(b'{"lrn": "1"}').decode(),
+            urlsafe_b64encode(b'["2025-06-03T08:15:30+00:00"]').decode(),
+            urlsafe_b64encode(b'["yesterday", "123456789012"]').decode(),
+            urlsafe_b64encode(b'["2025-06-03T08:15:30+00:00", 5]').decode(),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    _decode_cursor(cursor, sort_fields)
@@ -24,27 +24,30 @@ urlpatterns = [
     path('dashboard/', dashboard_views.dashboard, name='dashboard_alt'),
     
     # Dashboard API Endpoints
-    path('api/dashboard/header/', dashboard_views.dashboard_header_data, name='api_dashboard_header'),
+    path('api/header/', dashboard_views.header_data, name='api_header'),
+    # Per-page header endpoints, kept as aliases of api/header/
+    path('api/dashboard/header/', dashboard_views.header_data, name='api_dashboard_header'),
     path('api/dashboard/statistics/', dashboard_views.dashboard_statistics, name='api_dashboard_statistics'),
     path('api/dashboard/notifications/', dashboard_views.dashboard_notifications, name='api_dashboard_notifications'),
     path('api/dashboard/programs/', dashboard_views.dashboard_programs_overview, name='api_dashboard_programs'),
     
     # Analytics
     path('analytics/', analytics_views.analytics, name='analytics'),
-    path('api/analytics/header/', analytics_views.analytics_header_data, name='api_analytics_header'),
+    path('api/analytics/header/', dashboard_views.header_data, name='api_analytics_header'),
     
     # Enrollment
     path('enrollment/', enrollment_views.enrollment_list, name='enrollment'),
     path('enrollment/<str:student_id>/', enrollment_views.enrollment_detail, name='enrollment_detail'),
 
     # Enrollment API
-    path('api/enrollment/header/', enrollment_views.enrollment_header_data, name='api_enrollment_header'),
+    path('api/enrollment/header/', dashboard_views.header_data, name='api_enrollment_header'),
     path('api/enrollment/summary/', enrollment_views.enrollment_summary, name='api_enrollment_summary'),
     path('api/enrollment/requests/', enrollment_views.enrollment_requests, name='api_enrollment_requests'),
+    path('api/enrollment/requests/export/', enrollment_views.enrollment_requests_export, name='api_enrollment_requests_export'),
     
     # Sections
     path('sections/', sections_views.sections_list, name='sections'),
-    path('api/sections/header/', sections_views.sections_header_data, name='api_sections_header'),
+    path('api/sections/header/', dashboard_views.header_data, name='api_sections_header'),
     path('sections/<str:program>/', sections_views.sections_by_program, name='sections_by_program'),
     path('sections/<str:program>/<int:section_id>/', sections_views.section_detail, name='section_detail'),
 
@@ -70,6 +73,7 @@ urlpatterns = [
     # Masterlist
     path('masterlist/', masterlist_views.masterlist, name='masterlist'),
     path('masterlist/<int:section_id>/', masterlist_views.masterlist_by_section, name='masterlist_by_section'),
+    path('masterlist/<int:section_id>/export/', masterlist_views.masterlist_export, name='masterlist_export'),
     
     # Student Details & Edit
     path('student/<str:student_id>/', studentdetails_views.student_details, name='student_details'),
@@ -87,12 +91,12 @@ urlpatterns = [
     
     # Reports
     path('reports/', reports_views.reports, name='reports'),
-    path('api/reports/header/', reports_views.reports_header_data, name='api_reports_header'),
+    path('api/reports/header/', dashboard_views.header_data, name='api_reports_header'),
     path('reports/generate/', reports_views.generate_report, name='generate_report'),
     
     # Settings
     path('settings/', settings_views.settings, name='settings'),
-    path('api/settings/header/', settings_views.settings_header_data, name='api_settings_header'),
+    path('api/settings/header/', dashboard_views.header_data, name='api_settings_header'),
     path('settings/users/', settings_views.manage_users, name='manage_users'),
     path('settings/content/', settings_views.manage_content, name='manage_content'),
     
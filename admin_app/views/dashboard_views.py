@@ -1,6 +1,7 @@
 from django.shortcuts import render
 from django.http import JsonResponse
-from django.db.models import Count, Q, F
+from django.db.models import Count, Q, F, Sum, Window
+from django.db.models.functions import Coalesce, RowNumber
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required
 from admin_app.decorators import admin_required
@@ -8,6 +9,8 @@ from admin_app.models import (
     SchoolYear, UserProfile, Teacher, Section, Program
 )
 from enrollment_app.models import Student, StudentData, ProgramSelection
+from enrollment_app.services.dashboard_cache import get_dashboard_payload
+from enrollment_app.services.header_context import get_header_context
 from datetime import datetime, timedelta
 
 
@@ -33,101 +36,86 @@ def dashboard(request):
     return render(request, 'admin_app/dashboard.html', context)
 
 
-@admin_required
-def dashboard_header_data(request):
+@login_required
+def header_data(request):
     """
-    API endpoint for dashboard header data
-    Returns: school year, user fullname, role, and photo/initials
+    API endpoint for the portal header (shared by all admin pages)
+    Returns: school year, user fullname, role, photo/initials and program
     """
-    # Get active school year
-    active_school_year = SchoolYear.get_active_school_year()
-    
-    # Get user profile
-    try:
-        user_profile = UserProfile.objects.select_related('program', 'position', 'department').get(user=request.user)
-    except UserProfile.DoesNotExist:
-        user_profile = None
-    
-    # Get user's full name
-    user = request.user
-    full_name = f"{user.first_name} {user.last_name}" if user.first_name and user.last_name else user.username
-    
-    # Get initials
-    if user.first_name and user.last_name:
-        initials = f"{user.first_name[0]}{user.last_name[0]}".upper()
-    elif user.first_name:
-        initials = user.first_name[0].upper()
-    elif user.last_name:
-        initials = user.last_name[0].upper()
-    else:
-        initials = user.username[0].upper() if user.username else "U"
-    
-    # Get role
-    role = user_profile.get_user_type_display() if user_profile else "Admin"
-    
-    # Get photo URL
-    photo_url = None
-    if user_profile and user_profile.photo:
-        photo_url = user_profile.photo.url
-    
-    data = {
-        'school_year': active_school_year.year_label if active_school_year else 'No Active Year',
-        'full_name': full_name,
-        'role': role,
-        'initials': initials,
-        'photo_url': photo_url,
-        'program': user_profile.get_program_name() if user_profile else 'N/A',
-    }
-    
-    return JsonResponse(data)
+    return JsonResponse(get_header_context(request.user))
+
+
+# Statuses counted as enrolled students on the dashboard
+ACTIVE_ENROLLMENT_STATUSES = ['submitted', 'under_review', 'approved']
+
+# Enrolling grade level -> grade in "Previous Grade and Section" (first number,
+# e.g. "Grade 6 - A" or "6-Rizal" is enrolling in Grade 7)
+GRADE_LEVEL_PREVIOUS_GRADES = {7: 6, 8: 7, 9: 8, 10: 9}
 
 
 @admin_required
 def dashboard_statistics(request):
     """
     API endpoint for dashboard statistics
-    Returns: total teachers, students, programs, sections
+    Returns: total teachers, students, programs, sections and grade level breakdown
+    Cached briefly; enrollment status changes clear the cache
     """
+    return JsonResponse(get_dashboard_payload('statistics', _build_dashboard_statistics))
+
+
+def _build_dashboard_statistics():
+    """One aggregate query per table"""
     # Get active school year
     active_school_year = SchoolYear.get_active_school_year()
     
-    # Get statistics
-    total_teachers = Teacher.objects.count()
-    total_programs = Program.objects.count()
+    total_teachers = Teacher.objects.aggregate(total=Count('pk'))['total']
+    total_programs = Program.objects.aggregate(total=Count('pk'))['total']
     
     if active_school_year:
-        # Statistics for active school year
-        total_students = Student.objects.filter(
-            school_year=active_school_year,
-            enrollment_status__in=['submitted', 'under_review', 'approved']
-        ).count()
-        total_sections = Section.objects.filter(school_year=active_school_year).count()
+        total_sections = Section.objects.filter(
+            school_year=active_school_year
+        ).aggregate(total=Count('pk'))['total']
         
-        # Grade level breakdown
-        grade_7_students = Student.objects.filter(
+        # Total and grade level breakdown in one pass over students
+        grade_counts = {
+            f'grade_{level}': Count(
+                'pk',
+                filter=Q(student_data__previous_grade_section__iregex=rf'^[^0-9]*{previous}([^0-9]|$)'),
+            )
+            for level, previous in GRADE_LEVEL_PREVIOUS_GRADES.items()
+        }
+        student_counts = Student.objects.filter(
             school_year=active_school_year,
-            enrollment_status__in=['submitted', 'under_review', 'approved']
-        ).count()  # You might need to add grade_level field to filter properly
-        
+            enrollment_status__in=ACTIVE_ENROLLMENT_STATUSES
+        ).aggregate(total=Count('pk'), **grade_counts)
+        total_students = student_counts.pop('total')
+        grade_breakdown = student_counts
     else:
         total_students = 0
         total_sections = 0
-        grade_7_students = 0
+        grade_breakdown = {f'grade_{level}': 0 for level in GRADE_LEVEL_PREVIOUS_GRADES}
     
-    data = {
+    return {
         'total_teachers': total_teachers,
         'total_students': total_students,
         'total_programs': total_programs,
         'total_sections': total_sections,
-        'grade_breakdown': {
-            'grade_7': grade_7_students // 4 if grade_7_students else 0,  # Simplified distribution
-            'grade_8': grade_7_students // 4 if grade_7_students else 0,
-            'grade_9': grade_7_students // 4 if grade_7_students else 0,
-            'grade_10': grade_7_students // 4 if grade_7_students else 0,
-        }
+        'grade_breakdown': grade_breakdown,
     }
-    
-    return JsonResponse(data)
+
+
+PROGRAM_ICONS = {
+    'STE': 'fas fa-flask',
+    'SPFL': 'fas fa-language',
+    'SPTVE': 'fas fa-tools',
+    'OHSP': 'fas fa-laptop-house',
+    'SNED': 'fas fa-universal-access',
+    'TOP 5': 'fas fa-trophy',
+    'HETERO': 'fas fa-users',
+}
+
+# Most recent students listed per program notification
+NOTIFICATION_STUDENTS_PER_PROGRAM = 5
 
 
 @admin_required
@@ -135,6 +123,9 @@ def dashboard_notifications(request):
     """
     API endpoint for new student enrollment notifications
     Returns notifications grouped by program
+    
+    Three queries: counts per program (GROUP BY), the most recent students
+    per program (ROW_NUMBER() OVER (PARTITION BY program)) and the programs.
     """
     # Get active school year
     active_school_year = SchoolYear.get_active_school_year()
@@ -142,71 +133,74 @@ def dashboard_notifications(request):
     if not active_school_year:
         return JsonResponse({'notifications': [], 'total_count': 0})
     
-    # Get new students (submitted status) grouped by program
-    # Students who have completed enrollment but not yet reviewed
+    # New students (submitted status): completed enrollment but not yet reviewed
     new_students = Student.objects.filter(
         school_year=active_school_year,
         enrollment_status='submitted',
-        program_selected=True
-    ).select_related('program_selection')
+        program_selected=True,
+        program_selection__isnull=False,
+    )
     
-    # Group by program
-    notifications = []
-    program_counts = {}
+    # Count per program
+    program_counts = {
+        row['program_code']: row['count']
+        for row in new_students.values(
+            program_code=F('program_selection__selected_program_code')
+        ).annotate(count=Count('pk'))
+    }
     
-    for student in new_students:
-        try:
-            program_selection = student.program_selection
-            program_code = program_selection.selected_program_code
-            
-            if program_code not in program_counts:
-                program_counts[program_code] = {
-                    'count': 0,
-                    'students': []
-                }
-            
-            program_counts[program_code]['count'] += 1
-            
-            # Get student details
-            try:
-                student_data = student.student_data
-                student_name = student_data.full_name
-            except:
-                student_name = f"Student {student.lrn}"
-            
-            program_counts[program_code]['students'].append({
-                'lrn': student.lrn,
-                'name': student_name,
-                'created_at': student.created_at.strftime('%b %d, %Y %I:%M %p'),
-                'time_ago': get_time_ago(student.created_at)
-            })
-        except:
-            continue
+    # Most recent students of each program
+    recent_students = new_students.annotate(
+        program_code=F('program_selection__selected_program_code'),
+        row_number=Window(
+            expression=RowNumber(),
+            partition_by=F('program_selection__selected_program_code'),
+            order_by=[F('created_at').desc(), F('lrn')],
+        ),
+    ).filter(
+        row_number__lte=NOTIFICATION_STUDENTS_PER_PROGRAM
+    ).values(
+        'lrn', 'created_at', 'program_code', 'row_number',
+        'student_data__first_name', 'student_data__middle_name', 'student_data__last_name',
+    ).order_by('program_code', 'row_number')
+    
+    students_by_program = {}
+    for row in recent_students:
+        if row['student_data__first_name'] is not None:
+            student_name = ' '.join(filter(None, [
+                row['student_data__first_name'],
+                row['student_data__middle_name'],
+                row['student_data__last_name'],
+            ]))
+        else:
+            student_name = f"Student {row['lrn']}"
+        
+        students_by_program.setdefault(row['program_code'], []).append({
+            'lrn': row['lrn'],
+            'name': student_name,
+            'created_at': row['created_at'].strftime('%b %d, %Y %I:%M %p'),
+            'time_ago': get_time_ago(row['created_at'])
+        })
+    
+    # Program names in one query (codes without a Program are skipped)
+    program_names = dict(
+        Program.objects.filter(code__in=program_counts).values_list('code', 'name')
+    )
     
     # Create notification list
-    for program_code, data in program_counts.items():
-        try:
-            program = Program.objects.get(code=program_code)
-            icon_map = {
-                'STE': 'fas fa-flask',
-                'SPFL': 'fas fa-language',
-                'SPTVE': 'fas fa-tools',
-                'OHSP': 'fas fa-laptop-house',
-                'SNED': 'fas fa-universal-access',
-                'TOP 5': 'fas fa-trophy',
-                'HETERO': 'fas fa-users',
-            }
-            
-            notifications.append({
-                'program_code': program_code,
-                'program_name': program.name,
-                'icon': icon_map.get(program_code, 'fas fa-users'),
-                'count': data['count'],
-                'students': data['students'][:5],  # Limit to 5 most recent
-                'message': f"{data['count']} new {program_code} application{'s' if data['count'] > 1 else ''} pending review"
-            })
-        except Program.DoesNotExist:
+    notifications = []
+    for program_code, count in program_counts.items():
+        if program_code not in program_names:
             continue
+        
+        notifications.append({
+            'program_code': program_code,
+            'program_name': program_names[program_code],
+            'icon': PROGRAM_ICONS.get(program_code, 'fas fa-users'),
+            'count': count,
+            'students': students_by_program.get(program_code, []),
+            'message': f"{count} new {program_code} application{'s' if count > 1 else ''} pending review"
+        })
     
     # Sort by count (highest first)
     notifications.sort(key=lambda x: x['count'], reverse=True)
@@ -224,6 +218,10 @@ def dashboard_programs_overview(request):
     """
     API endpoint for programs overview table
     Returns detailed program statistics
+    
+    Applicant counts for the active and previous school year come from one
+    grouped ProgramSelection query, sections and capacity from one Program
+    query.
     """
     # Get active school year
     active_school_year = SchoolYear.get_active_school_year()
@@ -231,8 +229,35 @@ def dashboard_programs_overview(request):
     if not active_school_year:
         return JsonResponse({'programs': []})
     
-    # Get all active programs
-    programs = Program.objects.filter(is_active=True).order_by('code')
+    # Previous school year, for the year-over-year trend
+    previous_school_year = SchoolYear.objects.filter(
+        start_date__lt=active_school_year.start_date
+    ).order_by('-start_date').first()
+    
+    # Active programs with their sections and capacity this school year
+    in_active_year = Q(sections__school_year=active_school_year)
+    programs = Program.objects.filter(is_active=True).annotate(
+        section_count=Count('sections', filter=in_active_year),
+        capacity=Coalesce(Sum('sections__max_students', filter=in_active_year), 0),
+    ).order_by('code').values('code', 'name', 'section_count', 'capacity')
+    
+    # Applicant counts per program code
+    selection_counts = {
+        row['selected_program_code']: row
+        for row in ProgramSelection.objects.filter(
+            school_year__in=[year for year in [active_school_year, previous_school_year] if year]
+        ).values('selected_program_code').annotate(
+            total=Count('pk', filter=Q(school_year=active_school_year)),
+            approved=Count('pk', filter=Q(school_year=active_school_year, student__enrollment_status='approved')),
+            pending=Count('pk', filter=Q(
+                school_year=active_school_year,
+                student__enrollment_status__in=['submitted', 'under_review'],
+            )),
+            rejected=Count('pk', filter=Q(school_year=active_school_year, student__enrollment_status='rejected')),
+            previous_total=Count('pk', filter=Q(school_year=previous_school_year)),
+        )
+    }
+    empty_counts = {'total': 0, 'approved': 0, 'pending': 0, 'rejected': 0, 'previous_total': 0}
     
     programs_data = []
     total_approved = 0
@@ -240,43 +265,31 @@ def dashboard_programs_overview(request):
     total_rejected = 0
     
     for program in programs:
-        # Get program statistics
-        program_students = ProgramSelection.objects.filter(
-            school_year=active_school_year,
-            selected_program_code=program.code
-        ).select_related('student')
-        
-        total = program_students.count()
-        approved = program_students.filter(student__enrollment_status='approved').count()
-        pending = program_students.filter(student__enrollment_status__in=['submitted', 'under_review']).count()
-        rejected = program_students.filter(student__enrollment_status='rejected').count()
-        
-        # Get sections for this program
-        sections = Section.objects.filter(
-            school_year=active_school_year,
-            program=program
-        )
-        section_count = sections.count()
-        capacity = sum(s.max_students for s in sections)
+        counts = selection_counts.get(program['code'], empty_counts)
+        approved = counts['approved']
+        pending = counts['pending']
+        rejected = counts['rejected']
         
         # Calculate acceptance rate
         reviewed = approved + rejected
         acceptance_rate = (approved / reviewed * 100) if reviewed > 0 else 0
         
-        # Determine trend (you can calculate from previous year if needed)
-        trend = 'stable'
-        trend_value = 0
+        # Applicants compared with the previous school year
+        if previous_school_year:
+            trend, trend_value = get_trend(counts['total'], counts['previous_total'])
+        else:
+            trend, trend_value = 'stable', 0
         
         programs_data.append({
-            'code': program.code,
-            'name': program.name,
+            'code': program['code'],
+            'name': program['name'],
             'status': 'active',
-            'total_applicants': total,
+            'total_applicants': counts['total'],
             'approved': approved,
             'pending': pending,
             'rejected': rejected,
-            'capacity': capacity,
-            'sections': section_count,
+            'capacity': program['capacity'],
+            'sections': program['section_count'],
             'acceptance_rate': round(acceptance_rate, 1),
             'trend': trend,
             'trend_value': trend_value
@@ -301,6 +314,20 @@ def dashboard_programs_overview(request):
     })
 
 
+def get_trend(current, previous):
+    """
+    Helper function to compare a count with last year's
+    Returns: ('up' | 'down' | 'stable', percent change without sign)
+    """
+    if current == previous:
+        return 'stable', 0
+    if not previous:
+        return 'up', 100
+    
+    change = (current - previous) / previous * 100
+    return ('up' if change > 0 else 'down'), round(abs(change), 1)
+
+
 def get_time_ago(dt):
     """
     Helper function to get human-readable time difference
@@ -2,10 +2,21 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from admin_app.decorators import admin_required
 from admin_app.models import Program, SchoolYear, UserProfile
 from enrollment_app.models import Student, StudentData, ProgramSelection, SurveyData
+from enrollment_app.services.dashboard_cache import get_dashboard_payload
+from enrollment_app.services.tabular_export import EXPORT_FORMATS, streaming_export_response
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+import binascii
+import hashlib
+import json
 
 
 def _get_school_year_from_request(request):
@@ -17,12 +28,8 @@ def _get_school_year_from_request(request):
 
 
 def _base_student_queryset(school_year=None):
-    qs = Student.objects.select_related(
-        'student_data',
-        'program_selection',
-        'survey_data',
-        'school_year'
-    )
+    """Students of a school year, without joins (filters add the ones they need)."""
+    qs = Student.objects.all()
     if school_year:
         qs = qs.filter(school_year=school_year)
     return qs
@@ -69,122 +76,293 @@ def enrollment_detail(request, student_id):
 
 
 @admin_required
-def enrollment_header_data(request):
-    """
-    API endpoint for enrollment header data
-    Returns: school year, user fullname, role, and photo/initials
-    """
-    # Get active school year
-    active_school_year = SchoolYear.get_active_school_year()
-    
-    # Get user profile
-    try:
-        user_profile = UserProfile.objects.select_related('program', 'position', 'department').get(user=request.user)
-    except UserProfile.DoesNotExist:
-        user_profile = None
-    
-    # Get user's full name
-    user = request.user
-    full_name = f"{user.first_name} {user.last_name}" if user.first_name and user.last_name else user.username
-    
-    # Get initials
-    if user.first_name and user.last_name:
-        initials = f"{user.first_name[0]}{user.last_name[0]}".upper()
-    elif user.first_name:
-        initials = user.first_name[0].upper()
-    elif user.last_name:
-        initials = user.last_name[0].upper()
-    else:
-        initials = user.username[0].upper() if user.username else "U"
-    
-    # Get role
-    role = user_profile.get_user_type_display() if user_profile else "Admin"
-    
-    # Get photo URL
-    photo_url = None
-    if user_profile and user_profile.photo:
-        photo_url = user_profile.photo.url
-    
+def enrollment_summary(request):
+    """Return counts for enrollment requests by status (one aggregate query)."""
+    school_year = _get_school_year_from_request(request)
+    filters, _ = _enrollment_request_filters(request)
+
+    counts = _enrollment_status_counts(_base_student_queryset(school_year).filter(filters))
+
     data = {
-        'school_year': active_school_year.year_label if active_school_year else 'No Active Year',
-        'full_name': full_name,
-        'role': role,
-        'initials': initials,
-        'photo_url': photo_url,
-        'program': user_profile.get_program_name() if user_profile else 'N/A',
+        'school_year': school_year.year_label if school_year else None,
+        **counts,
     }
-    
     return JsonResponse(data)
 
 
-@admin_required
-def enrollment_summary(request):
-    """Return counts for enrollment requests by status."""
-    school_year = _get_school_year_from_request(request)
-    program_filter = request.GET.get('program')
+# Server-side sort options: ordering columns, each (field, descending).
+# The last column is unique so the keyset cursor identifies one row.
+REQUEST_SORTS = {
+    '-created_at': [('created_at', True), ('lrn', True)],
+    'created_at': [('created_at', False), ('lrn', False)],
+    'name': [('sort_last_name', False), ('sort_first_name', False), ('lrn', False)],
+    '-name': [('sort_last_name', True), ('sort_first_name', True), ('lrn', True)],
+    'lrn': [('lrn', False)],
+    '-lrn': [('lrn', True)],
+}
+DEFAULT_REQUEST_SORT = '-created_at'
+REQUEST_PAGE_SIZE = 50
+MAX_REQUEST_PAGE_SIZE = 200
 
-    qs = _base_student_queryset(school_year)
-    qs = qs.exclude(enrollment_status='draft')
+# Rows fetched per round trip by the streaming exports
+EXPORT_CHUNK_SIZE = 2000
 
-    if program_filter and program_filter.lower() != 'all':
-        qs = qs.filter(program_selection__selected_program_code__iexact=program_filter)
 
-    pending_statuses = ['submitted', 'under_review']
+PENDING_STATUSES = ['submitted', 'under_review']
 
-    data = {
-        'school_year': school_year.year_label if school_year else None,
-        'total_requests': qs.count(),
-        'approved': qs.filter(enrollment_status='approved').count(),
-        'pending': qs.filter(enrollment_status__in=pending_statuses).count(),
-        'rejected': qs.filter(enrollment_status='rejected').count(),
-    }
-    return JsonResponse(data)
 
+def _enrollment_request_filters(request):
+    """
+    Filters of the enrollment page as Q objects.
 
-@admin_required
-def enrollment_requests(request):
-    """Return list of enrollment requests with filters."""
-    school_year = _get_school_year_from_request(request)
+    Returns (filters, status_filter): filters holds the program and
+    name/LRN search (and leaves out drafts); status_filter is kept apart so
+    the status counts can be taken before it is applied.
+    """
     program_filter = request.GET.get('program')
     status_filter = request.GET.get('status')
+    search = request.GET.get('q', '').strip()
 
-    qs = _base_student_queryset(school_year)
-    qs = qs.exclude(enrollment_status='draft')
+    filters = ~Q(enrollment_status='draft')
 
     if program_filter and program_filter.lower() != 'all':
-        qs = qs.filter(program_selection__selected_program_code__iexact=program_filter)
+        filters &= Q(program_selection__selected_program_code__iexact=program_filter)
+
+    # Every word must match the LRN (prefix) or a name
+    for term in search.split():
+        filters &= (
+            Q(lrn__startswith=term)
+            | Q(student_data__last_name__icontains=term)
+            | Q(student_data__first_name__icontains=term)
+            | Q(student_data__middle_name__icontains=term)
+        )
 
+    status_q = Q()
     if status_filter and status_filter.lower() != 'all':
         if status_filter == 'pending':
-            qs = qs.filter(enrollment_status__in=['submitted', 'under_review'])
+            status_q = Q(enrollment_status__in=PENDING_STATUSES)
         else:
-            qs = qs.filter(enrollment_status=status_filter)
+            status_q = Q(enrollment_status=status_filter)
+
+    return filters, status_q
+
+
+def _enrollment_status_counts(qs, status_filter=None):
+    """
+    Status buckets of a filtered queryset in one aggregate() query.
+
+    With status_filter, 'matching' is also counted: the rows the status
+    filter keeps (the request list total).
+    """
+    counts = {
+        'total_requests': Count('pk'),
+        'approved': Count('pk', filter=Q(enrollment_status='approved')),
+        'pending': Count('pk', filter=Q(enrollment_status__in=PENDING_STATUSES)),
+        'rejected': Count('pk', filter=Q(enrollment_status='rejected')),
+    }
+    if status_filter is not None:
+        counts['matching'] = Count('pk', filter=status_filter) if status_filter else Count('pk')
+    return qs.aggregate(**counts)
+
+
+# Columns read for each listed request
+REQUEST_COLUMNS = (
+    'lrn', 'created_at', 'enrollment_status', 'sort_last_name', 'sort_first_name',
+    'student_data__first_name', 'student_data__middle_name', 'student_data__last_name',
+    'student_data__previous_grade_section',
+    'program_selection__selected_program_code',
+    'survey_data__current_grade_section',
+)
+
+
+def _with_sort_columns(qs):
+    """Name columns for sorting (students without student_data sort as '')."""
+    return qs.annotate(
+        sort_last_name=Coalesce('student_data__last_name', Value('')),
+        sort_first_name=Coalesce('student_data__first_name', Value('')),
+    )
+
+
+def _ordering(sort_fields):
+    return [f'-{field}' if descending else field for field, descending in sort_fields]
+
+
+def _grade_level(row):
+    return (
+        row['survey_data__current_grade_section']
+        or row['student_data__previous_grade_section']
+        or 'N/A'
+    )
+
+
+def _encode_cursor(row, sort_fields):
+    values = [row[field] for field, _ in sort_fields]
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_cursor(cursor, sort_fields):
+    """Cursor values by sort field; ValueError if the cursor is malformed."""
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError, binascii.Error):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(sort_fields):
+        raise ValueError('Invalid cursor')
+
+    decoded = {}
+    for (field, _), value in zip(sort_fields, values):
+        if field == 'created_at':
+            value = parse_datetime(value) if isinstance(value, str) else None
+        if not isinstance(value, (str, datetime)):
+            raise ValueError('Invalid cursor')
+        decoded[field] = value
+    return decoded
+
+
+def _after_cursor(sort_fields, values):
+    """Q for rows after the cursor: (a, b) > (x, y) as (a > x) OR (a = x AND b > y)"""
+    condition = Q()
+    equal = {}
+    for field, descending in sort_fields:
+        lookup = 'lt' if descending else 'gt'
+        condition |= Q(**equal, **{f'{field}__{lookup}': values[field]})
+        equal[field] = values[field]
+    return condition
+
+
+@admin_required
+def enrollment_requests(request):
+    """
+    Return one page of enrollment requests with filters.
+
+    Query parameters: program, status, q (name/LRN search), sort (see
+    REQUEST_SORTS), limit, cursor (next_cursor of the previous page),
+    include_total=1 for the total row count (cached briefly) and
+    include_summary=1 for the enrollment_summary counts as well.
+    """
+    school_year = _get_school_year_from_request(request)
+    sort = request.GET.get('sort', DEFAULT_REQUEST_SORT)
+    sort_fields = REQUEST_SORTS.get(sort)
+    if sort_fields is None:
+        return JsonResponse({'error': f'Unknown sort: {sort}'}, status=400)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', REQUEST_PAGE_SIZE)), 1), MAX_REQUEST_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+
+    filters, status_filter = _enrollment_request_filters(request)
+    filtered = _base_student_queryset(school_year).filter(filters)
+    qs = filtered.filter(status_filter)
+
+    page = _with_sort_columns(qs)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            page = page.filter(_after_cursor(sort_fields, _decode_cursor(cursor, sort_fields)))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+    # Only the displayed columns; one extra row tells whether there is a next page
+    rows = list(page.order_by(*_ordering(sort_fields)).values(*REQUEST_COLUMNS)[:limit + 1])
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Same URL for every row apart from the LRN
+    detail_url = reverse('admin_app:student_edit', args=['__lrn__'])
 
     results = []
-    for student in qs:
-        student_data = getattr(student, 'student_data', None)
-        program_selection = getattr(student, 'program_selection', None)
-        survey_data = getattr(student, 'survey_data', None)
-
-        full_name = student_data.full_name if student_data else 'N/A'
-        program_code = program_selection.selected_program_code if program_selection else 'N/A'
-        grade_level = (
-            survey_data.current_grade_section
-            if survey_data and survey_data.current_grade_section
-            else (student_data.previous_grade_section if student_data else None)
-        ) or 'N/A'
+    for row in rows:
+        if row['student_data__first_name'] is not None:
+            full_name = ' '.join(filter(None, [
+                row['student_data__first_name'],
+                row['student_data__middle_name'],
+                row['student_data__last_name'],
+            ]))
+        else:
+            full_name = 'N/A'
 
         results.append({
-            'lrn': student.lrn,
+            'lrn': row['lrn'],
             'student_name': full_name,
-            'program': program_code,
-            'grade': grade_level,
-            'submitted_at': student.created_at.strftime('%b %d, %Y'),
-            'status': student.enrollment_status,
-            'detail_url': reverse('admin_app:student_edit', args=[student.lrn]),
+            'program': row['program_selection__selected_program_code'] or 'N/A',
+            'grade': _grade_level(row),
+            'submitted_at': row['created_at'].strftime('%b %d, %Y'),
+            'status': row['enrollment_status'],
+            'detail_url': detail_url.replace('__lrn__', row['lrn']),
         })
 
-    return JsonResponse({
+    data = {
         'results': results,
-        'total': qs.count(),
-    })
\ No newline at end of file
+        'next_cursor': _encode_cursor(rows[-1], sort_fields) if has_more else None,
+        'has_more': has_more,
+        'total': None,
+    }
+
+    if request.GET.get('include_summary') == '1':
+        # Status cards and list total from the same aggregate query
+        counts = _enrollment_status_counts(filtered, status_filter)
+        data['total'] = counts.pop('matching')
+        data['summary'] = {
+            'school_year': school_year.year_label if school_year else None,
+            **counts,
+        }
+    elif request.GET.get('include_total') == '1':
+        filters = [school_year.pk if school_year else None] + [
+            request.GET.get(name, '') for name in ('program', 'status', 'q')
+        ]
+        filter_hash = hashlib.md5(json.dumps(filters).encode()).hexdigest()
+        data['total'] = get_dashboard_payload(f'enrollment_requests_total:{filter_hash}', qs.count)
+
+    return JsonResponse(data)
+
+
+@admin_required
+def enrollment_requests_export(request):
+    """
+    Stream the filtered enrollment requests as CSV or XLSX (?format=xlsx).
+
+    Takes the same program, status, q and sort parameters as
+    enrollment_requests; rows are read with a server-side cursor.
+    """
+    school_year = _get_school_year_from_request(request)
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Unknown format: {file_format}'}, status=400)
+
+    sort = request.GET.get('sort', DEFAULT_REQUEST_SORT)
+    sort_fields = REQUEST_SORTS.get(sort)
+    if sort_fields is None:
+        return JsonResponse({'error': f'Unknown sort: {sort}'}, status=400)
+
+    filters, status_filter = _enrollment_request_filters(request)
+    qs = _with_sort_columns(
+        _base_student_queryset(school_year).filter(filters).filter(status_filter)
+    ).order_by(*_ordering(sort_fields)).values(*REQUEST_COLUMNS)
+
+    status_labels = dict(Student.STATUS_CHOICES)
+
+    def rows():
+        for row in qs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield [
+                row['lrn'],
+                row['student_data__last_name'],
+                row['student_data__first_name'],
+                row['student_data__middle_name'],
+                row['program_selection__selected_program_code'],
+                _grade_level(row),
+                status_labels.get(row['enrollment_status'], row['enrollment_status']),
+                timezone.localtime(row['created_at']).strftime('%Y-%m-%d %H:%M'),
+            ]
+
+    label = school_year.year_label if school_year else 'all'
+    return streaming_export_response(
+        file_format,
+        f'enrollment_requests_{label}',
+        ['LRN', 'Last Name', 'First Name', 'Middle Name', 'Program', 'Grade', 'Status', 'Submitted At'],
+        rows(),
+        sheet_name='Enrollment Requests',
+    )
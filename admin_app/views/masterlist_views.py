@@ -1,5 +1,12 @@
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from admin_app.models import Section
+from enrollment_app.models import Student
+from enrollment_app.services.tabular_export import EXPORT_FORMATS, streaming_export_response
+from .enrollment_views import (
+    EXPORT_CHUNK_SIZE, _enrollment_request_filters, _with_sort_columns
+)
 
 @login_required
 def masterlist(request):
@@ -7,4 +14,53 @@ def masterlist(request):
 
 @login_required
 def masterlist_by_section(request, section_id):
-    return render(request, 'admin_app/masterlist.html', {'section_id': section_id})
\ No newline at end of file
+    return render(request, 'admin_app/masterlist.html', {'section_id': section_id})
+
+@login_required
+def masterlist_export(request, section_id):
+    """
+    Stream a section's masterlist as CSV or XLSX (?format=xlsx)
+
+    Students placed in the section (ProgramSelection.assigned_section),
+    narrowed by the enrollment page filters (program, status, q), sorted by
+    name and read with a server-side cursor.
+    """
+    section = get_object_or_404(Section.objects.select_related('program', 'school_year'), pk=section_id)
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Unknown format: {file_format}'}, status=400)
+
+    filters, status_filter = _enrollment_request_filters(request)
+    qs = _with_sort_columns(
+        Student.objects.filter(program_selection__assigned_section=str(section.pk))
+        .filter(filters)
+        .filter(status_filter)
+    ).order_by('sort_last_name', 'sort_first_name', 'lrn').values_list(
+        'lrn',
+        'student_data__last_name',
+        'student_data__first_name',
+        'student_data__middle_name',
+        'student_data__gender',
+        'program_selection__selected_program_code',
+        'academic_data__overall_average',
+        'enrollment_status',
+    )
+
+    status_labels = dict(Student.STATUS_CHOICES)
+
+    def rows():
+        for number, row in enumerate(qs.iterator(chunk_size=EXPORT_CHUNK_SIZE), start=1):
+            lrn, last_name, first_name, middle_name, gender, program, average, status = row
+            yield [
+                number, lrn, last_name, first_name, middle_name, gender, program,
+                float(average) if average is not None else None,
+                status_labels.get(status, status),
+            ]
+
+    return streaming_export_response(
+        file_format,
+        f'masterlist_{section.program.code}_{section.name}'.replace(' ', '_'),
+        ['No.', 'LRN', 'Last Name', 'First Name', 'Middle Name', 'Gender', 'Program', 'General Average', 'Status'],
+        rows(),
+        sheet_name=f'{section.program.code} {section.name}',
+    )
@@ -6,6 +6,7 @@ from django.contrib.auth.models import User
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from admin_app.models import UserProfile, Position, Department, Program, SystemSettings, StaffMember, ActivityLog, Building, Room, Section, SchoolYear
+from enrollment_app.services.landing_cache import invalidate_landing_page
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from datetime import datetime
@@ -46,50 +47,6 @@ def log_activity(user, action, description, request=None):
 def settings(request):
     return render(request, 'admin_app/settings.html')
 
-@login_required
-@require_http_methods(["GET"])
-def settings_header_data(request):
-    """
-    API endpoint for settings header data
-    Returns: school year, user fullname, role, and photo/initials
-    """
-    from admin_app.models import SchoolYear, UserProfile
-    
-    # Get active school year
-    active_school_year = SchoolYear.get_active_school_year()
-    
-    # Get user profile
-    try:
-        user_profile = UserProfile.objects.select_related(
-            'program', 'position', 'department'
-        ).get(user=request.user)
-    except UserProfile.DoesNotExist:
-        user_profile = None
-    
-    user = request.user
-    full_name = f"{user.first_name} {user.last_name}" if user.first_name and user.last_name else user.username
-    
-    # Get initials
-    if user.first_name and user.last_name:
-        initials = f"{user.first_name[0]}{user.last_name[0]}".upper()
-    elif user.first_name:
-        initials = user.first_name[0].upper()
-    elif user.last_name:
-        initials = user.last_name[0].upper()
-    else:
-        initials = user.username[0].upper() if user.username else "U"
-    
-    role = user_profile.get_user_type_display() if user_profile else "Admin"
-    photo_url = user_profile.photo.url if user_profile and user_profile.photo else None
-    
-    return JsonResponse({
-        'school_year': active_school_year.year_label if active_school_year else 'No Active Year',
-        'full_name': full_name,
-        'role': role,
-        'initials': initials,
-        'photo_url': photo_url,
-    })
-
 @login_required
 def manage_users(request):
     return render(request, 'admin_app/settings.html', {'tab': 'users'})
@@ -541,6 +498,8 @@ def save_content_setting(request):
             setting.updated_by = request.user
             setting.save()
         
+        invalidate_landing_page()
+        
         # Log activity
         action_type = 'content_updated'
         log_activity(
@@ -589,6 +548,8 @@ def upload_content_image(request):
         setting.updated_by = request.user
         setting.save()
         
+        invalidate_landing_page()
+        
         return JsonResponse({
             'message': 'Image uploaded successfully',
             'image_url': setting.image.url,
@@ -206,7 +206,7 @@ def get_student_details(request, student_id):
                 'working_type': acad.working_type or '',
                 'is_pwd': acad.is_pwd,
                 'disability_type': acad.disability_type or '',
-                'overall_average': float(acad.overall_average),
+                'overall_average': float(acad.overall_average or 0),
             }
         else:
             data['academic_data'] = None
@@ -421,11 +421,13 @@ def update_academic_data(request, student_id):
             academic_data.disability_type = data['disability_type']
         
         academic_data.save()
+        # The average is computed by the database on save
+        academic_data.refresh_from_db(fields=['overall_average'])
         
         return JsonResponse({
             'success': True, 
             'message': 'Academic data updated successfully',
-            'overall_average': float(academic_data.overall_average)
+            'overall_average': float(academic_data.overall_average or 0)
         })
         
     except Exception as e:
@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-17 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollment_app', '0004_alter_student_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OCRJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_lrn', models.CharField(db_index=True, max_length=12)),
+                ('image_path', models.CharField(max_length=500)),
+                ('manual_grades', models.JSONField(default=dict, help_text='Typed grades at upload time')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('worker', models.CharField(blank=True, max_length=100, null=True)),
+                ('ocr_verified', models.BooleanField(blank=True, null=True)),
+                ('ocr_mismatches', models.JSONField(blank=True, default=list)),
+                ('extracted_grades', models.JSONField(blank=True, default=dict)),
+                ('confidence', models.FloatField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'ocr_jobs',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='ocr_jobs_status_36cb24_idx')],
+            },
+        ),
+    ]
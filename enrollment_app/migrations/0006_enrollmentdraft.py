@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-17 20:40
+
+import enrollment_app.models
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollment_app', '0005_ocrjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentDraft',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('session_key', models.CharField(blank=True, db_index=True, max_length=40, null=True)),
+                ('lrn', models.CharField(blank=True, db_index=True, max_length=12, null=True)),
+                ('lrn_verified', models.BooleanField(default=False)),
+                ('lrn_verified_at', models.DateTimeField(blank=True, null=True)),
+                ('student_data', models.JSONField(blank=True, encoder=enrollment_app.models.CompactJSONEncoder, null=True)),
+                ('family_data', models.JSONField(blank=True, encoder=enrollment_app.models.CompactJSONEncoder, null=True)),
+                ('survey_data', models.JSONField(blank=True, encoder=enrollment_app.models.CompactJSONEncoder, null=True)),
+                ('academic_data', models.JSONField(blank=True, encoder=enrollment_app.models.CompactJSONEncoder, null=True)),
+                ('program_selection', models.JSONField(blank=True, encoder=enrollment_app.models.CompactJSONEncoder, null=True)),
+                ('recommendations', models.JSONField(blank=True, encoder=enrollment_app.models.CompactJSONEncoder, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'enrollment_drafts',
+                'indexes': [models.Index(fields=['updated_at'], name='enrollment__updated_ad84c2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-17 15:10
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollment_app', '0006_enrollmentdraft'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicdata',
+            name='min_subject_grade',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(models.Case(models.When(models.Q(('araling_panlipunan__isnull', True), ('edukasyon_pangkabuhayan__isnull', True), ('edukasyon_sa_pagpapakatao__isnull', True), ('english__isnull', True), ('filipino__isnull', True), ('mapeh__isnull', True), ('mathematics__isnull', True), ('science__isnull', True)), then=models.Value(None)), default=django.db.models.functions.comparison.Least(django.db.models.functions.comparison.Coalesce(models.F('mathematics'), models.Value(Decimal('100'))), django.db.models.functions.comparison.Coalesce(models.F('araling_panlipunan'), models.Value(Decimal('100'))), django.db.models.functions.comparison.Coalesce(models.F('english'), models.Value(Decimal('100'))), django.db.models.functions.comparison.Coalesce(models.F('edukasyon_sa_pagpapakatao'), models.Value(Decimal('100'))), django.db.models.functions.comparison.Coalesce(models.F('science'), models.Value(Decimal('100'))), django.db.models.functions.comparison.Coalesce(models.F('edukasyon_pangkabuhayan'), models.Value(Decimal('100'))), django.db.models.functions.comparison.Coalesce(models.F('filipino'), models.Value(Decimal('100'))), django.db.models.functions.comparison.Coalesce(models.F('mapeh'), models.Value(Decimal('100'))))), models.DecimalField(decimal_places=2, max_digits=5)), output_field=models.DecimalField(decimal_places=2, max_digits=5)),
+        ),
+        migrations.AddField(
+            model_name='academicdata',
+            name='overall_average',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Coalesce(models.F('mathematics'), models.Value(Decimal('0'))), '+', django.db.models.functions.comparison.Coalesce(models.F('araling_panlipunan'), models.Value(Decimal('0')))), '+', django.db.models.functions.comparison.Coalesce(models.F('english'), models.Value(Decimal('0')))), '+', django.db.models.functions.comparison.Coalesce(models.F('edukasyon_sa_pagpapakatao'), models.Value(Decimal('0')))), '+', django.db.models.functions.comparison.Coalesce(models.F('science'), models.Value(Decimal('0')))), '+', django.db.models.functions.comparison.Coalesce(models.F('edukasyon_pangkabuhayan'), models.Value(Decimal('0')))), '+', django.db.models.functions.comparison.Coalesce(models.F('filipino'), models.Value(Decimal('0')))), '+', django.db.models.functions.comparison.Coalesce(models.F('mapeh'), models.Value(Decimal('0')))), models.FloatField()), '/', django.db.models.functions.comparison.Cast(django.db.models.functions.comparison.NullIf(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.Case(models.When(models.Q(('mathematics__isnull', False)), then=models.Value(1)), default=models.Value(0)), '+', models.Case(models.When(models.Q(('araling_panlipunan__isnull', False)), then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(models.Q(('english__isnull', False)), then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(models.Q(('edukasyon_sa_pagpapakatao__isnull', False)), then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(models.Q(('science__isnull', False)), then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(models.Q(('edukasyon_pangkabuhayan__isnull', False)), then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(models.Q(('filipino__isnull', False)), then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(models.Q(('mapeh__isnull', False)), then=models.Value(1)), default=models.Value(0))), models.Value(0)), models.FloatField())), models.DecimalField(decimal_places=2, max_digits=5)), output_field=models.DecimalField(decimal_places=2, max_digits=5)),
+        ),
+        migrations.AddIndex(
+            model_name='academicdata',
+            index=models.Index(fields=['overall_average', 'min_subject_grade'], name='academic_da_overall_5b3a79_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='academicdata',
+            index=models.Index(fields=['min_subject_grade'], name='academic_da_min_sub_0a8a17_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_app', '0010_userprofile_photo'),
+        ('enrollment_app', '0007_academicdata_grade_summaries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school_year', 'created_at', 'lrn'], name='students_school__d7243a_idx'),
+        ),
+    ]
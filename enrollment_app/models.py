@@ -3,7 +3,14 @@ Enrollment App Models
 Handles student enrollment, family data, survey responses, and academic records
 """
 
+import uuid
+from decimal import Decimal
+from functools import reduce
+
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Cast, Coalesce, Least, NullIf
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -78,6 +85,8 @@ class Student(models.Model):
             models.Index(fields=['enrollment_status']),
             models.Index(fields=['school_year']),
             models.Index(fields=['created_at']),
+            # Keyset pagination of the enrollment requests list
+            models.Index(fields=['school_year', 'created_at', 'lrn']),
         ]
     
     def __str__(self):
@@ -551,6 +560,26 @@ class SurveyData(models.Model):
 # ===================================================================
 # ACADEMIC DATA MODEL
 # ===================================================================
+GRADE_FIELDS = [
+    'mathematics', 'araling_panlipunan', 'english', 'edukasyon_sa_pagpapakatao',
+    'science', 'edukasyon_pangkabuhayan', 'filipino', 'mapeh',
+]
+
+# Number of subjects with a grade (blank subjects are left out of the average)
+_GRADED_SUBJECTS = reduce(lambda a, b: a + b, [
+    Case(When(Q(**{f'{name}__isnull': False}), then=Value(1)), default=Value(0))
+    for name in GRADE_FIELDS
+])
+
+
+def _grade_summary_field(expression):
+    return models.GeneratedField(
+        expression=Cast(expression, models.DecimalField(max_digits=5, decimal_places=2)),
+        output_field=models.DecimalField(max_digits=5, decimal_places=2),
+        db_persist=True,
+    )
+
+
 class AcademicData(models.Model):
     DOST_RESULT_CHOICES = [
         ('passed', 'Passed'),
@@ -640,6 +669,23 @@ class AcademicData(models.Model):
     is_pwd = models.BooleanField(default=False)
     disability_type = models.TextField(blank=True, null=True)
     
+    # Grade summaries computed by the database from the subject columns
+    # (NULL when no subject has a grade), so applicants can be filtered and
+    # ranked in SQL, e.g. overall_average__gte=90, min_subject_grade__gte=85
+    overall_average = _grade_summary_field(
+        Cast(
+            reduce(lambda a, b: a + b, [Coalesce(F(name), Value(Decimal('0'))) for name in GRADE_FIELDS]),
+            models.FloatField(),
+        )
+        / Cast(NullIf(_GRADED_SUBJECTS, Value(0)), models.FloatField())
+    )
+    min_subject_grade = _grade_summary_field(
+        Case(
+            When(Q(**{f'{name}__isnull': True for name in GRADE_FIELDS}), then=Value(None)),
+            default=Least(*[Coalesce(F(name), Value(Decimal('100'))) for name in GRADE_FIELDS]),
+        )
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -647,32 +693,12 @@ class AcademicData(models.Model):
         db_table = 'academic_data'
         indexes = [
             models.Index(fields=['dost_exam_result']),
+            models.Index(fields=['overall_average', 'min_subject_grade']),
+            models.Index(fields=['min_subject_grade']),
         ]
     
     def __str__(self):
         return f"Academic Data - {self.student.lrn} (Avg: {self.overall_average})"
-    
-    @property
-    def overall_average(self):
-        """Calculate overall average of all subjects"""
-        subjects = [
-            self.mathematics,
-            self.araling_panlipunan,
-            self.english,
-            self.edukasyon_sa_pagpapakatao,
-            self.science,
-            self.edukasyon_pangkabuhayan,
-            self.filipino,
-            self.mapeh
-        ]
-        
-        # Filter out None values
-        valid_subjects = [s for s in subjects if s is not None]
-        
-        if not valid_subjects:
-            return 0
-        
-        return round(sum(valid_subjects) / len(valid_subjects), 2)
 
 # ===================================================================
 # PROGRAM SELECTION MODEL
@@ -782,4 +808,100 @@ class EnrollmentStatusLog(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.student.lrn}: {self.old_status} → {self.new_status}"
\ No newline at end of file
+        return f"{self.student.lrn}: {self.old_status} → {self.new_status}"
+
+# ===================================================================
+# OCR JOB MODEL (Background report card verification queue)
+# ===================================================================
+class OCRJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    # Jobs are created before the Student row exists, so keep the LRN as text
+    student_lrn = models.CharField(max_length=12, db_index=True)
+    image_path = models.CharField(max_length=500)
+    manual_grades = models.JSONField(default=dict, help_text="Typed grades at upload time")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, null=True)
+    
+    # Results (read by the academic page while polling)
+    ocr_verified = models.BooleanField(null=True, blank=True)
+    ocr_mismatches = models.JSONField(default=list, blank=True)
+    extracted_grades = models.JSONField(default=dict, blank=True)
+    confidence = models.FloatField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'ocr_jobs'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"OCR job {self.pk} - {self.student_lrn} ({self.status})"
+
+
+
+# ===================================================================
+# ENROLLMENT DRAFT MODEL (Wizard data before submission)
+# ===================================================================
+class CompactJSONEncoder(DjangoJSONEncoder):
+    """JSON without the default ', ' / ': ' padding"""
+    item_separator = ','
+    key_separator = ':'
+
+
+class EnrollmentDraft(models.Model):
+    """
+    Server-side storage for the enrollment wizard
+    
+    The session only holds the draft ID. Each wizard step has its own JSON
+    column, so a step reads and writes just its own section
+    (see EnrollmentSessionManager).
+    """
+    SECTION_FIELDS = [
+        'student_data',
+        'family_data',
+        'survey_data',
+        'academic_data',
+        'program_selection',
+        'recommendations',
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    session_key = models.CharField(max_length=40, blank=True, null=True, db_index=True)
+    
+    lrn = models.CharField(max_length=12, blank=True, null=True, db_index=True)
+    lrn_verified = models.BooleanField(default=False)
+    lrn_verified_at = models.DateTimeField(null=True, blank=True)
+    
+    # One column per wizard step
+    student_data = models.JSONField(null=True, blank=True, encoder=CompactJSONEncoder)
+    family_data = models.JSONField(null=True, blank=True, encoder=CompactJSONEncoder)
+    survey_data = models.JSONField(null=True, blank=True, encoder=CompactJSONEncoder)
+    academic_data = models.JSONField(null=True, blank=True, encoder=CompactJSONEncoder)
+    program_selection = models.JSONField(null=True, blank=True, encoder=CompactJSONEncoder)
+    recommendations = models.JSONField(null=True, blank=True, encoder=CompactJSONEncoder)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'enrollment_drafts'
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"Enrollment draft {self.pk} ({self.lrn or 'no LRN'})"
@@ -0,0 +1,305 @@
+"""
+Batch Program Recommendation Service
+Scores a whole cohort of students at once using columnar NumPy arrays.
+
+Both engines evaluate the same compiled rules (see program_rules.py), so the per-student
+output of BatchRecommendationEngine.get_recommendation_summaries() is the
+same as calling generate_academic_recommendations() for each student.
+"""
+
+import numpy as np
+
+from .program_rules import CHARACTERISTIC_FIELDS
+from .recommendation_service import ProgramRecommendationEngine
+
+
+# Characteristic columns (potential_genius maps onto 'active')
+CHARACTERISTIC_COLUMNS = CHARACTERISTIC_FIELDS
+
+
+class CohortArrays:
+    """
+    Columnar representation of a cohort of students
+
+    Every attribute is a NumPy array with one row per student.
+    """
+
+    def __init__(self, lrns, overall_average, grades, dost_exam_result,
+                 is_sped, is_working_student, interests, interested_program,
+                 characteristics):
+        self.lrns = np.asarray(lrns, dtype=object)
+        self.overall_average = np.asarray(overall_average, dtype=np.float64)
+        self.grades = np.asarray(grades, dtype=np.float64).reshape(len(self.lrns), -1)
+        self.dost_exam_result = np.asarray(dost_exam_result, dtype=object)
+        self.is_sped = np.asarray(is_sped, dtype=bool)
+        self.is_working_student = np.asarray(is_working_student, dtype=bool)
+        self.interests = np.asarray(interests, dtype=bool).reshape(len(self.lrns), -1)
+        self.interested_program = np.asarray(interested_program, dtype=object)
+        self.characteristics = np.asarray(characteristics, dtype=bool).reshape(len(self.lrns), -1)
+
+        # Lowest entered grade per student, 0 when no grades were entered
+        valid = self.grades > 0
+        self.min_subject_grade = np.where(
+            valid.any(axis=1),
+            np.where(valid, self.grades, np.inf).min(axis=1, initial=np.inf),
+            0,
+        )
+
+    def __len__(self):
+        return len(self.lrns)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build cohort arrays from per-student dictionaries
+
+        Args:
+            records: Iterable of (student_lrn, academic_data, survey_data, student_data)
+                tuples, using the same dictionaries accepted by
+                generate_academic_recommendations()
+
+        Returns:
+            CohortArrays
+        """
+        engine = ProgramRecommendationEngine
+
+        lrns = []
+        overall_average = []
+        grades = []
+        dost_exam_result = []
+        is_sped = []
+        is_working_student = []
+        interests = []
+        interested_program = []
+        characteristics = []
+
+        for student_lrn, academic_data, survey_data, student_data in records:
+            inputs = engine.normalize_inputs(academic_data, survey_data, student_data)
+
+            lrns.append(student_lrn)
+            overall_average.append(inputs['overall_average'])
+            grades.append(inputs['grades'])
+            dost_exam_result.append(inputs['dost_exam_result'])
+            is_sped.append(inputs['is_sped'])
+            is_working_student.append(inputs['is_working_student'])
+            interests.append(inputs['interests'])
+            interested_program.append(inputs['interested_program'])
+            characteristics.append([
+                inputs['characteristics'].get(char, False)
+                for char in CHARACTERISTIC_COLUMNS
+            ])
+
+        return cls(
+            lrns=lrns,
+            overall_average=overall_average,
+            grades=np.array(grades, dtype=np.float64).reshape(len(lrns), len(engine.SUBJECT_FIELDS)),
+            dost_exam_result=dost_exam_result,
+            is_sped=is_sped,
+            is_working_student=is_working_student,
+            interests=np.array(interests, dtype=bool).reshape(len(lrns), len(engine.INTEREST_FIELDS)),
+            interested_program=interested_program,
+            characteristics=np.array(characteristics, dtype=bool).reshape(len(lrns), len(CHARACTERISTIC_COLUMNS)),
+        )
+
+    @classmethod
+    def from_school_year(cls, school_year):
+        """
+        Build cohort arrays for every student of a school year with academic data
+
+        Reads AcademicData, SurveyData and StudentData in a single query.
+
+        Args:
+            school_year: SchoolYear instance
+
+        Returns:
+            CohortArrays
+        """
+        from enrollment_app.models import Student
+
+        subjects = ProgramRecommendationEngine.SUBJECT_FIELDS
+        rows = Student.objects.filter(
+            school_year=school_year,
+            academic_data__isnull=False,
+        ).order_by('lrn').values_list(
+            'lrn',
+            'academic_data__dost_exam_result',
+            'academic_data__overall_average',
+            *[f'academic_data__{subject}' for subject in subjects],
+            'student_data__is_sped',
+            'student_data__is_working_student',
+            'survey_data__interested_program',
+            'survey_data__survey_responses_json',
+        )
+
+        def records():
+            for row in rows:
+                lrn, dost_exam_result, overall_average = row[:3]
+                subject_grades = row[3:3 + len(subjects)]
+                is_sped, is_working, interested_program, survey_json = row[3 + len(subjects):]
+
+                academic_data = {'dost_exam_result': dost_exam_result or ''}
+                for subject, grade in zip(subjects, subject_grades):
+                    academic_data[subject] = float(grade) if grade is not None else ''
+
+                # Stored by the database (AcademicData.overall_average)
+                academic_data['overall_average'] = float(overall_average) if overall_average is not None else 0
+
+                survey_data = dict(survey_json or {})
+                survey_data.setdefault('interested_program', interested_program or '')
+
+                student_data = {
+                    'is_sped': bool(is_sped),
+                    'is_working_student': bool(is_working),
+                }
+                yield lrn, academic_data, survey_data, student_data
+
+        return cls.from_records(records())
+
+
+class BatchRecommendationEngine:
+    """
+    Vectorized counterpart of ProgramRecommendationEngine
+
+    Scores are (students x programs) matrices with columns ordered like
+    ProgramRecommendationEngine.PROGRAMS.
+    """
+
+    def __init__(self, cohort):
+        """
+        Args:
+            cohort: CohortArrays instance
+        """
+        self.cohort = cohort
+        self.compiled_rules = ProgramRecommendationEngine.get_compiled_rules()
+        self.program_codes = list(self.compiled_rules.keys())
+        self.academic_scores = None
+        self.non_academic_scores = None
+        self.overall_scores = None
+        self.percentage_match = None
+        self.qualifies = None
+        self.ranks = None
+
+    def generate_recommendations(self):
+        """
+        Score and rank every program for every student
+
+        Returns:
+            self, with the score, percentage and rank matrices filled in
+        """
+        self.academic_scores = self._evaluate_academic_criteria()
+        self.non_academic_scores = self._evaluate_non_academic_criteria()
+        self.overall_scores = (self.academic_scores + self.non_academic_scores) / 2
+        self.qualifies = (self.academic_scores > 0) | (self.non_academic_scores > 0)
+        self.percentage_match = np.where(self.qualifies, np.rint(self.overall_scores), 0).astype(np.int64)
+        self.ranks = self._rank_recommendations()
+        return self
+
+    def _evaluate_academic_criteria(self):
+        """Evaluate academic rules for each program"""
+        return self._evaluate(lambda rule: rule.academic)
+
+    def _evaluate_non_academic_criteria(self):
+        """Evaluate non-academic (survey) rules for each program"""
+        return self._evaluate(lambda rule: rule.non_academic)
+
+    def _evaluate(self, select_rule):
+        scores = np.zeros((len(self.cohort), len(self.program_codes)), dtype=np.float64)
+        for j, rule in enumerate(self.compiled_rules.values()):
+            scores[:, j] = select_rule(rule).evaluate_cohort(self.cohort)
+        return scores
+
+    def _rank_recommendations(self):
+        """
+        Rank qualifying programs per student by overall score (best first)
+
+        Ties keep program order, like the stable sort in the single-student
+        engine. Programs that do not qualify get rank 0.
+        """
+        sort_key = np.where(self.qualifies, -self.overall_scores, np.inf)
+        order = np.argsort(sort_key, axis=1, kind='stable')
+
+        ranks = np.empty_like(order)
+        positions = np.broadcast_to(np.arange(1, len(self.program_codes) + 1), order.shape)
+        np.put_along_axis(ranks, order, positions, axis=1)
+        ranks[~self.qualifies] = 0
+        return ranks
+
+    def get_recommendation_summaries(self):
+        """
+        Build per-student summaries in the generate_academic_recommendations() format
+
+        Returns:
+            Dictionary of student LRN -> recommendation summary
+        """
+        if self.ranks is None:
+            self.generate_recommendations()
+
+        engine = ProgramRecommendationEngine
+        rules = list(self.compiled_rules.values())
+        summaries = {}
+
+        unranked = len(self.program_codes) + 1
+        order = np.argsort(np.where(self.ranks > 0, self.ranks, unranked), axis=1, kind='stable')
+        counts = self.qualifies.sum(axis=1).tolist()
+
+        # Plain Python lists are much faster to index than NumPy scalars
+        order = order.tolist()
+        academic_scores = self.academic_scores.tolist()
+        non_academic_scores = self.non_academic_scores.tolist()
+        overall_scores = self.overall_scores.tolist()
+        percentage_match = self.percentage_match.tolist()
+        ranks = self.ranks.tolist()
+
+        for i, lrn in enumerate(self.cohort.lrns.tolist()):
+            recommendations = []
+            for j in order[i][:counts[i]]:
+                rule = rules[j]
+                # Fixed-score rules give ints in the single-student engine, fractions give floats
+                academic_score = academic_scores[i][j]
+                if not rule.academic.is_fraction:
+                    academic_score = int(academic_score)
+                non_academic_score = non_academic_scores[i][j]
+                if not rule.non_academic.is_fraction:
+                    non_academic_score = int(non_academic_score)
+                percentage = percentage_match[i][j]
+
+                criteria_met = []
+                if academic_score > 0:
+                    criteria_met.append('Academic Requirements')
+                if non_academic_score > 0:
+                    criteria_met.append('Non-Academic/Survey Requirements')
+
+                recommendations.append({
+                    'program_code': rule.code,
+                    'program_name': rule.name,
+                    'academic_score': academic_score,
+                    'non_academic_score': non_academic_score,
+                    'overall_score': overall_scores[i][j],
+                    'criteria_met': criteria_met,
+                    'total_criteria': rule.total_criteria,
+                    'percentage_match': percentage,
+                    'special_checks': rule.get_special_checks(),
+                    'rank': ranks[i][j],
+                    'recommendation_level': engine.get_recommendation_level(percentage),
+                })
+
+            single = engine(student_lrn=lrn, academic_data=None, survey_data=None, student_data=None)
+            single.recommendations = recommendations
+            summaries[lrn] = single.get_recommendation_summary()
+
+        return summaries
+
+
+def generate_cohort_recommendations(cohort):
+    """
+    Main function to generate recommendations for a whole cohort
+
+    Args:
+        cohort: CohortArrays instance (see CohortArrays.from_records / from_school_year)
+
+    Returns:
+        Dictionary of student LRN -> recommendation summary
+    """
+    engine = BatchRecommendationEngine(cohort)
+    engine.generate_recommendations()
+    return engine.get_recommendation_summaries()
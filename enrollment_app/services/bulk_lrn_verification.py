@@ -0,0 +1,215 @@
+"""
+Bulk LRN Verification Service
+Verifies many LRNs against the LIS database in chunked queries, or offline
+against a local snapshot of the LIS LRNs
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+from django.utils import timezone
+
+from lis.models import LISStudent
+from .lrn_verification import lrn_lookup_cache
+
+
+LRN_LENGTH = 12
+
+
+def is_valid_lrn_format(lrn):
+    """True when the LRN is exactly 12 digits"""
+    return bool(lrn) and len(lrn) == LRN_LENGTH and lrn.isdigit()
+
+
+def iter_chunks(items, chunk_size):
+    """Yield lists of at most chunk_size items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class BulkLRNVerifier:
+    """
+    Verify many LRNs with one `lrn__in` query per chunk
+
+    Results use the same format as LRNVerificationService.verify_lrn(), and
+    found/not-found results are written to the LRN lookup cache so later
+    single lookups do not query the LIS again.
+    """
+
+    def __init__(self, chunk_size=1000, warm_cache=True):
+        self.chunk_size = chunk_size
+        self.warm_cache = warm_cache
+
+    def iter_results(self, lrns):
+        """
+        Verify LRNs chunk by chunk
+
+        Args:
+            lrns: Iterable of LRN strings (may be a generator)
+
+        Yields:
+            (lrn, result) tuples, result as returned by verify_lrn()
+        """
+        for chunk in iter_chunks(lrns, self.chunk_size):
+            valid_lrns = [lrn for lrn in chunk if is_valid_lrn_format(lrn)]
+            found = {}
+
+            if valid_lrns:
+                rows = LISStudent.objects.using('lis').filter(
+                    lrn__in=valid_lrns
+                ).values_list('lrn', 'first_name', 'last_name', 'birth_date', 'last_school')
+
+                for lrn, first_name, last_name, birth_date, last_school in rows:
+                    found[lrn] = {
+                        'lrn': lrn,
+                        'first_name': first_name,
+                        'last_name': last_name,
+                        'birth_date': birth_date.isoformat(),
+                        'last_school': last_school,
+                    }
+
+            for lrn in chunk:
+                if not is_valid_lrn_format(lrn):
+                    yield lrn, {
+                        'is_valid': False,
+                        'student_data': None,
+                        'message': 'Invalid LRN format. LRN must be exactly 12 digits.'
+                    }
+                    continue
+
+                student_data = found.get(lrn)
+                if self.warm_cache:
+                    lrn_lookup_cache.set(lrn, student_data)
+
+                if student_data is None:
+                    yield lrn, {
+                        'is_valid': False,
+                        'student_data': None,
+                        'message': 'The LRN you entered is not listed in the LIS. Please try contacting your previous school.'
+                    }
+                else:
+                    yield lrn, {
+                        'is_valid': True,
+                        'student_data': dict(student_data),
+                        'message': 'LRN verified successfully.'
+                    }
+
+    def verify_lrns(self, lrns):
+        """
+        Verify LRNs in bulk
+
+        Args:
+            lrns: Iterable of LRN strings
+
+        Returns:
+            dict: LRN -> verify_lrn() style result
+        """
+        return dict(self.iter_results(lrns))
+
+
+class LISSnapshot:
+    """
+    Sorted array of every LRN in the LIS, for offline membership checks
+
+    LRNs are stored as fixed-width 12-byte strings (about 12 MB per million
+    students) and looked up with a binary search.
+    """
+
+    def __init__(self, lrns, built_at=None, presorted=False):
+        lrns = np.asarray(lrns, dtype=f'S{LRN_LENGTH}')
+        self.lrns = lrns if presorted else np.unique(lrns)
+        self.built_at = built_at
+
+    def __len__(self):
+        return len(self.lrns)
+
+    @classmethod
+    def build(cls, chunk_size=10000):
+        """
+        Build a snapshot by streaming LRNs from the LIS database
+
+        Returns:
+            LISSnapshot
+        """
+        built_at = timezone.now()
+        lrns = LISStudent.objects.using('lis').order_by('lrn').values_list(
+            'lrn', flat=True
+        ).iterator(chunk_size=chunk_size)
+
+        data = np.fromiter(
+            (lrn.encode('ascii') for lrn in lrns if is_valid_lrn_format(lrn)),
+            dtype=f'S{LRN_LENGTH}',
+        )
+        return cls(data, built_at=built_at)
+
+    def save(self, path):
+        """Write the snapshot to a .npz file (atomically replaces an existing file)"""
+        path = str(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    lrns=self.lrns,
+                    built_at=np.array(self.built_at.isoformat() if self.built_at else ''),
+                )
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot written by save()"""
+        with np.load(str(path)) as data:
+            built_at = str(data['built_at'])
+            return cls(
+                data['lrns'],
+                built_at=datetime.fromisoformat(built_at) if built_at else None,
+                presorted=True,
+            )
+
+    def contains(self, lrn):
+        """True when the LRN is in the snapshot"""
+        if not is_valid_lrn_format(lrn):
+            return False
+        key = np.array(lrn.encode('ascii'), dtype=f'S{LRN_LENGTH}')
+        index = np.searchsorted(self.lrns, key)
+        return bool(index < len(self.lrns) and self.lrns[index] == key)
+
+    def contains_many(self, lrns):
+        """
+        Membership for many LRNs at once
+
+        Returns:
+            NumPy boolean array in the order of lrns
+        """
+        lrns = list(lrns)
+        if not lrns:
+            return np.zeros(0, dtype=bool)
+
+        valid = np.array([is_valid_lrn_format(lrn) for lrn in lrns], dtype=bool)
+        keys = np.array(
+            [lrn.encode('ascii') if ok else b'' for lrn, ok in zip(lrns, valid)],
+            dtype=f'S{LRN_LENGTH}',
+        )
+        if len(self.lrns) == 0:
+            return np.zeros(len(lrns), dtype=bool)
+
+        index = np.searchsorted(self.lrns, keys)
+        in_range = index < len(self.lrns)
+        matches = np.zeros(len(lrns), dtype=bool)
+        matches[in_range] = self.lrns[index[in_range]] == keys[in_range]
+        return matches & valid
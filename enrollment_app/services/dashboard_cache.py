@@ -0,0 +1,61 @@
+"""
+Dashboard Cache
+Short-lived cache for the admin dashboard API payloads
+
+Open dashboards poll the statistics endpoint, so every admin tab would
+otherwise rerun the same aggregations. Payloads (dashboard statistics,
+enrollment request totals per filter) are cached for
+DASHBOARD_CACHE_TIMEOUT seconds (default 30) in DASHBOARD_CACHE_ALIAS
+(default 'default') and dropped as soon as an enrollment changes:
+
+- Student saves/deletes and SchoolYear changes (signals in enrollment_app.signals)
+- Submitted enrollments, which are written with bulk upserts that send no
+  signals (EnrollmentPersistenceService invalidates on commit)
+
+Teacher, program and section counts are only bounded by the TTL.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+CACHE_KEY_PREFIX = 'dashboard:'
+
+# Changing the generation orphans every payload cached under the old one,
+# including per-filter entries whose keys are not known in advance
+GENERATION_KEY = CACHE_KEY_PREFIX + 'generation'
+
+
+def _get_cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def get_dashboard_payload(name, builder, timeout=None):
+    """
+    Cached dashboard payload, built on a miss
+
+    Args:
+        name: Payload name, e.g. 'statistics' (may include a filter hash)
+        builder: Callable returning the JSON-serializable payload
+        timeout: Seconds to keep it (default DASHBOARD_CACHE_TIMEOUT)
+
+    Returns:
+        Payload
+    """
+    cache = _get_cache()
+    generation = cache.get_or_set(GENERATION_KEY, uuid.uuid4().hex, None)
+    key = f'{CACHE_KEY_PREFIX}{generation}:{name}'
+    payload = cache.get(key)
+    if payload is None:
+        payload = builder()
+        if timeout is None:
+            timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 30)
+        cache.set(key, payload, timeout)
+    return payload
+
+
+def invalidate_dashboard_cache(**kwargs):
+    """Drop all cached dashboard payloads (usable directly as a signal receiver)"""
+    _get_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,355 @@
+"""
+Enrollment Persistence
+Writes a completed enrollment (all wizard steps) to the database
+
+Each table gets exactly one statement, an INSERT ... ON CONFLICT DO UPDATE
+built with bulk_create(update_conflicts=True):
+
+- students            (final status and completion flags, written once)
+- parents             (father and mother together)
+- guardians           (only for an "other" guardian)
+- student_data, family_data, survey_data, academic_data, program_selection
+
+Parents and guardians are shared between siblings, so an existing record is
+matched on its unique key and kept as is (only updated_at is touched); the
+per-student tables are overwritten like update_or_create did.
+
+Uploaded files are finalized before the transaction: each temp upload is
+hard-linked into MEDIA_ROOT and its name is written in the same upserts
+(StudentData.student_photo, FamilyData.parent_photo, AcademicData.report_card).
+"""
+
+import os
+import time
+
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from ..models import (
+    Student, StudentData, Parent, Guardian, FamilyData,
+    SurveyData, AcademicData, ProgramSelection
+)
+from .dashboard_cache import invalidate_dashboard_cache
+from .upload_store import link_into_storage
+
+
+STUDENT_DATA_FIELDS = [
+    'last_name', 'first_name', 'middle_name', 'gender', 'date_of_birth',
+    'place_of_birth', 'religion', 'dialect_spoken', 'ethnic_tribe', 'address',
+    'enrolling_as', 'is_sped', 'sped_details', 'is_working_student',
+    'working_details', 'last_school_attended', 'previous_grade_section',
+    'last_school_year',
+]
+
+SURVEY_FIELDS = [
+    'learning_style', 'study_hours', 'study_environment', 'schoolwork_support',
+    'enjoyed_subjects', 'interested_program', 'program_motivation',
+    'enjoyed_activities', 'enjoyed_activities_other', 'assignments_on_time',
+    'handle_difficult_lessons', 'device_availability', 'internet_access',
+    'absences', 'absence_reason', 'participation', 'difficulty_areas',
+    'extra_support', 'quiet_place', 'distance_from_school', 'travel_difficulty',
+]
+
+SUBJECT_FIELDS = [
+    'mathematics', 'araling_panlipunan', 'english', 'edukasyon_sa_pagpapakatao',
+    'science', 'edukasyon_pangkabuhayan', 'filipino', 'mapeh',
+]
+
+# (draft section, temp path key, model, file field)
+UPLOAD_FIELDS = [
+    ('student_data', 'student_photo_path', StudentData, 'student_photo'),
+    ('family_data', 'parent_photo_path', FamilyData, 'parent_photo'),
+    ('academic_data', 'report_card_path', AcademicData, 'report_card'),
+]
+
+LIST_FIELDS = {'enrolling_as', 'enjoyed_subjects', 'enjoyed_activities', 'difficulty_areas'}
+BOOLEAN_FIELDS = {'is_sped', 'is_working_student'}
+
+
+class QueryCounter:
+    """
+    Counts SQL statements sent on a connection (works with DEBUG off)
+
+    Usage:
+        with QueryCounter() as counter:
+            ...
+        counter.count
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.count = 0
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+
+
+def _default(field):
+    if field in LIST_FIELDS:
+        return []
+    if field in BOOLEAN_FIELDS:
+        return False
+    return ''
+
+
+def _grade(value):
+    return float(value or 0) or None
+
+
+def _file_fields(files, field_name):
+    """{field_name: media name} when that upload was finalized, else {}"""
+    if files.get(field_name):
+        return {field_name: files[field_name]}
+    return {}
+
+
+def _upsert(model, objs, unique_fields, update_fields):
+    """One INSERT ... ON CONFLICT (unique_fields) DO UPDATE SET update_fields"""
+    return model.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
+
+
+def _person_fields(family_data, prefix):
+    """Parent/guardian fields from the family form, or None if required ones are missing"""
+    fields = {
+        'first_name': family_data.get(f'{prefix}_first_name', ''),
+        'family_name': family_data.get(f'{prefix}_family_name', ''),
+        'middle_name': family_data.get(f'{prefix}_middle_name', '') or '',
+        'date_of_birth': family_data.get(f'{prefix}_dob'),
+        'occupation': family_data.get(f'{prefix}_occupation', ''),
+        'address': family_data.get(f'{prefix}_address', ''),
+        'contact_number': family_data.get(f'{prefix}_contact_number', ''),
+        'email': family_data.get(f'{prefix}_email', '') or '',
+    }
+    required = ['first_name', 'family_name', 'date_of_birth', 'occupation', 'contact_number']
+    if not all(fields[name] for name in required):
+        return None
+    return fields
+
+
+def get_guardian_email(family_data):
+    """Email of the official guardian (father, mother or other)"""
+    guardian_type = family_data.get('guardian_type') or family_data.get('primary_guardian_type', 'mother')
+
+    if guardian_type == 'father':
+        email = family_data.get('father_email', '')
+    elif guardian_type == 'mother':
+        email = family_data.get('mother_email', '')
+    elif guardian_type == 'other':
+        email = family_data.get('guardian_email', '')
+    else:
+        email = None
+
+    return email or ''
+
+
+def finalize_enrollment_uploads(lrn, **sections):
+    """
+    Move the draft's temp uploads into media storage (hard links, no copy)
+
+    Args:
+        lrn: Student LRN, used in the media file names
+        **sections: Draft sections by name (student_data, family_data, academic_data)
+
+    Returns:
+        dict: file field name -> media name, for uploads that still exist
+    """
+    files = {}
+    for section, path_key, model, field_name in UPLOAD_FIELDS:
+        temp_path = (sections.get(section) or {}).get(path_key)
+        if not temp_path:
+            continue
+        stem, extension = os.path.splitext(os.path.basename(temp_path))
+        upload_to = model._meta.get_field(field_name).upload_to
+        name = link_into_storage(temp_path, f"{upload_to}{lrn}_{stem[:16]}{extension}")
+        if name:
+            files[field_name] = name
+    return files
+
+
+class EnrollmentPersistenceService:
+    """Saves a completed enrollment with one upsert per table"""
+
+    @staticmethod
+    def save_enrollment(student_data, family_data, survey_data, academic_data,
+                        program_selection_data, school_year=None, lrn_verified=False, files=None):
+        """
+        Write all enrollment records for a student in a single transaction
+
+        Args:
+            student_data, family_data, survey_data, academic_data: Wizard step data
+            program_selection_data: Confirmed program selection
+            school_year: Active SchoolYear (or None)
+            lrn_verified: Whether the LRN was verified against LIS
+            files: Media names from finalize_enrollment_uploads() (file field -> name)
+
+        Returns:
+            tuple: (Student, stats) -- stats has query_count and elapsed_ms
+        """
+        lrn = student_data.get('lrn')
+        if not lrn:
+            raise ValueError("LRN not found in session data")
+
+        started = time.perf_counter()
+        now = timezone.now()
+        files = files or {}
+
+        with QueryCounter() as counter, transaction.atomic():
+            # Parents and "other" guardian first: FamilyData needs their IDs
+            parents = {}
+            parent_objs = []
+            for parent_type in ['father', 'mother']:
+                fields = _person_fields(family_data, parent_type)
+                if fields:
+                    parent = Parent(parent_type=parent_type, **fields)
+                    parents[parent_type] = parent
+                    parent_objs.append(parent)
+            if parent_objs:
+                _upsert(
+                    Parent, parent_objs,
+                    unique_fields=['family_name', 'first_name', 'date_of_birth', 'parent_type'],
+                    update_fields=['updated_at'],
+                )
+
+            other_guardian = None
+            fields = _person_fields(family_data, 'guardian')
+            if fields:
+                other_guardian = Guardian(
+                    relationship_to_student=family_data.get('guardian_relationship', 'Guardian'),
+                    **fields
+                )
+                _upsert(
+                    Guardian, [other_guardian],
+                    unique_fields=['family_name', 'first_name', 'date_of_birth', 'relationship_to_student'],
+                    update_fields=['updated_at'],
+                )
+
+            has_family = bool(parents.get('father') and parents.get('mother'))
+
+            # Student: final status and completion flags in one statement
+            student = Student(
+                lrn=lrn,
+                email=get_guardian_email(family_data),
+                school_year=school_year,
+                enrollment_status='submitted',
+                is_lis_verified=lrn_verified,
+                lis_verified_at=now if lrn_verified else None,
+                student_data_completed=True,
+                student_data_completed_at=now,
+                family_data_completed=has_family,
+                family_data_completed_at=now if has_family else None,
+                survey_completed=True,
+                survey_completed_at=now,
+                academic_data_completed=True,
+                academic_data_completed_at=now,
+                program_selected=True,
+                program_selected_at=now,
+            )
+            student_update_fields = [
+                'email', 'school_year', 'enrollment_status',
+                'student_data_completed', 'student_data_completed_at',
+                'survey_completed', 'survey_completed_at',
+                'academic_data_completed', 'academic_data_completed_at',
+                'program_selected', 'program_selected_at',
+                'updated_at',
+            ]
+            if has_family:
+                # Without both parents an earlier completion is left untouched
+                student_update_fields += ['family_data_completed', 'family_data_completed_at']
+            _upsert(Student, [student], unique_fields=['lrn'], update_fields=student_update_fields)
+
+            # Per-student tables (student is the primary key of each).
+            # File fields are only written when an upload was finalized, so a
+            # file attached later by an admin is not cleared on resubmission.
+            student_data_fields = {field: student_data.get(field, _default(field)) for field in STUDENT_DATA_FIELDS}
+            student_data_fields.update(_file_fields(files, 'student_photo'))
+            _upsert(
+                StudentData,
+                [StudentData(student=student, **student_data_fields)],
+                unique_fields=['student'],
+                update_fields=list(student_data_fields) + ['updated_at'],
+            )
+
+            if has_family:
+                family_fields = {
+                    'father': parents['father'],
+                    'mother': parents['mother'],
+                    'other_guardian': other_guardian,
+                    'official_guardian_type': (
+                        family_data.get('guardian_type')
+                        or family_data.get('primary_guardian_type', 'mother')
+                    ),
+                }
+                family_fields.update(_file_fields(files, 'parent_photo'))
+                _upsert(
+                    FamilyData,
+                    [FamilyData(student=student, **family_fields)],
+                    unique_fields=['student'],
+                    update_fields=list(family_fields) + ['updated_at'],
+                )
+
+            _upsert(
+                SurveyData,
+                [SurveyData(
+                    student=student,
+                    survey_responses_json=survey_data,
+                    **{field: survey_data.get(field, _default(field)) for field in SURVEY_FIELDS}
+                )],
+                unique_fields=['student'],
+                update_fields=SURVEY_FIELDS + ['survey_responses_json', 'updated_at'],
+            )
+
+            academic_fields = {field: _grade(academic_data.get(field, 0)) for field in SUBJECT_FIELDS}
+            academic_fields.update({
+                'dost_exam_result': academic_data.get('dost_exam_result', ''),
+                'is_working_student': student_data.get('is_working_student', False),
+                'working_type': student_data.get('working_details', ''),
+                'is_pwd': student_data.get('is_sped', False),
+                'disability_type': student_data.get('sped_details', ''),
+            })
+            academic_fields.update(_file_fields(files, 'report_card'))
+            _upsert(
+                AcademicData,
+                [AcademicData(student=student, **academic_fields)],
+                unique_fields=['student'],
+                update_fields=list(academic_fields) + ['updated_at'],
+            )
+
+            _upsert(
+                ProgramSelection,
+                [ProgramSelection(
+                    student=student,
+                    school_year=school_year,
+                    selected_program_code=program_selection_data.get('selected_program_code', ''),
+                    program_description="Selected based on student profile and recommendations",
+                    selection_reason=f"Student confirmed selection on {now.strftime('%Y-%m-%d %H:%M:%S')}",
+                )],
+                unique_fields=['student'],
+                update_fields=[
+                    'school_year', 'selected_program_code', 'program_description',
+                    'selection_reason', 'updated_at',
+                ],
+            )
+
+            # Upserts send no post_save signals: refresh the dashboard counts here
+            transaction.on_commit(invalidate_dashboard_cache)
+
+        stats = {
+            'query_count': counter.count,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+        return student, stats
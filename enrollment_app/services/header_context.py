@@ -0,0 +1,110 @@
+"""
+Header Context
+School year, name, role and photo shown in the header of every portal page
+
+Each page fetches this small blob on load, so it is cached instead of
+querying SchoolYear and UserProfile every time:
+
+- 'header_context:school_year' holds the active school year label (shared)
+- 'header_context:user:<id>' holds the user's name, role, initials and photo
+
+Both are read with one get_many(). Signals in enrollment_app.signals drop
+the shared entry when a SchoolYear changes and a user's entry when their
+User or UserProfile changes. HEADER_CONTEXT_CACHE_TIMEOUT (default 3600)
+bounds staleness for anything else, e.g. a renamed program.
+HEADER_CONTEXT_CACHE_ALIAS selects the cache (default 'default').
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+from admin_app.models import SchoolYear, UserProfile
+
+
+SCHOOL_YEAR_KEY = 'header_context:school_year'
+USER_KEY = 'header_context:user:{}'
+
+
+def _get_cache():
+    return caches[getattr(settings, 'HEADER_CONTEXT_CACHE_ALIAS', 'default')]
+
+
+def _get_timeout():
+    return getattr(settings, 'HEADER_CONTEXT_CACHE_TIMEOUT', 3600)
+
+
+def get_initials(user):
+    """Initials from first/last name, falling back to the username"""
+    if user.first_name and user.last_name:
+        return f"{user.first_name[0]}{user.last_name[0]}".upper()
+    if user.first_name:
+        return user.first_name[0].upper()
+    if user.last_name:
+        return user.last_name[0].upper()
+    return user.username[0].upper() if user.username else "U"
+
+
+def build_user_header_context(user):
+    """
+    Per-user part of the header context
+
+    Args:
+        user: Authenticated User
+
+    Returns:
+        dict: full_name, role, initials, photo_url, program
+    """
+    try:
+        user_profile = UserProfile.objects.select_related(
+            'program', 'position', 'department'
+        ).get(user=user)
+    except UserProfile.DoesNotExist:
+        user_profile = None
+
+    full_name = f"{user.first_name} {user.last_name}" if user.first_name and user.last_name else user.username
+
+    return {
+        'full_name': full_name,
+        'role': user_profile.get_user_type_display() if user_profile else "Admin",
+        'initials': get_initials(user),
+        'photo_url': user_profile.photo.url if user_profile and user_profile.photo else None,
+        'program': user_profile.get_program_name() if user_profile else 'N/A',
+    }
+
+
+def get_header_context(user):
+    """
+    Header context for a user, from the cache when possible
+
+    Args:
+        user: Authenticated User
+
+    Returns:
+        dict: school_year, full_name, role, initials, photo_url, program
+    """
+    cache = _get_cache()
+    user_key = USER_KEY.format(user.pk)
+    cached = cache.get_many([SCHOOL_YEAR_KEY, user_key])
+
+    school_year = cached.get(SCHOOL_YEAR_KEY)
+    if school_year is None:
+        active_school_year = SchoolYear.get_active_school_year()
+        school_year = active_school_year.year_label if active_school_year else 'No Active Year'
+        cache.set(SCHOOL_YEAR_KEY, school_year, _get_timeout())
+
+    user_context = cached.get(user_key)
+    if user_context is None:
+        user_context = build_user_header_context(user)
+        cache.set(user_key, user_context, _get_timeout())
+
+    return {'school_year': school_year, **user_context}
+
+
+def invalidate_school_year_header(**kwargs):
+    """Drop the cached school year label (usable directly as a signal receiver)"""
+    _get_cache().delete(SCHOOL_YEAR_KEY)
+
+
+def invalidate_user_header(user_id):
+    """Drop a user's cached header context"""
+    _get_cache().delete(USER_KEY.format(user_id))
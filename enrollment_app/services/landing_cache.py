@@ -0,0 +1,123 @@
+"""
+Landing Page Cache
+Keeps the rendered landing page so public traffic does not hit the database
+
+The page only changes when an admin edits SystemSettings or StaffMember,
+so the rendered HTML is cached together with an ETag and Last-Modified
+time. Saves and deletes of either model (signals in enrollment_app.signals)
+and the content settings views drop the cached copy.
+
+The cache alias is LANDING_PAGE_CACHE_ALIAS (default 'default'). With
+several web processes, point it at a shared cache (Redis/Memcached/DB) so
+an edit invalidates every worker; LANDING_PAGE_CACHE_TIMEOUT bounds how
+stale a per-process cache can get.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+from admin_app.models import SystemSettings, StaffMember
+
+
+CACHE_KEY = 'landing_page:html'
+TEMPLATE_NAME = 'enrollment_app/landing.html'
+
+
+def _get_cache():
+    return caches[getattr(settings, 'LANDING_PAGE_CACHE_ALIAS', 'default')]
+
+
+def build_landing_page_context():
+    """
+    Landing page context from SystemSettings and active StaffMembers
+
+    Returns:
+        dict: Template context
+    """
+    # Fetch all settings
+    try:
+        settings_qs = SystemSettings.objects.all()
+        content = {}
+        for setting in settings_qs:
+            content[setting.setting_type] = {
+                'value': setting.setting_value,
+                'image_url': setting.image.url if setting.image else None
+            }
+    except Exception:
+        content = {}
+
+    # Fetch active staff members (evaluated now so the context can be cached)
+    try:
+        staff_members = list(StaffMember.objects.filter(is_active=True).order_by('display_order', 'name'))
+    except Exception:
+        staff_members = []
+
+    # Helper function to get setting value safely
+    def get_setting(key, default=''):
+        return content.get(key, {}).get('value', default)
+
+    def get_setting_image(key):
+        return content.get(key, {}).get('image_url', None)
+
+    return {
+        # Header
+        'header_logo_school': get_setting_image('header_logo_school'),
+        'header_logo_region': get_setting_image('header_logo_region'),
+        'header_logo_peninsula': get_setting_image('header_logo_peninsula'),
+        'header_logo_matatag': get_setting_image('header_logo_matatag'),
+        'header_caption': get_setting('header_caption', '''
+            <h2 class="text-2xl font-bold mb-4">Welcome to Excellence in Education</h2>
+            <p class="text-lg">Empowering students to achieve their dreams through quality education and innovative programs</p>
+        '''),
+
+        # Announcements
+        'announcement_image': get_setting_image('announcement_image'),
+        'announcement_caption': get_setting('announcement_caption', 'Stay updated with our latest announcements'),
+
+        # Contact Information
+        'contact_address': get_setting('contact_address', 'R.T. Lim Boulevard Zamboanga City, Philippines'),
+        'contact_phone': get_setting('contact_phone', '+63 61 0086516'),
+        'contact_email': get_setting('contact_email', 'nationalhighschoolwest@gmail.com'),
+        'contact_facebook': get_setting('contact_facebook', 'https://web.facebook.com/znhs.west'),
+        'contact_hours': get_setting('contact_hours', '''Monday to Friday: 7:00 AM - 5:00 PM
+Saturday: 7:00 AM - 5:00 PM
+Sunday: Closed'''),
+
+        # Footer
+        'footer_copyright': get_setting('footer_copyright', '© 2025 Zamboanga National High School West. All rights reserved.'),
+
+        # Staff Members
+        'staff_members': staff_members,
+    }
+
+
+def get_landing_page():
+    """
+    Rendered landing page, from the cache when possible
+
+    The template uses no request data (no CSRF token or user), so one
+    rendering is shared by all visitors.
+
+    Returns:
+        dict: html, etag, last_modified (epoch seconds)
+    """
+    cache = _get_cache()
+    page = cache.get(CACHE_KEY)
+    if page is None:
+        html = render_to_string(TEMPLATE_NAME, build_landing_page_context())
+        page = {
+            'html': html,
+            'etag': '"%s"' % hashlib.md5(html.encode('utf-8')).hexdigest(),
+            'last_modified': int(time.time()),
+        }
+        cache.set(CACHE_KEY, page, getattr(settings, 'LANDING_PAGE_CACHE_TIMEOUT', 3600))
+    return page
+
+
+def invalidate_landing_page(**kwargs):
+    """Drop the cached landing page (usable directly as a signal receiver)"""
+    _get_cache().delete(CACHE_KEY)
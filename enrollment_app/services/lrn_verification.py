@@ -1,11 +1,184 @@
 """
 LRN Verification Service
 Verifies student LRN against LIS database
+
+Lookups go through a two-level cache (per-process LRU, then an optional
+shared Django cache) so repeated LRNs, including ones that are not in
+the LIS, do not hit the read-only LIS database every time.
 """
 
+import logging
+import threading
+import time
+from collections import OrderedDict
+
 from lis.models import LISStudent
+from django.conf import settings
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
 
+logger = logging.getLogger(__name__)
+
+
+# Sentinel for "LRN looked up and not found" (distinct from "not cached")
+NOT_IN_LIS = object()
+
+
+class LRNLookupCache:
+    """
+    Two-level cache of LIS lookups keyed by LRN
+    
+    Level 1 is a bounded, thread-safe LRU dictionary in this process.
+    Level 2 is an optional Django cache (e.g. Redis/Memcached) shared by
+    all workers. Found LRNs and misses have separate TTLs, so a corrected
+    LIS record shows up after LRN_CACHE_MISS_TTL seconds at most. Shared
+    entries carry their expiry time, so a copy pulled into level 1 only
+    lives for what is left of the shared TTL.
+    """
+    
+    KEY_PREFIX = 'lis_lrn:'
+    
+    def __init__(self, max_size=4096, hit_ttl=3600, miss_ttl=300, shared_cache_alias=None):
+        self.max_size = max_size
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.shared_cache_alias = shared_cache_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+    
+    @property
+    def shared_cache(self):
+        if not self.shared_cache_alias:
+            return None
+        return caches[self.shared_cache_alias]
+    
+    def get(self, lrn):
+        """
+        Look up a cached result
+        
+        Returns:
+            Student data dict, NOT_IN_LIS for a cached miss, or None when not cached
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(lrn)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(lrn)
+                    if value is NOT_IN_LIS:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return value
+                del self._entries[lrn]
+        
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            try:
+                stored = shared_cache.get(self.KEY_PREFIX + lrn)
+            except Exception as e:
+                logger.warning("LRN cache: shared cache read failed: %s", e)
+                stored = None
+            if stored is not None:
+                value = stored['student_data'] if stored['found'] else NOT_IN_LIS
+                expires_at = stored.get('expires_at')
+                self._store_local(lrn, value, ttl=expires_at - time.time() if expires_at else None)
+                with self._lock:
+                    self.shared_hits += 1
+                    if value is NOT_IN_LIS:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                return value
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def set(self, lrn, student_data):
+        """
+        Cache a lookup result
+        
+        Args:
+            lrn: The LRN that was looked up
+            student_data: Student data dict, or None when the LRN is not in the LIS
+        """
+        value = NOT_IN_LIS if student_data is None else student_data
+        self._store_local(lrn, value)
+        
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            ttl = self.miss_ttl if student_data is None else self.hit_ttl
+            try:
+                shared_cache.set(
+                    self.KEY_PREFIX + lrn,
+                    {
+                        'found': student_data is not None,
+                        'student_data': student_data,
+                        'expires_at': time.time() + ttl,
+                    },
+                    ttl,
+                )
+            except Exception as e:
+                logger.warning("LRN cache: shared cache write failed: %s", e)
+    
+    def invalidate(self, lrn):
+        """Forget one LRN in both levels"""
+        with self._lock:
+            self._entries.pop(lrn, None)
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            try:
+                shared_cache.delete(self.KEY_PREFIX + lrn)
+            except Exception as e:
+                logger.warning("LRN cache: shared cache delete failed: %s", e)
+    
+    def clear(self):
+        """Remove all local entries and reset counters (the shared cache is left alone)"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.negative_hits = 0
+            self.shared_hits = 0
+            self.misses = 0
+    
+    def get_stats(self):
+        """Cache size and hit/miss counters"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+            }
+    
+    def _store_local(self, lrn, value, ttl=None):
+        if ttl is None:
+            ttl = self.miss_ttl if value is NOT_IN_LIS else self.hit_ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[lrn] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(lrn)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+# Per-process cache shared by all requests
+lrn_lookup_cache = LRNLookupCache(
+    max_size=getattr(settings, 'LRN_CACHE_SIZE', 4096),
+    hit_ttl=getattr(settings, 'LRN_CACHE_HIT_TTL', 3600),
+    miss_ttl=getattr(settings, 'LRN_CACHE_MISS_TTL', 300),
+    shared_cache_alias=getattr(settings, 'LRN_SHARED_CACHE_ALIAS', None),
+)
+
 
 class LRNVerificationService:
     """
@@ -36,33 +209,64 @@ class LRNVerificationService:
             }
         
         try:
-            # Query LIS database using 'lis' connection
-            lis_student = LISStudent.objects.using('lis').get(lrn=lrn)
-            
-            return {
-                'is_valid': True,
-                'student_data': {
-                    'lrn': lis_student.lrn,
-                    'first_name': lis_student.first_name,
-                    'last_name': lis_student.last_name,
-                    'birth_date': lis_student.birth_date.isoformat(),
-                    'last_school': lis_student.last_school,
-                },
-                'message': 'LRN verified successfully.'
-            }
-            
-        except LISStudent.DoesNotExist:
+            student_data = LRNVerificationService.lookup_student_data(lrn)
+        except Exception as e:
             return {
                 'is_valid': False,
                 'student_data': None,
-                'message': 'The LRN you entered is not listed in the LIS. Please try contacting your previous school.'
+                'message': f'Error verifying LRN: {str(e)}'
             }
-        except Exception as e:
+        
+        if student_data is None:
             return {
                 'is_valid': False,
                 'student_data': None,
-                'message': f'Error verifying LRN: {str(e)}'
+                'message': 'The LRN you entered is not listed in the LIS. Please try contacting your previous school.'
             }
+        
+        return {
+            'is_valid': True,
+            'student_data': dict(student_data),
+            'message': 'LRN verified successfully.'
+        }
+    
+    @staticmethod
+    def lookup_student_data(lrn, use_cache=True):
+        """
+        Get the LIS student data for an LRN, through the lookup cache
+        
+        Database errors are raised and never cached.
+        
+        Args:
+            lrn (str): Student's LRN
+            use_cache (bool): Read and fill lrn_lookup_cache
+            
+        Returns:
+            dict or None: Student data, or None if the LRN is not in the LIS
+        """
+        if use_cache:
+            cached = lrn_lookup_cache.get(lrn)
+            if cached is NOT_IN_LIS:
+                return None
+            if cached is not None:
+                return cached
+        
+        try:
+            # Query LIS database using 'lis' connection
+            lis_student = LISStudent.objects.using('lis').get(lrn=lrn)
+            student_data = {
+                'lrn': lis_student.lrn,
+                'first_name': lis_student.first_name,
+                'last_name': lis_student.last_name,
+                'birth_date': lis_student.birth_date.isoformat(),
+                'last_school': lis_student.last_school,
+            }
+        except LISStudent.DoesNotExist:
+            student_data = None
+        
+        if use_cache:
+            lrn_lookup_cache.set(lrn, student_data)
+        return student_data
     
     @staticmethod
     def get_lis_student_info(lrn):
@@ -91,4 +295,4 @@ class LRNVerificationService:
         Returns:
             bool: True if exists, False otherwise
         """
-        return LISStudent.objects.using('lis').filter(lrn=lrn).exists()
\ No newline at end of file
+        return LRNVerificationService.lookup_student_data(lrn) is not None
@@ -0,0 +1,225 @@
+"""
+OCR Backends
+Engines that turn report card image bytes into raw text
+
+- 'vision':   Google Vision DOCUMENT_TEXT_DETECTION (network)
+- 'easyocr':  EasyOCR running locally (no network, CPU or GPU)
+- 'fixture':  Deterministic stub that reads expected text from fixture files
+
+The backend is chosen with settings.OCR_BACKEND (or per worker with
+run_ocr_worker --backend). Instances are created once per process and
+reused, so local models stay loaded between jobs.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from django.conf import settings
+
+
+class OCRBackend:
+    """Base class: subclasses implement extract_text()"""
+
+    name = ''
+
+    def extract_text(self, content, image_path=None):
+        """
+        Read the text of a report card
+
+        Args:
+            content: Image bytes (possibly pre-processed)
+            image_path: Path of the original upload, when known
+
+        Returns:
+            Full text with one line per printed row
+        """
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Load models/clients ahead of the first job"""
+
+
+class GoogleVisionBackend(OCRBackend):
+    """Google Vision DOCUMENT_TEXT_DETECTION"""
+
+    name = 'vision'
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from google.cloud import vision
+                    # Vision client will pick credentials from GOOGLE_APPLICATION_CREDENTIALS
+                    self._client = vision.ImageAnnotatorClient()
+        return self._client
+
+    def warm_up(self):
+        self.client
+
+    def extract_text(self, content, image_path=None):
+        from google.cloud import vision
+
+        image = vision.Image(content=content)
+        response = self.client.document_text_detection(image=image)
+
+        if response.error.message:
+            raise Exception(response.error.message)
+
+        return response.full_text_annotation.text or ''
+
+
+class EasyOCRBackend(OCRBackend):
+    """
+    EasyOCR running in this process
+
+    Loading the detection/recognition models takes seconds, so the reader
+    is created once and kept for the life of the worker. EasyOCR returns
+    separate boxes, which are joined into rows by their vertical position
+    so a subject and its grade end up on the same line.
+    """
+
+    name = 'easyocr'
+
+    def __init__(self, languages=None, gpu=False):
+        self.languages = list(languages or ['en'])
+        self.gpu = gpu
+        self._reader = None
+        self._load_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            with self._load_lock:
+                if self._reader is None:
+                    import easyocr
+                    self._reader = easyocr.Reader(self.languages, gpu=self.gpu)
+        return self._reader
+
+    def warm_up(self):
+        self.reader
+
+    def extract_text(self, content, image_path=None):
+        reader = self.reader
+        # The reader is not thread-safe; workers sharing it take turns
+        with self._inference_lock:
+            results = reader.readtext(content, detail=1, paragraph=False)
+        return self.group_rows(results)
+
+    @staticmethod
+    def group_rows(results):
+        """Join (box, text, confidence) results into lines, top to bottom and left to right"""
+        boxes = []
+        for box, text, _confidence in results:
+            ys = [point[1] for point in box]
+            xs = [point[0] for point in box]
+            boxes.append((min(ys), max(ys), min(xs), text))
+        boxes.sort()
+
+        rows = []
+        for top, bottom, left, text in boxes:
+            center = (top + bottom) / 2
+            if rows and rows[-1]['top'] <= center <= rows[-1]['bottom']:
+                rows[-1]['items'].append((left, text))
+                rows[-1]['bottom'] = max(rows[-1]['bottom'], bottom)
+            else:
+                rows.append({'top': top, 'bottom': bottom, 'items': [(left, text)]})
+
+        return '\n'.join(
+            ' '.join(text for _, text in sorted(row['items']))
+            for row in rows
+        )
+
+
+class FixtureBackend(OCRBackend):
+    """
+    Deterministic stub for offline tests and benchmarks
+
+    The text for an image is read from, in order:
+    - a sidecar file next to the upload (report_card.jpg -> report_card.jpg.txt)
+    - <fixture_dir>/<sha256 of the image bytes>.txt
+    - the default text
+    An optional delay simulates OCR latency.
+    """
+
+    name = 'fixture'
+
+    def __init__(self, fixture_dir=None, default_text='', delay=0.0):
+        self.fixture_dir = fixture_dir
+        self.default_text = default_text
+        self.delay = delay
+
+    def extract_text(self, content, image_path=None):
+        if self.delay:
+            time.sleep(self.delay)
+
+        candidates = []
+        if image_path:
+            candidates.append(f"{image_path}.txt")
+        if self.fixture_dir:
+            candidates.append(os.path.join(self.fixture_dir, f"{hashlib.sha256(content).hexdigest()}.txt"))
+
+        for path in candidates:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+
+        return self.default_text
+
+
+BACKEND_ALIASES = {
+    'google': 'vision',
+    'fake': 'fixture',
+    'stub': 'fixture',
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def create_ocr_backend(name):
+    """Create a new backend instance configured from settings"""
+    if name == 'vision':
+        return GoogleVisionBackend()
+    if name == 'easyocr':
+        return EasyOCRBackend(
+            languages=getattr(settings, 'OCR_EASYOCR_LANGUAGES', ['en']),
+            gpu=getattr(settings, 'OCR_EASYOCR_GPU', False),
+        )
+    if name == 'fixture':
+        return FixtureBackend(
+            fixture_dir=getattr(settings, 'OCR_FIXTURE_DIR', None),
+            default_text=getattr(settings, 'OCR_FIXTURE_DEFAULT_TEXT', ''),
+            delay=getattr(settings, 'OCR_FAKE_DELAY', 0.0),
+        )
+    raise ValueError(f"Unknown OCR backend: {name}")
+
+
+def get_ocr_backend(name=None):
+    """
+    Process-wide backend instance (created on first use and kept warm)
+
+    Args:
+        name: 'vision', 'easyocr' or 'fixture'; defaults to settings.OCR_BACKEND
+
+    Returns:
+        OCRBackend
+    """
+    name = name or getattr(settings, 'OCR_BACKEND', 'vision')
+    name = BACKEND_ALIASES.get(name, name)
+
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = create_ocr_backend(name)
+                _backends[name] = backend
+    return backend
@@ -0,0 +1,218 @@
+"""
+OCR Result Cache
+Remembers what the OCR backend read from a report card, keyed by the
+SHA-256 of the file bytes
+
+Each entry keeps the raw OCR text and the grades parsed from it, tagged
+with the parser version. When the parser changes (e.g. SUBJECT_ALIASES),
+grades are re-parsed from the cached text instead of calling OCR again.
+
+Entries are small JSON files, so the cache is shared by the web process
+and the OCR workers. The least recently used files are evicted once the
+directory grows past max_bytes. Each process keeps a running size from
+its own writes and only walks the directory when that estimate passes
+max_bytes or every scan_interval seconds (to pick up other processes'
+writes), not on every set().
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+
+class OCRResultCache:
+    """Size-bounded on-disk cache of OCR text and parsed grades"""
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024, scan_interval=300):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.scan_interval = scan_interval
+        self._lock = threading.Lock()
+        # Estimated directory size; None until the first scan
+        self._size = None
+        self._scanned_at = 0.0
+        self.hits = 0
+        self.reparsed = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(content):
+        """SHA-256 hex digest of the uploaded file bytes"""
+        return hashlib.sha256(content).hexdigest()
+
+    def _path(self, key, namespace=''):
+        return os.path.join(self.directory, namespace, key[:2], f"{key}.json")
+
+    def get(self, key, namespace=''):
+        """
+        Look up a cached entry
+
+        Returns:
+            {'text': str, 'grades': dict, 'parser_version': str} or None
+        """
+        path = self._path(key, namespace)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Touch for LRU eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def set(self, key, text, grades, parser_version, namespace=''):
+        """Store OCR text and parsed grades, then evict old entries if needed"""
+        path = self._path(key, namespace)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced_bytes = os.path.getsize(path)
+        except OSError:
+            replaced_bytes = 0
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'text': text,
+                    'grades': grades,
+                    'parser_version': parser_version,
+                }, f)
+            written_bytes = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            if self._size is not None:
+                self._size += written_bytes - replaced_bytes
+            due = (
+                self._size is None
+                or self._size > self.max_bytes
+                or time.monotonic() - self._scanned_at >= self.scan_interval
+            )
+        if due:
+            self.evict()
+
+    def delete(self, key, namespace=''):
+        """Remove an entry if present"""
+        try:
+            size = os.path.getsize(self._path(key, namespace))
+            os.remove(self._path(key, namespace))
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def lookup(self, content, parser_version, parse, namespace=''):
+        """
+        Cached grades for file bytes, re-parsing stale entries
+
+        Args:
+            content: Uploaded file bytes
+            parser_version: Current parser version string
+            parse: Function turning OCR text into grades
+            namespace: OCR backend name (each engine reads text differently)
+
+        Returns:
+            (key, grades) -- grades is None when the file was never OCR'd
+        """
+        key = self.content_hash(content)
+        entry = self.get(key, namespace)
+
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return key, None
+
+        if entry.get('parser_version') == parser_version:
+            with self._lock:
+                self.hits += 1
+            return key, entry['grades']
+
+        grades = parse(entry.get('text', ''))
+        self.set(key, entry.get('text', ''), grades, parser_version, namespace)
+        with self._lock:
+            self.reparsed += 1
+        return key, grades
+
+    def evict(self):
+        """Delete least recently used entries once the cache is over max_bytes"""
+        with self._lock:
+            self._scanned_at = time.monotonic()
+
+        if not os.path.isdir(self.directory):
+            with self._lock:
+                self._size = 0
+            return
+
+        files = []
+        total = 0
+        for root, _dirs, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            # Trim below the limit so the next few writes do not rescan
+            target = self.max_bytes * 0.9
+            files.sort()
+            for _, size, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+        with self._lock:
+            self._size = total
+
+    def get_stats(self):
+        """Hit/miss counters for this process"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'reparsed': self.reparsed,
+                'misses': self.misses,
+                'max_bytes': self.max_bytes,
+            }
+
+
+_default_cache = None
+
+
+def get_ocr_result_cache():
+    """
+    The cache configured in settings (OCR_CACHE_DIR, OCR_CACHE_MAX_BYTES,
+    OCR_CACHE_SCAN_INTERVAL)
+
+    Returns:
+        OCRResultCache, or None when OCR_CACHE_ENABLED is False
+    """
+    global _default_cache
+
+    if not getattr(settings, 'OCR_CACHE_ENABLED', True):
+        return None
+    if _default_cache is None:
+        _default_cache = OCRResultCache(
+            directory=getattr(settings, 'OCR_CACHE_DIR', os.path.join(settings.BASE_DIR, 'ocr_cache')),
+            max_bytes=getattr(settings, 'OCR_CACHE_MAX_BYTES', 50 * 1024 * 1024),
+            scan_interval=getattr(settings, 'OCR_CACHE_SCAN_INTERVAL', 300),
+        )
+    return _default_cache
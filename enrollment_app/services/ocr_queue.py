@@ -0,0 +1,291 @@
+"""
+OCR Job Queue
+Runs report card OCR in the background instead of inside academic_form
+
+Flow:
+- academic_form saves the upload and calls enqueue_ocr_job() (one INSERT).
+- An OCRWorkerPool (see the run_ocr_worker management command) claims
+  pending OCRJob rows, runs OCR and grade verification, and writes
+  ocr_verified / ocr_mismatches / extracted_grades back to the job.
+- Jobs left 'processing' by a worker that died are claimed again once
+  OCR_JOB_LEASE_SECONDS have passed.
+- The academic page polls ocr_job_status_ajax for the result; a result the
+  page did not wait for is applied when the enrollment is submitted.
+"""
+
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import OCRJob
+from .ocr_backends import get_ocr_backend
+from .recommendation_service import ProgramRecommendationEngine
+
+logger = logging.getLogger(__name__)
+
+
+def get_manual_grades(academic_data):
+    """
+    Typed grades from the academic form, as floats (None when blank)
+
+    Args:
+        academic_data: Academic data dictionary from the session
+
+    Returns:
+        Dictionary of subject -> grade or None
+    """
+    manual_grades = {}
+    for subject in ProgramRecommendationEngine.SUBJECT_FIELDS:
+        value = academic_data.get(subject)
+        try:
+            manual_grades[subject] = float(value) if value not in (None, '') else None
+        except (TypeError, ValueError):
+            manual_grades[subject] = None
+    return manual_grades
+
+
+def get_ocr_verifier(backend=None):
+    """
+    Create an OCR verifier for the configured backend
+
+    Args:
+        backend: 'vision', 'easyocr' or 'fixture'; defaults to settings.OCR_BACKEND
+
+    Returns:
+        OCRGradeVerifier instance
+    """
+    from .ocr_service import OCRGradeVerifier
+
+    return OCRGradeVerifier(backend=backend)
+
+
+def enqueue_ocr_job(student_lrn, image_path, manual_grades):
+    """
+    Queue a report card for background OCR verification
+
+    Returns:
+        The new OCRJob
+    """
+    return OCRJob.objects.create(
+        student_lrn=student_lrn or '',
+        image_path=image_path,
+        manual_grades=manual_grades,
+    )
+
+
+def apply_job_result(academic_data, job):
+    """
+    Copy a finished job's result into the session academic data
+
+    Args:
+        academic_data: Academic data dictionary (updated in place)
+        job: OCRJob with status 'done' or 'failed'
+    """
+    if job.status == 'done':
+        academic_data['ocr_verified'] = job.ocr_verified
+        academic_data['ocr_mismatches'] = job.ocr_mismatches
+        academic_data['extracted_grades'] = job.extracted_grades
+    else:
+        # If OCR fails, log error but don't block submission
+        academic_data['ocr_verified'] = None
+        academic_data['ocr_error'] = job.error
+    academic_data.pop('ocr_job_id', None)
+
+
+def resolve_ocr_job(academic_data):
+    """
+    Apply the result of the academic data's OCR job if it has finished
+
+    Used when an enrollment is submitted before the academic page saw the
+    result, so ocr_verified is not saved as None for a job that is done.
+
+    Returns:
+        The OCRJob, or None when there is no job
+    """
+    job_id = academic_data.get('ocr_job_id')
+    if not job_id:
+        return None
+
+    job = OCRJob.objects.filter(pk=job_id).only(
+        'status', 'ocr_verified', 'ocr_mismatches', 'extracted_grades', 'confidence', 'error'
+    ).first()
+    if job is not None and job.status in ('done', 'failed'):
+        apply_job_result(academic_data, job)
+    return job
+
+
+def claim_next_job(worker_name, lease_seconds=None, max_attempts=3):
+    """
+    Atomically claim the oldest pending job
+
+    The conditional UPDATE only succeeds for one worker, so jobs are never
+    processed twice, on any database backend. A 'processing' job whose
+    started_at is older than lease_seconds belonged to a worker that died;
+    it is claimed again and the lost run counts as an attempt (a job out of
+    attempts is marked failed instead).
+
+    Args:
+        worker_name: Name stored on the claimed job
+        lease_seconds: How long a worker may hold a job
+            (default settings.OCR_JOB_LEASE_SECONDS or 300)
+        max_attempts: Attempts before an expired job is marked failed
+
+    Returns:
+        OCRJob or None when the queue is empty
+    """
+    if lease_seconds is None:
+        lease_seconds = getattr(settings, 'OCR_JOB_LEASE_SECONDS', 300)
+    now = timezone.now()
+    expired = Q(status='processing', started_at__lt=now - timedelta(seconds=lease_seconds))
+
+    candidates = OCRJob.objects.filter(Q(status='pending') | expired).order_by('created_at').values_list(
+        'pk', 'status', 'started_at', 'attempts'
+    )[:5]
+
+    for pk, status, started_at, attempts in candidates:
+        if status == 'pending':
+            claimed = OCRJob.objects.filter(pk=pk, status='pending').update(
+                status='processing',
+                worker=worker_name,
+                started_at=now,
+            )
+        elif attempts + 1 >= max_attempts:
+            OCRJob.objects.filter(pk=pk, status='processing', started_at=started_at).update(
+                status='failed',
+                attempts=F('attempts') + 1,
+                error='Worker lease expired',
+                finished_at=now,
+            )
+            continue
+        else:
+            # Matching started_at keeps two workers from re-claiming the same job
+            claimed = OCRJob.objects.filter(pk=pk, status='processing', started_at=started_at).update(
+                worker=worker_name,
+                attempts=F('attempts') + 1,
+                started_at=now,
+            )
+        if claimed:
+            return OCRJob.objects.get(pk=pk)
+    return None
+
+
+def process_job(job, verifier, max_attempts=3):
+    """
+    Run OCR for one claimed job and store the result
+
+    Failed jobs go back to 'pending' until max_attempts is reached.
+    """
+    fields = ['status', 'attempts', 'finished_at', 'error']
+    job.attempts += 1
+
+    try:
+        extracted_grades = verifier.extract_grades_from_image(job.image_path)
+        result = verifier.verify_grades(extracted_grades, job.manual_grades)
+
+        job.status = 'done'
+        job.ocr_verified = result['is_match']
+        job.ocr_mismatches = result['mismatches']
+        job.extracted_grades = extracted_grades
+        job.confidence = result['confidence']
+        job.error = None
+        fields += ['ocr_verified', 'ocr_mismatches', 'extracted_grades', 'confidence']
+    except Exception as e:
+        logger.exception("OCR job %s failed (attempt %s)", job.pk, job.attempts)
+        job.error = str(e)
+        job.status = 'failed' if job.attempts >= max_attempts else 'pending'
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=fields)
+    return job
+
+
+class OCRWorkerPool:
+    """
+    Pool of worker threads that drain the OCR job queue
+
+    Vision calls are network-bound, so threads overlap the waiting. Each
+    thread has its own verifier and database connection; the backend
+    (e.g. a loaded EasyOCR model) is shared and kept warm for the life of
+    the process.
+    """
+
+    def __init__(self, num_workers=None, backend=None, poll_interval=1.0, max_attempts=3, lease_seconds=None):
+        self.num_workers = num_workers or getattr(settings, 'OCR_WORKERS', 2)
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.name_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    @property
+    def backend_name(self):
+        return get_ocr_backend(self.backend).name
+
+    def warm_up(self):
+        """Load the OCR backend before the first job arrives"""
+        get_ocr_backend(self.backend).warm_up()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, once=False):
+        """
+        Start the workers and block until they finish
+
+        Args:
+            once: Exit when the queue is empty instead of polling forever
+        """
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(f"{self.name_prefix}:{i}", once),
+                name=f"ocr-worker-{i}",
+                daemon=True,
+            )
+            for i in range(self.num_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+
+        return {'processed': self.processed, 'failed': self.failed}
+
+    def _work(self, worker_name, once):
+        verifier = get_ocr_verifier(self.backend)
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                job = claim_next_job(worker_name, self.lease_seconds, self.max_attempts)
+
+                if job is None:
+                    if once:
+                        return
+                    self._stop.wait(self.poll_interval)
+                    continue
+
+                job = process_job(job, verifier, max_attempts=self.max_attempts)
+                with self._lock:
+                    if job.status == 'done':
+                        self.processed += 1
+                    elif job.status == 'failed':
+                        self.failed += 1
+        finally:
+            connection.close()
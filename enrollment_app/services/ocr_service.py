@@ -1,24 +1,229 @@
 """
-OCR Service for Grade Verification (Google Vision API)
+OCR Service for Grade Verification (Google Vision API or a local engine)
 
 Flow:
 - Students input final grades per subject.
 - Students upload a report card image (image/PDF).
-- We call Google Vision DOCUMENT_TEXT_DETECTION to get raw text.
+- Photos are shrunk before OCR (orientation, grayscale, downscale, margin crop).
+- The configured OCR backend (see ocr_backends.py) returns the raw text.
 - Parse each line to find subject names and final grades (last numeric in line).
 - Normalize subject names to match system labels.
 - Compare extracted grades vs manual input with tolerance.
+
+Vision results are cached by file content (see ocr_cache.py), so
+re-uploading the same report card does not call Vision again.
 """
 
+import hashlib
+import io
+import json
+import logging
 import re
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .ocr_backends import OCRBackend, get_ocr_backend
+from .ocr_cache import get_ocr_result_cache
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------------------------------
+# IMAGE PRE-PROCESSING
+# ----------------------------------------------------
+
+class ReportCardPreprocessor:
+    """
+    Shrink report card photos before they are sent to OCR
+
+    Phone photos are often 4-12 MB of colour pixels at far more resolution
+    than OCR needs. This applies the EXIF orientation, converts to grayscale,
+    downscales to target_dpi on a page of page_long_side_inches, crops the
+    blank margins and re-encodes as JPEG. Files Pillow cannot open (e.g. PDF)
+    and files that would not get smaller are sent unchanged.
+    """
+
+    def __init__(
+        self,
+        target_dpi: int = 200,
+        page_long_side_inches: float = 11.7,
+        jpeg_quality: int = 85,
+        margin_threshold: int = 200,
+        margin_padding: int = 16,
+    ):
+        self.target_dpi = target_dpi
+        self.page_long_side_inches = page_long_side_inches
+        self.jpeg_quality = jpeg_quality
+        self.margin_threshold = margin_threshold
+        self.margin_padding = margin_padding
+
+    @property
+    def max_long_side(self) -> int:
+        return int(round(self.target_dpi * self.page_long_side_inches))
+
+    def process(self, content: bytes) -> Tuple[bytes, Dict]:
+        """
+        Pre-process image bytes
+
+        Returns:
+            (bytes to send to OCR, stats dict with before/after sizes and timing)
+        """
+        started = time.perf_counter()
+        stats = {
+            'applied': False,
+            'original_bytes': len(content),
+            'processed_bytes': len(content),
+            'original_size': None,
+            'processed_size': None,
+            'elapsed_ms': 0.0,
+        }
+
+        try:
+            image = Image.open(io.BytesIO(content))
+            image.load()
+        except (UnidentifiedImageError, OSError):
+            stats['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            return content, stats
+
+        stats['original_size'] = image.size
+
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('L')
+
+        # Downscale so the long side matches target_dpi on a report card page
+        long_side = max(image.size)
+        if long_side > self.max_long_side:
+            scale = self.max_long_side / long_side
+            image = image.resize(
+                (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                Image.LANCZOS,
+            )
+
+        image = self._crop_margins(image)
+
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=self.jpeg_quality, optimize=True)
+        processed = output.getvalue()
+
+        stats['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        if len(processed) >= len(content):
+            return content, stats
+
+        stats['applied'] = True
+        stats['processed_bytes'] = len(processed)
+        stats['processed_size'] = image.size
+        return processed, stats
+
+    def _crop_margins(self, image):
+        """Crop to the bounding box of dark (ink) pixels, keeping some padding"""
+        mask = image.point(lambda p: 255 if p < self.margin_threshold else 0)
+        bbox = mask.getbbox()
+        if not bbox:
+            return image
+
+        left, top, right, bottom = bbox
+        pad = self.margin_padding
+        bbox = (
+            max(0, left - pad),
+            max(0, top - pad),
+            min(image.width, right + pad),
+            min(image.height, bottom + pad),
+        )
+        if bbox == (0, 0, image.width, image.height):
+            return image
+        return image.crop(bbox)
+
+
+def get_default_preprocessor() -> Optional[ReportCardPreprocessor]:
+    """Pre-processor configured in settings, or None when OCR_PREPROCESS_ENABLED is False"""
+    if not getattr(settings, 'OCR_PREPROCESS_ENABLED', True):
+        return None
+    return ReportCardPreprocessor(
+        target_dpi=getattr(settings, 'OCR_TARGET_DPI', 200),
+        jpeg_quality=getattr(settings, 'OCR_JPEG_QUALITY', 85),
+    )
+
+
+# ----------------------------------------------------
+# SUBJECT MATCHING
+# ----------------------------------------------------
+
+class SubjectMatcher:
+    """
+    Single-pass subject and grade matcher for OCR text
+
+    All aliases are compiled into one regular expression (longest alias
+    first, whole words only, so 'ap' no longer matches inside 'mapeh').
+    One finditer() over the whole text yields each line containing a
+    subject alias; the grade is the last number on that line.
+    """
+
+    GRADE_PATTERN = r'\d{2,3}(?:\.\d+)?'
+
+    _compiled = {}
+    _compiled_lock = threading.Lock()
+
+    def __init__(self, subject_aliases: Dict[str, List[str]]):
+        self.alias_to_subject = {}
+        for subject, aliases in subject_aliases.items():
+            for alias in aliases:
+                # First subject listing an alias keeps it
+                self.alias_to_subject.setdefault(alias.lower(), subject)
+
+        alternation = '|'.join(
+            re.escape(alias)
+            for alias in sorted(self.alias_to_subject, key=len, reverse=True)
+        )
+        words = rf'(?<![a-z0-9])(?P<alias>{alternation})(?![a-z0-9])'
+
+        self.alias_pattern = re.compile(words)
+        self.grade_pattern = re.compile(self.GRADE_PATTERN)
+        # Whole line, captured at its leftmost subject alias
+        self.line_pattern = re.compile(rf'^[^\n]*?{words}[^\n]*$', re.MULTILINE)
+
+    @classmethod
+    def for_aliases(cls, subject_aliases: Dict[str, List[str]]) -> 'SubjectMatcher':
+        key = json.dumps(subject_aliases, sort_keys=True)
+        matcher = cls._compiled.get(key)
+        if matcher is None:
+            with cls._compiled_lock:
+                matcher = cls._compiled.get(key)
+                if matcher is None:
+                    matcher = cls(subject_aliases)
+                    cls._compiled[key] = matcher
+        return matcher
+
+    def match_subject(self, line: str) -> Optional[str]:
+        """Subject of the leftmost alias in the line, or None."""
+        match = self.alias_pattern.search(line.lower())
+        return self.alias_to_subject[match.group('alias')] if match else None
+
+    def parse(self, text: str, min_grade: float, max_grade: float) -> Dict[str, float]:
+        """Grades per subject; the first line for a subject wins."""
+        extracted: Dict[str, float] = {}
+        for match in self.line_pattern.finditer(text.lower()):
+            subject = self.alias_to_subject[match.group('alias')]
+            if subject in extracted:
+                continue
 
-from google.cloud import vision
-from PIL import Image
+            numbers = self.grade_pattern.findall(match.group(0))
+            if not numbers:
+                continue
+            grade_val = float(numbers[-1])
+            if min_grade <= grade_val <= max_grade:
+                extracted[subject] = grade_val
+        return extracted
 
 
 class OCRGradeVerifier:
-    """Extract grades from report cards using Google Vision and compare to manual input."""
+    """Extract grades from report cards using an OCR backend and compare to manual input."""
+
+    # Bump when _parse_text/_match_subject change; cached OCR text is re-parsed
+    PARSER_VERSION = 3
 
     SUBJECT_ALIASES = {
         'filipino': ['filipino'],
@@ -36,65 +241,90 @@ class OCRGradeVerifier:
         tolerance: float = 2.0,
         min_grade: int = 70,
         max_grade: int = 100,
+        use_cache: bool = True,
+        preprocessor: Optional[ReportCardPreprocessor] = None,
+        backend=None,
     ):
+        """
+        Args:
+            backend: OCRBackend instance or backend name; defaults to settings.OCR_BACKEND
+        """
         self.tolerance = tolerance
         self.min_grade = min_grade
         self.max_grade = max_grade
-        # Vision client will pick credentials from GOOGLE_APPLICATION_CREDENTIALS
-        self.client = vision.ImageAnnotatorClient()
+        self.cache = get_ocr_result_cache() if use_cache else None
+        self.preprocessor = preprocessor or get_default_preprocessor()
+        self.last_preprocess_stats = None
+        # Shared per-process instance, so local engines stay loaded
+        self.backend = backend if isinstance(backend, OCRBackend) else get_ocr_backend(backend)
 
     # ----------------------------------------------------
-    # OCR PIPELINE (Google Vision)
+    # OCR PIPELINE
     # ----------------------------------------------------
 
     def extract_grades_from_image(self, image_path: str) -> Dict[str, float]:
-        """Call Vision API and parse grades per subject."""
+        """Run OCR (or use the result cache) and parse grades per subject."""
         try:
             with open(image_path, 'rb') as f:
                 content = f.read()
 
-            image = vision.Image(content=content)
-            response = self.client.document_text_detection(image=image)
+            if self.cache is None:
+                return self._parse_text(self._extract_text(self._preprocess(content), image_path))
 
-            if response.error.message:
-                raise Exception(response.error.message)
+            # Cache by the original upload, before pre-processing
+            parser_version = self.get_parser_version()
+            key, grades = self.cache.lookup(
+                content, parser_version, self._parse_text, namespace=self.backend.name
+            )
+            if grades is not None:
+                return dict(grades)
 
-            full_text = response.full_text_annotation.text or ''
-            return self._parse_text(full_text)
+            full_text = self._extract_text(self._preprocess(content), image_path)
+            grades = self._parse_text(full_text)
+            self.cache.set(key, full_text, grades, parser_version, namespace=self.backend.name)
+            return grades
         except Exception as e:
             raise Exception(f"OCR extraction failed: {str(e)}")
 
-    def _parse_text(self, text: str) -> Dict[str, float]:
-        """Parse Vision full text: find subject lines and grab last numeric as final grade."""
-        extracted: Dict[str, float] = {}
-        lines = [line.strip().lower() for line in text.split('\n') if line.strip()]
+    def _preprocess(self, content: bytes) -> bytes:
+        """Run the pre-processor (if any) and keep its stats."""
+        if self.preprocessor is None:
+            self.last_preprocess_stats = None
+            return content
+
+        processed, stats = self.preprocessor.process(content)
+        self.last_preprocess_stats = stats
+        if stats['applied']:
+            logger.debug(
+                "OCR pre-processing: %s -> %s bytes (%s -> %s) in %s ms",
+                stats['original_bytes'], stats['processed_bytes'],
+                stats['original_size'], stats['processed_size'], stats['elapsed_ms'],
+            )
+        return processed
 
-        for line in lines:
-            # Find candidate grade (last numeric value in line)
-            numbers = re.findall(r'(\d{2,3}(?:\.\d+)?)', line)
-            if not numbers:
-                continue
-            try:
-                grade_val = float(numbers[-1])
-            except ValueError:
-                continue
+    def _extract_text(self, content: bytes, image_path: str) -> str:
+        """Raw OCR text for the file from the configured backend."""
+        return self.backend.extract_text(content, image_path)
 
-            if not (self.min_grade <= grade_val <= self.max_grade):
-                continue
+    def get_parser_version(self) -> str:
+        """Fingerprint of everything that affects _parse_text output."""
+        signature = json.dumps(
+            [self.PARSER_VERSION, self.SUBJECT_ALIASES, self.min_grade, self.max_grade],
+            sort_keys=True,
+        )
+        return hashlib.sha256(signature.encode('utf-8')).hexdigest()[:16]
 
-            # Find subject match
-            matched_subject = self._match_subject(line)
-            if matched_subject and matched_subject not in extracted:
-                extracted[matched_subject] = grade_val
-
-        return extracted
+    def _parse_text(self, text: str) -> Dict[str, float]:
+        """Parse OCR full text: find subject lines and grab last numeric as final grade."""
+        return self.get_subject_matcher().parse(text, self.min_grade, self.max_grade)
 
     def _match_subject(self, line: str) -> Optional[str]:
-        for canonical, aliases in self.SUBJECT_ALIASES.items():
-            for alias in aliases:
-                if alias in line:
-                    return canonical
-        return None
+        return self.get_subject_matcher().match_subject(line)
+
+    @classmethod
+    def get_subject_matcher(cls) -> 'SubjectMatcher':
+        """Compiled matcher for the current SUBJECT_ALIASES (built once per alias table)."""
+        return SubjectMatcher.for_aliases(cls.SUBJECT_ALIASES)
 
     # ----------------------------------------------------
     # VERIFICATION LOGIC
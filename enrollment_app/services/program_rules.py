@@ -0,0 +1,244 @@
+"""
+Program Rule Compiler
+Turns the declarative program rules in ProgramRecommendationEngine.PROGRAMS
+into predicate functions (one student) and array masks (whole cohort).
+
+A rule is a dictionary in one of three forms:
+
+    {'score': 100, 'when': [conditions]}           # score if every condition holds
+    {'fraction_of': [conditions]}                  # percentage of conditions met
+    {'score': 80, 'at_least': 2, 'of': [conditions]}
+
+A condition is a (field, operator, value) tuple, for example
+('overall_average', '>=', 90) or ('studious', '==', False). Interests use
+('interest', 'any', ['math', 'mathematics']) and hold when the student has
+any of the listed interests.
+"""
+
+import operator
+
+import numpy as np
+
+
+# Normalized input fields a condition can test
+# (see ProgramRecommendationEngine.normalize_inputs)
+VALUE_FIELDS = [
+    'overall_average',
+    'min_subject_grade',
+    'dost_exam_result',
+    'is_sped',
+    'is_working_student',
+    'interested_program',
+]
+CHARACTERISTIC_FIELDS = ['active', 'studious', 'smart', 'creative', 'artistic']
+
+OPERATORS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+class RuleDefinitionError(ValueError):
+    """Raised when a program rule definition cannot be compiled"""
+
+
+class CompiledCondition:
+    """A single condition compiled for both scalar and array evaluation"""
+
+    def __init__(self, condition, interest_columns):
+        try:
+            field, op, value = condition
+        except (TypeError, ValueError):
+            raise RuleDefinitionError(f'Invalid condition: {condition!r}')
+
+        self.condition = (field, op, value)
+
+        if field == 'interest':
+            if op != 'any':
+                raise RuleDefinitionError(f"Interest conditions only support 'any': {condition!r}")
+            interests = [value] if isinstance(value, str) else list(value)
+            interest_set = frozenset(interests)
+            flag_indexes = [interest_columns.index(i) for i in interests if i in interest_columns]
+
+            def check_student(inputs):
+                if inputs['interested_program'] in interest_set:
+                    return True
+                flags = inputs['interests']
+                return any(flags[i] for i in flag_indexes)
+
+            def check_cohort(cohort):
+                mask = np.isin(cohort.interested_program, interests)
+                if flag_indexes:
+                    mask |= cohort.interests[:, flag_indexes].any(axis=1)
+                return mask
+
+        else:
+            if op not in OPERATORS:
+                raise RuleDefinitionError(f'Unknown operator {op!r} in {condition!r}')
+            compare = OPERATORS[op]
+
+            if field in CHARACTERISTIC_FIELDS:
+                column = CHARACTERISTIC_FIELDS.index(field)
+
+                def check_student(inputs):
+                    return compare(inputs['characteristics'][field], value)
+
+                def check_cohort(cohort):
+                    return np.asarray(compare(cohort.characteristics[:, column], value), dtype=bool)
+
+            elif field in VALUE_FIELDS:
+                def check_student(inputs):
+                    return compare(inputs[field], value)
+
+                def check_cohort(cohort):
+                    return np.asarray(compare(getattr(cohort, field), value), dtype=bool)
+
+            else:
+                raise RuleDefinitionError(f'Unknown field {field!r} in {condition!r}')
+
+        self.check_student = check_student
+        self.check_cohort = check_cohort
+
+
+class CompiledScoreRule:
+    """An academic or non-academic scoring rule"""
+
+    def __init__(self, rule, interest_columns):
+        rule = rule or {}
+        self.kind = None
+        self.score = 0
+        self.at_least = 0
+        self.conditions = []
+
+        if 'fraction_of' in rule:
+            self.kind = 'fraction'
+            conditions = rule['fraction_of']
+            if not conditions:
+                raise RuleDefinitionError('fraction_of needs at least one condition')
+        elif 'at_least' in rule:
+            self.kind = 'at_least'
+            self.score = rule['score']
+            self.at_least = rule['at_least']
+            conditions = rule.get('of', [])
+        elif 'when' in rule:
+            self.kind = 'when'
+            self.score = rule['score']
+            conditions = rule['when']
+        elif rule:
+            raise RuleDefinitionError(f'Unrecognized rule: {rule!r}')
+        else:
+            conditions = []
+
+        self.conditions = [CompiledCondition(c, interest_columns) for c in conditions]
+        self._checks = [c.check_student for c in self.conditions]
+
+    @property
+    def is_fraction(self):
+        return self.kind == 'fraction'
+
+    def is_met(self, inputs):
+        """True when the rule awards its full score to this student"""
+        if self.kind == 'at_least':
+            return self._count_met(inputs) >= self.at_least
+        if self.kind is None:
+            return False
+        for check in self._checks:
+            if not check(inputs):
+                return False
+        return True
+
+    def evaluate(self, inputs):
+        """Score for one student's normalized inputs"""
+        if self.kind == 'fraction':
+            return (self._count_met(inputs) / len(self._checks)) * 100
+        if self.kind is None:
+            return 0
+        return self.score if self.is_met(inputs) else 0
+
+    def _count_met(self, inputs):
+        met = 0
+        for check in self._checks:
+            if check(inputs):
+                met += 1
+        return met
+
+    def evaluate_cohort(self, cohort):
+        """Scores for a whole cohort (CohortArrays) as a float array"""
+        n = len(cohort)
+        if self.kind is None:
+            return np.zeros(n, dtype=np.float64)
+
+        if self.conditions:
+            masks = np.stack([c.check_cohort(cohort) for c in self.conditions], axis=1)
+        else:
+            masks = np.ones((n, 0), dtype=bool)
+
+        if self.kind == 'fraction':
+            return (np.sum(masks, axis=1) / len(self.conditions)) * 100
+        if self.kind == 'at_least':
+            met = np.sum(masks, axis=1) >= self.at_least
+        else:
+            met = masks.all(axis=1)
+        return np.where(met, self.score, 0).astype(np.float64)
+
+
+class CompiledProgramRule:
+    """All compiled rules for one program"""
+
+    def __init__(self, code, definition, interest_columns):
+        self.code = code
+        self.name = definition['name']
+        self.total_criteria = definition.get('total_criteria', 1)
+        self.special_checks = definition.get('special_checks', [])
+        self.validate_on_confirm = definition.get('validate_on_confirm', False)
+        self.academic = CompiledScoreRule(definition.get('academic_rule'), interest_columns)
+        self.non_academic = CompiledScoreRule(definition.get('non_academic_rule'), interest_columns)
+
+    def get_special_checks(self):
+        """Fresh copy of the special checks for a recommendation"""
+        return [dict(check) for check in self.special_checks]
+
+    @property
+    def requires_database_verification(self):
+        """True when the student must be listed in Qualified_for_ste"""
+        return any(check.get('type') == 'database_verification' for check in self.special_checks)
+
+    def describe_academic_requirements(self, inputs):
+        """
+        Describe each academic condition next to the student's current value
+
+        Returns:
+            Dictionary of field -> 'Required: ... (Current: ...)'
+        """
+        requirements = {}
+        for condition in self.academic.conditions:
+            field, op, value = condition.condition
+            if field == 'interest':
+                current = inputs['interested_program']
+            elif field in CHARACTERISTIC_FIELDS:
+                current = inputs['characteristics'][field]
+            else:
+                current = inputs[field]
+            requirements[field] = f'Required: {op} {value} (Current: {current})'
+        return requirements
+
+
+def compile_program_rules(programs, interest_columns):
+    """
+    Compile every program definition
+
+    Args:
+        programs: Dictionary of program code -> definition (see module docstring)
+        interest_columns: Interest names in the order of the normalized interest flags
+
+    Returns:
+        Dictionary of program code -> CompiledProgramRule, in program order
+    """
+    return {
+        code: CompiledProgramRule(code, definition, list(interest_columns))
+        for code, definition in programs.items()
+    }
@@ -4,8 +4,17 @@ Handles program recommendations based on academic and non-academic data
 following the defined business rules
 """
 
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
 from coordinator_app.models import Qualified_for_ste
 
+from .program_rules import compile_program_rules
+
 
 class ProgramRecommendationEngine:
     """
@@ -13,39 +22,167 @@ class ProgramRecommendationEngine:
     """
     
     # Program definitions with their requirements
+    # Rules are declarative (see program_rules.py) and compiled once per rules version.
+    # New programs only need a new entry here.
     PROGRAMS = {
         'STE': {
             'name': 'Science, Technology, Engineering',
-            'academic_rule': 'avg_90_above_85_subjects_dost_passed',
-            'non_academic_rule': 'interested_science_math_english_active_studious_smart',
+            # avg 90+, all subjects 85+, DOST passed
+            'academic_rule': {
+                'score': 100,
+                'when': [
+                    ('overall_average', '>=', 90),
+                    ('min_subject_grade', '>=', 85),
+                    ('dost_exam_result', '==', 'passed'),
+                ],
+            },
+            # interested in science, math, English + active + studious + smart
+            'non_academic_rule': {
+                'fraction_of': [
+                    ('interest', 'any', ['science']),
+                    ('interest', 'any', ['math', 'mathematics']),
+                    ('interest', 'any', ['english']),
+                    ('active', '==', True),
+                    ('studious', '==', True),
+                    ('smart', '==', True),
+                ],
+            },
+            'total_criteria': 6,  # 3 academic + 3 non-academic
+            'special_checks': [
+                {
+                    'type': 'database_verification',
+                    'description': 'Verify student in Qualified_for_ste table for DOST exam',
+                    'required': True,
+                },
+            ],
+            # Re-check the academic rule when the student confirms this program
+            'validate_on_confirm': True,
         },
         'SPFL': {
             'name': 'Specialized in Foreign Languages',
-            'academic_rule': 'avg_90_above_85_subjects_no_dost',
-            'non_academic_rule': 'interested_english_foreign_language_arts_tourism_active_studious',
+            # avg 90+, all subjects 85+, DOST not passed
+            'academic_rule': {
+                'score': 90,
+                'when': [
+                    ('overall_average', '>=', 90),
+                    ('min_subject_grade', '>=', 85),
+                    ('dost_exam_result', '!=', 'passed'),
+                ],
+            },
+            # interested in English, foreign language, arts, tourism + active + studious
+            'non_academic_rule': {
+                'fraction_of': [
+                    ('interest', 'any', ['english']),
+                    ('interest', 'any', ['foreign language', 'language']),
+                    ('interest', 'any', ['arts']),
+                    ('interest', 'any', ['tourism']),
+                    ('active', '==', True),
+                    ('studious', '==', True),
+                ],
+            },
+            'total_criteria': 5,  # 2 academic + 3 non-academic
         },
         'SPTVE': {
             'name': 'Specialized in Technology, Vocational & English',
-            'academic_rule': 'avg_90_above_85_subjects_no_dost',
-            'non_academic_rule': 'interested_english_technology_arts_crafts_creative_studious_smart_artistic',
+            # avg 90+, all subjects 85+, DOST not passed
+            'academic_rule': {
+                'score': 90,
+                'when': [
+                    ('overall_average', '>=', 90),
+                    ('min_subject_grade', '>=', 85),
+                    ('dost_exam_result', '!=', 'passed'),
+                ],
+            },
+            # interested in English, technology, arts, crafts + creative + studious + smart + artistic
+            'non_academic_rule': {
+                'fraction_of': [
+                    ('interest', 'any', ['english']),
+                    ('interest', 'any', ['technology', 'tech']),
+                    ('interest', 'any', ['arts']),
+                    ('interest', 'any', ['crafts']),
+                    ('creative', '==', True),
+                    ('studious', '==', True),
+                    ('smart', '==', True),
+                    ('artistic', '==', True),
+                ],
+            },
+            'total_criteria': 5,  # 2 academic + 3 non-academic
         },
         'SNED L': {
             'name': 'Special Needs Education Program',
-            'academic_rule': 'all_students_with_disability',
-            'non_academic_rule': 'has_disability',
+            # all students with disability
+            'academic_rule': {'score': 100, 'when': [('is_sped', '==', True)]},
+            'non_academic_rule': {'score': 100, 'when': [('is_sped', '==', True)]},
+            'total_criteria': 2,  # 1 academic + 1 non-academic
         },
         'OHSP': {
             'name': 'Out-of-School Youth Program',
-            'academic_rule': 'working_student',
-            'non_academic_rule': 'working_student',
+            # working student
+            'academic_rule': {'score': 100, 'when': [('is_working_student', '==', True)]},
+            'non_academic_rule': {'score': 100, 'when': [('is_working_student', '==', True)]},
+            'total_criteria': 2,  # 1 academic + 1 non-academic
         },
         'REGULAR': {
             'name': 'Regular Program',
-            'academic_rule': 'avg_89_below',
-            'non_academic_rule': 'average_student_not_studious_not_smart',
+            # avg 89 and below
+            'academic_rule': {'score': 80, 'when': [('overall_average', '<=', 89)]},
+            # average student: at least 2 of not studious, not smart, not active
+            'non_academic_rule': {
+                'score': 80,
+                'at_least': 2,
+                'of': [
+                    ('studious', '==', False),
+                    ('smart', '==', False),
+                    ('active', '==', False),
+                ],
+            },
+            'total_criteria': 2,  # 1 academic + 1 non-academic
         },
     }
     
+    # Grade 6 subject fields used for the per-subject minimum check
+    SUBJECT_FIELDS = [
+        'mathematics',
+        'araling_panlipunan',
+        'english',
+        'edukasyon_sa_pagpapakatao',
+        'science',
+        'edukasyon_pangkabuhayan',
+        'filipino',
+        'mapeh',
+    ]
+    
+    # Map survey fields to interests
+    INTEREST_FIELDS = {
+        'interested_science': 'science',
+        'interested_math': 'math',
+        'interested_english': 'english',
+        'interested_technology': 'technology',
+        'interested_arts': 'arts',
+        'interested_foreign_language': 'foreign language',
+        'interested_tourism': 'tourism',
+        'interested_crafts': 'crafts',
+    }
+    
+    # Map survey fields to characteristics
+    CHARACTERISTIC_FIELDS = {
+        'is_active': 'active',
+        'is_studious': 'studious',
+        'is_smart': 'smart',
+        'is_creative': 'creative',
+        'is_artistic': 'artistic',
+        'potential_genius': 'active',  # Active means potential genius
+    }
+    
+    # Survey answers that count as "yes"
+    TRUTHY_VALUES = [True, 'Yes', 'yes', 'true', 'True']
+    
+    # Bump when the rules change meaning without a change to the tables above
+    RULES_REVISION = 1
+    _rules_version = None
+    _compiled_rules = None
+    _compiled_rules_version = None
+    
     def __init__(self, student_lrn, academic_data, survey_data, student_data):
         """
         Initialize recommendation engine with student data
@@ -62,6 +199,114 @@ class ProgramRecommendationEngine:
         self.student_data = student_data or {}
         self.recommendations = []
         
+    @classmethod
+    def normalize_inputs(cls, academic_data, survey_data, student_data):
+        """
+        Reduce the raw form dictionaries to the values the rules actually read
+        
+        Args:
+            academic_data: Dictionary containing academic information
+            survey_data: Dictionary containing survey/non-academic information
+            student_data: Dictionary containing basic student information
+        
+        Returns:
+            Dictionary of normalized inputs
+        """
+        academic_data = academic_data or {}
+        survey_data = survey_data or {}
+        student_data = student_data or {}
+        
+        # Later fields win, same as _parse_characteristics
+        characteristics = {}
+        for field, char in cls.CHARACTERISTIC_FIELDS.items():
+            characteristics[char] = survey_data.get(field) in cls.TRUTHY_VALUES
+        
+        grades = [
+            float(academic_data.get(subject, 0) or 0)
+            for subject in cls.SUBJECT_FIELDS
+        ]
+        valid_grades = [g for g in grades if g > 0]
+        
+        return {
+            'overall_average': float(academic_data.get('overall_average', 0)),
+            'grades': grades,
+            # 0 when no grades were entered, so "all subjects >= X" fails
+            'min_subject_grade': min(valid_grades) if valid_grades else 0,
+            'dost_exam_result': (academic_data.get('dost_exam_result') or '').lower().strip(),
+            'is_sped': bool(student_data.get('is_sped', False)),
+            'is_working_student': bool(student_data.get('is_working_student', False)),
+            'interests': [
+                survey_data.get(field) in cls.TRUTHY_VALUES
+                for field in cls.INTEREST_FIELDS
+            ],
+            'interested_program': (survey_data.get('interested_program') or '').lower(),
+            'characteristics': characteristics,
+        }
+    
+    @classmethod
+    def get_rule_tables(cls):
+        """All rule tables that affect the recommendation output"""
+        return {
+            'programs': cls.PROGRAMS,
+            'subjects': cls.SUBJECT_FIELDS,
+            'interests': cls.INTEREST_FIELDS,
+            'characteristics': cls.CHARACTERISTIC_FIELDS,
+            'truthy_values': cls.TRUTHY_VALUES,
+            'revision': cls.RULES_REVISION,
+        }
+    
+    @classmethod
+    def get_rules_version(cls):
+        """
+        Fingerprint of the rule tables, computed on first use
+        
+        The tables are class constants, so the version is fixed for the life
+        of the process. Code that edits PROGRAMS (or the other tables) at
+        runtime must call invalidate_rules() afterwards.
+        """
+        if cls._rules_version is None:
+            payload = json.dumps(cls.get_rule_tables(), sort_keys=True, default=str)
+            cls._rules_version = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return cls._rules_version
+    
+    @classmethod
+    def invalidate_rules(cls):
+        """Recompute the rules version and compiled rules after the tables were edited"""
+        cls._rules_version = None
+        cls._compiled_rules = None
+        cls._compiled_rules_version = None
+        # Summaries are keyed by the old version; drop them instead of letting them age out
+        recommendation_cache.clear()
+    
+    @classmethod
+    def get_input_fingerprint(cls, academic_data, survey_data, student_data):
+        """
+        Stable hash of the normalized inputs plus the rules version
+        
+        Two submissions that differ only in fields the rules ignore
+        (names, addresses, ...) get the same fingerprint.
+        """
+        inputs = cls.normalize_inputs(academic_data, survey_data, student_data)
+        # normalize_inputs builds its dictionary in a fixed order, so repr() is canonical
+        payload = f'{cls.get_rules_version()}:{inputs!r}'
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def get_compiled_rules(cls):
+        """
+        Compiled program rules, rebuilt only when the rules version changes
+        
+        Returns:
+            Dictionary of program code -> CompiledProgramRule, in PROGRAMS order
+        """
+        rules_version = cls.get_rules_version()
+        if cls._compiled_rules_version != rules_version:
+            cls._compiled_rules = compile_program_rules(
+                cls.PROGRAMS, list(cls.INTEREST_FIELDS.values())
+            )
+            cls._compiled_rules_version = rules_version
+        return cls._compiled_rules
+    
     def generate_recommendations(self):
         """
         Generate program recommendations based on academic and non-academic rules
@@ -76,14 +321,17 @@ class ProgramRecommendationEngine:
     def _evaluate_all_programs(self):
         """Evaluate each program against academic and non-academic rules"""
         
+        compiled_rules = self.get_compiled_rules()
+        inputs = self.normalize_inputs(self.academic_data, self.survey_data, self.student_data)
+        
         # Evaluate academic criteria
-        academic_scores = self._evaluate_academic_criteria()
+        academic_scores = self._evaluate_academic_criteria(compiled_rules, inputs)
         
         # Evaluate non-academic criteria
-        non_academic_scores = self._evaluate_non_academic_criteria()
+        non_academic_scores = self._evaluate_non_academic_criteria(compiled_rules, inputs)
         
         # Create recommendations
-        for program_code, program_info in self.PROGRAMS.items():
+        for program_code, rule in compiled_rules.items():
             academic_score = academic_scores.get(program_code, 0)
             non_academic_score = non_academic_scores.get(program_code, 0)
             
@@ -91,175 +339,30 @@ class ProgramRecommendationEngine:
             if academic_score > 0 or non_academic_score > 0:
                 recommendation = {
                     'program_code': program_code,
-                    'program_name': program_info['name'],
+                    'program_name': rule.name,
                     'academic_score': academic_score,
                     'non_academic_score': non_academic_score,
                     'overall_score': (academic_score + non_academic_score) / 2,
                     'criteria_met': self._get_criteria_met(program_code, academic_score, non_academic_score),
-                    'total_criteria': self._get_total_criteria(program_code),
+                    'total_criteria': rule.total_criteria,
                     'percentage_match': self._calculate_percentage_match(program_code, academic_score, non_academic_score),
-                    'special_checks': self._get_special_checks(program_code),
+                    'special_checks': rule.get_special_checks(),
                 }
                 self.recommendations.append(recommendation)
     
-    def _evaluate_academic_criteria(self):
+    def _evaluate_academic_criteria(self, compiled_rules, inputs):
         """Evaluate academic rules for each program"""
-        scores = {}
-        
-        average_grade = float(self.academic_data.get('overall_average', 0))
-        dost_exam_result = self.academic_data.get('dost_exam_result', '').lower().strip()
-        
-        # Get minimum grade per subject
-        grades = [
-            float(self.academic_data.get('mathematics', 0) or 0),
-            float(self.academic_data.get('araling_panlipunan', 0) or 0),
-            float(self.academic_data.get('english', 0) or 0),
-            float(self.academic_data.get('edukasyon_sa_pagpapakatao', 0) or 0),
-            float(self.academic_data.get('science', 0) or 0),
-            float(self.academic_data.get('edukasyon_pangkabuhayan', 0) or 0),
-            float(self.academic_data.get('filipino', 0) or 0),
-            float(self.academic_data.get('mapeh', 0) or 0),
-        ]
-        
-        valid_grades = [g for g in grades if g > 0]
-        min_grade = min(valid_grades) if valid_grades else 0
-        all_subjects_85_above = all(g >= 85 for g in valid_grades) if valid_grades else False
-        
-        # Rule 1: STE - avg 90+, all subjects 85+, DOST passed
-        if average_grade >= 90 and all_subjects_85_above and dost_exam_result == 'passed':
-            scores['STE'] = 100
-        
-        # Rule 2: SPFL/SPTVE - avg 90+, all subjects 85+, DOST not passed
-        if average_grade >= 90 and all_subjects_85_above and dost_exam_result != 'passed':
-            scores['SPFL'] = 90
-            scores['SPTVE'] = 90
-        
-        # Rule 3: REGULAR - avg 89 and below, DOST not passed
-        if average_grade <= 89:
-            scores['REGULAR'] = 80
-        
-        # Disability and working student rules
-        is_pwd = self.student_data.get('is_sped', False)
-        is_working = self.student_data.get('is_working_student', False)
-        
-        if is_pwd:
-            scores['SNED L'] = 100
-        
-        if is_working:
-            scores['OHSP'] = 100
-        
-        return scores
+        return {
+            program_code: rule.academic.evaluate(inputs)
+            for program_code, rule in compiled_rules.items()
+        }
     
-    def _evaluate_non_academic_criteria(self):
+    def _evaluate_non_academic_criteria(self, compiled_rules, inputs):
         """Evaluate non-academic (survey) rules for each program"""
-        scores = {}
-        
-        # Extract survey attributes
-        interests = self._parse_interests()
-        characteristics = self._parse_characteristics()
-        disability_status = self.student_data.get('is_sped', False)
-        working_status = self.student_data.get('is_working_student', False)
-        
-        # STE criteria: interested in science, math, English + active + studious + smart
-        ste_criteria = [
-            'science' in interests,
-            'math' in interests or 'mathematics' in interests,
-            'english' in interests,
-            characteristics.get('active', False),
-            characteristics.get('studious', False),
-            characteristics.get('smart', False),
-        ]
-        scores['STE'] = (sum(ste_criteria) / len(ste_criteria)) * 100 if ste_criteria else 0
-        
-        # SPFL criteria: interested in English, foreign language, arts, tourism + active + studious
-        spfl_criteria = [
-            'english' in interests,
-            'foreign language' in interests or 'language' in interests,
-            'arts' in interests,
-            'tourism' in interests,
-            characteristics.get('active', False),
-            characteristics.get('studious', False),
-        ]
-        scores['SPFL'] = (sum(spfl_criteria) / len(spfl_criteria)) * 100 if spfl_criteria else 0
-        
-        # SPTVE criteria: interested in English, technology, arts, crafts + creative + studious + smart + artistic
-        sptve_criteria = [
-            'english' in interests,
-            'technology' in interests or 'tech' in interests,
-            'arts' in interests,
-            'crafts' in interests,
-            characteristics.get('creative', False),
-            characteristics.get('studious', False),
-            characteristics.get('smart', False),
-            characteristics.get('artistic', False),
-        ]
-        scores['SPTVE'] = (sum(sptve_criteria) / len(sptve_criteria)) * 100 if sptve_criteria else 0
-        
-        # SNED L: has disability
-        if disability_status:
-            scores['SNED L'] = 100
-        
-        # OHSP: working student
-        if working_status:
-            scores['OHSP'] = 100
-        
-        # REGULAR: average student, not studious, not smart/active
-        regular_criteria = [
-            not characteristics.get('studious', True),
-            not characteristics.get('smart', True),
-            not characteristics.get('active', True),
-        ]
-        if sum(regular_criteria) >= 2:
-            scores['REGULAR'] = 80
-        
-        return scores
-    
-    def _parse_interests(self):
-        """Extract student interests from survey data"""
-        interests = []
-        
-        # Map survey fields to interests
-        interest_fields = {
-            'interested_science': 'science',
-            'interested_math': 'math',
-            'interested_english': 'english',
-            'interested_technology': 'technology',
-            'interested_arts': 'arts',
-            'interested_foreign_language': 'foreign language',
-            'interested_tourism': 'tourism',
-            'interested_crafts': 'crafts',
+        return {
+            program_code: rule.non_academic.evaluate(inputs)
+            for program_code, rule in compiled_rules.items()
         }
-        
-        for field, interest in interest_fields.items():
-            if self.survey_data.get(field) in [True, 'Yes', 'yes', 'true', 'True']:
-                interests.append(interest)
-        
-        # Also check the interested_program field
-        interested_program = self.survey_data.get('interested_program', '').lower()
-        if interested_program:
-            interests.append(interested_program)
-        
-        return interests
-    
-    def _parse_characteristics(self):
-        """Extract student characteristics from survey data"""
-        characteristics = {}
-        
-        # Map survey fields to characteristics
-        characteristic_fields = {
-            'is_active': 'active',
-            'is_studious': 'studious',
-            'is_smart': 'smart',
-            'is_creative': 'creative',
-            'is_artistic': 'artistic',
-            'potential_genius': 'active',  # Active means potential genius
-        }
-        
-        for field, char in characteristic_fields.items():
-            value = self.survey_data.get(field)
-            characteristics[char] = value in [True, 'Yes', 'yes', 'true', 'True']
-        
-        return characteristics
     
     def _get_criteria_met(self, program_code, academic_score, non_academic_score):
         """Get list of criteria met for a program"""
@@ -273,37 +376,12 @@ class ProgramRecommendationEngine:
         
         return criteria_met
     
-    def _get_total_criteria(self, program_code):
-        """Get total number of criteria for a program"""
-        criteria_map = {
-            'STE': 6,  # 3 academic + 3 non-academic
-            'SPFL': 5,  # 2 academic + 3 non-academic
-            'SPTVE': 5,  # 2 academic + 3 non-academic
-            'SNED L': 2,  # 1 academic + 1 non-academic
-            'OHSP': 2,  # 1 academic + 1 non-academic
-            'REGULAR': 2,  # 1 academic + 1 non-academic
-        }
-        return criteria_map.get(program_code, 1)
-    
     def _calculate_percentage_match(self, program_code, academic_score, non_academic_score):
         """Calculate percentage of criteria met"""
         if academic_score > 0 or non_academic_score > 0:
             return round((academic_score + non_academic_score) / 2)
         return 0
     
-    def _get_special_checks(self, program_code):
-        """Get special checks required for a program"""
-        special_checks = []
-        
-        if program_code == 'STE':
-            special_checks.append({
-                'type': 'database_verification',
-                'description': 'Verify student in Qualified_for_ste table for DOST exam',
-                'required': True,
-            })
-        
-        return special_checks
-    
     def _rank_recommendations(self):
         """
         Rank recommendations based on percentage match
@@ -317,17 +395,18 @@ class ProgramRecommendationEngine:
         # Assign ranks
         for i, rec in enumerate(self.recommendations, 1):
             rec['rank'] = i
-            
-            # Determine if this is a strong recommendation
-            percentage = rec['percentage_match']
-            if percentage == 100:
-                rec['recommendation_level'] = 'Strong (Meets all criteria)'
-            elif percentage >= 80:
-                rec['recommendation_level'] = 'Good (Meets 80% of criteria)'
-            elif percentage >= 50:
-                rec['recommendation_level'] = 'Fair (Meets 50% of criteria)'
-            else:
-                rec['recommendation_level'] = 'Weak (Meets <50% criteria)'
+            rec['recommendation_level'] = self.get_recommendation_level(rec['percentage_match'])
+    
+    @staticmethod
+    def get_recommendation_level(percentage):
+        """Determine if this is a strong recommendation"""
+        if percentage == 100:
+            return 'Strong (Meets all criteria)'
+        elif percentage >= 80:
+            return 'Good (Meets 80% of criteria)'
+        elif percentage >= 50:
+            return 'Fair (Meets 50% of criteria)'
+        return 'Weak (Meets <50% criteria)'
     
     def check_ste_qualification(self):
         """
@@ -364,7 +443,81 @@ class ProgramRecommendationEngine:
         }
 
 
-def generate_academic_recommendations(student_lrn, academic_data, survey_data, student_data):
+class RecommendationCache:
+    """
+    Bounded, thread-safe LRU cache of recommendation summaries
+    
+    Keys are input fingerprints from ProgramRecommendationEngine.get_input_fingerprint().
+    Each hit returns its own copy of the recommendation dictionaries, so callers
+    can annotate them (e.g. ste_qualified) without touching the cached entry.
+    """
+    
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Return a copy of the cached summary, or None"""
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return self._copy_summary(summary)
+    
+    def set(self, key, summary):
+        """Store a copy of a summary, evicting the least recently used entries"""
+        summary = self._copy_summary(summary)
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def get_stats(self):
+        """Cache size and hit/miss counters"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+    
+    @staticmethod
+    def _copy_summary(summary):
+        """Copy the summary and its recommendation dicts, keeping top 3 shared with the full list"""
+        all_recommendations = summary.get('all_recommendations')
+        if all_recommendations is None:
+            return dict(summary, recommendations=list(summary.get('recommendations', [])))
+        
+        copies = [dict(rec) for rec in all_recommendations]
+        return dict(
+            summary,
+            recommendations=copies[:len(summary['recommendations'])],
+            all_recommendations=copies,
+        )
+
+
+# Per-process cache shared by all requests
+recommendation_cache = RecommendationCache(
+    max_size=getattr(settings, 'RECOMMENDATION_CACHE_SIZE', 1024)
+)
+
+
+def generate_academic_recommendations(student_lrn, academic_data, survey_data, student_data, use_cache=True):
     """
     Main function to generate recommendations
     
@@ -373,10 +526,19 @@ def generate_academic_recommendations(student_lrn, academic_data, survey_data, s
         academic_data: Academic data dictionary
         survey_data: Survey/non-academic data dictionary
         student_data: Student data dictionary
+        use_cache: Reuse the result for identical inputs under the same rules
     
     Returns:
         Dictionary with recommendations
     """
+    if use_cache:
+        cache_key = ProgramRecommendationEngine.get_input_fingerprint(
+            academic_data, survey_data, student_data
+        )
+        cached_summary = recommendation_cache.get(cache_key)
+        if cached_summary is not None:
+            return cached_summary
+    
     engine = ProgramRecommendationEngine(
         student_lrn=student_lrn,
         academic_data=academic_data,
@@ -385,4 +547,9 @@ def generate_academic_recommendations(student_lrn, academic_data, survey_data, s
     )
     
     engine.generate_recommendations()
-    return engine.get_recommendation_summary()
+    summary = engine.get_recommendation_summary()
+    
+    if use_cache:
+        recommendation_cache.set(cache_key, summary)
+    
+    return summary
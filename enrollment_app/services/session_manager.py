@@ -1,161 +1,291 @@
 """
 Enrollment Session Manager
-Manages enrollment form data storage in Django sessions
+Manages enrollment form data until all forms are completed
+
+Form data lives in an EnrollmentDraft row; the session only carries the
+draft ID. Each step's data is its own JSON column, read on first access
+(once per request) and written with a single-column UPDATE.
 """
 
+from datetime import timedelta
+
+from django.conf import settings
 from django.utils import timezone
 
+from ..models import EnrollmentDraft
+
 
 class EnrollmentSessionManager:
     """
-    Manages enrollment form data in session until all forms are completed
+    Manages enrollment form data in the draft store until all forms are completed
     """
     
     SESSION_KEY_PREFIX = 'enrollment_'
     
-    # Session keys
-    KEY_LRN = f'{SESSION_KEY_PREFIX}lrn'
-    KEY_LRN_VERIFIED = f'{SESSION_KEY_PREFIX}lrn_verified'
-    KEY_STUDENT_DATA = f'{SESSION_KEY_PREFIX}student_data'
-    KEY_FAMILY_DATA = f'{SESSION_KEY_PREFIX}family_data'
-    KEY_SURVEY_DATA = f'{SESSION_KEY_PREFIX}survey_data'
-    KEY_ACADEMIC_DATA = f'{SESSION_KEY_PREFIX}academic_data'
-    KEY_PROGRAM_SELECTION = f'{SESSION_KEY_PREFIX}program_selection'
-    KEY_RECOMMENDATIONS = f'{SESSION_KEY_PREFIX}recommendations'
+    # Session key (the only enrollment value kept in the session)
+    KEY_DRAFT_ID = f'{SESSION_KEY_PREFIX}draft_id'
+    
+    # Draft sections already loaded during this request
+    REQUEST_CACHE_ATTR = '_enrollment_draft_sections'
+    
+    # ------------------------------------------------------------------
+    # Draft storage
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def get_draft_id(request):
+        """ID of this session's EnrollmentDraft, or None"""
+        return request.session.get(EnrollmentSessionManager.KEY_DRAFT_ID)
+    
+    @staticmethod
+    def _request_cache(request):
+        cache = getattr(request, EnrollmentSessionManager.REQUEST_CACHE_ATTR, None)
+        if cache is None:
+            cache = {}
+            setattr(request, EnrollmentSessionManager.REQUEST_CACHE_ATTR, cache)
+        return cache
+    
+    @staticmethod
+    def _load(request, *fields):
+        """
+        Load draft columns not yet read in this request (one query for all of them)
+        
+        Returns:
+            dict: field -> value (None when there is no draft)
+        """
+        cache = EnrollmentSessionManager._request_cache(request)
+        missing = [field for field in fields if field not in cache]
+        
+        if missing:
+            row = None
+            draft_id = EnrollmentSessionManager.get_draft_id(request)
+            if draft_id:
+                row = EnrollmentDraft.objects.filter(pk=draft_id).values(*missing).first()
+            for field in missing:
+                cache[field] = row.get(field) if row else None
+        
+        return {field: cache[field] for field in fields}
+    
+    @staticmethod
+    def _get(request, field):
+        return EnrollmentSessionManager._load(request, field)[field]
+    
+    @staticmethod
+    def _save(request, **fields):
+        """Write only the given draft columns, creating the draft on first save"""
+        fields['updated_at'] = timezone.now()
+        draft_id = EnrollmentSessionManager.get_draft_id(request)
+        
+        updated = 0
+        if draft_id:
+            updated = EnrollmentDraft.objects.filter(pk=draft_id).update(**fields)
+        
+        if not updated:
+            if not request.session.session_key:
+                request.session.save()
+            draft = EnrollmentDraft.objects.create(
+                session_key=request.session.session_key,
+                **fields
+            )
+            request.session[EnrollmentSessionManager.KEY_DRAFT_ID] = str(draft.pk)
+            request.session.modified = True
+        
+        EnrollmentSessionManager._request_cache(request).update(fields)
+    
+    # ------------------------------------------------------------------
+    # Save form data
+    # ------------------------------------------------------------------
     
     @staticmethod
     def save_student_data(request, data):
         """
-        Save student data form to session
+        Save student data form to the draft
         
         Args:
             request: Django request object
             data (dict): Student data dictionary
         """
-        request.session[EnrollmentSessionManager.KEY_STUDENT_DATA] = data
-        request.session[EnrollmentSessionManager.KEY_LRN] = data.get('lrn')
-        request.session.modified = True
+        EnrollmentSessionManager._save(request, student_data=data, lrn=data.get('lrn'))
     
     @staticmethod
     def save_family_data(request, data):
-        """Save family data form to session"""
-        request.session[EnrollmentSessionManager.KEY_FAMILY_DATA] = data
-        request.session.modified = True
+        """Save family data form to the draft"""
+        EnrollmentSessionManager._save(request, family_data=data)
     
     @staticmethod
     def save_survey_data(request, data):
-        """Save survey data to session"""
-        request.session[EnrollmentSessionManager.KEY_SURVEY_DATA] = data
-        request.session.modified = True
+        """Save survey data to the draft"""
+        EnrollmentSessionManager._save(request, survey_data=data)
     
     @staticmethod
     def save_academic_data(request, data):
-        """Save academic data to session"""
-        request.session[EnrollmentSessionManager.KEY_ACADEMIC_DATA] = data
-        request.session.modified = True
+        """
+        Save academic data to the draft
+        
+        Args:
+            request: Django request object
+            data: Dictionary containing academic information
+        """
+        EnrollmentSessionManager._save(request, academic_data=data)
     
     @staticmethod
     def save_program_selection(request, data):
-        """Save program selection to session"""
-        request.session[EnrollmentSessionManager.KEY_PROGRAM_SELECTION] = data
-        request.session.modified = True
+        """Save program selection to the draft"""
+        EnrollmentSessionManager._save(request, program_selection=data)
     
     @staticmethod
     def save_recommendations(request, recommendations):
         """
-        Save program recommendations to session
+        Save program recommendations to the draft
         
         Args:
             request: Django request object
             recommendations: Dictionary containing recommendation results
         """
-        request.session[EnrollmentSessionManager.KEY_RECOMMENDATIONS] = recommendations
-        request.session.modified = True
+        EnrollmentSessionManager._save(request, recommendations=recommendations)
+    
+    # ------------------------------------------------------------------
+    # Retrieve form data
+    # ------------------------------------------------------------------
     
     @staticmethod
     def get_student_data(request):
-        """Retrieve student data from session"""
-        return request.session.get(EnrollmentSessionManager.KEY_STUDENT_DATA)
+        """Retrieve student data from the draft"""
+        return EnrollmentSessionManager._get(request, 'student_data')
     
     @staticmethod
     def get_family_data(request):
-        """Retrieve family data from session"""
-        return request.session.get(EnrollmentSessionManager.KEY_FAMILY_DATA)
+        """Retrieve family data from the draft"""
+        return EnrollmentSessionManager._get(request, 'family_data')
     
     @staticmethod
     def get_survey_data(request):
-        """Retrieve survey data from session"""
-        return request.session.get(EnrollmentSessionManager.KEY_SURVEY_DATA)
+        """Retrieve survey data from the draft"""
+        return EnrollmentSessionManager._get(request, 'survey_data')
     
     @staticmethod
     def get_academic_data(request):
-        """Retrieve academic data from session"""
-        return request.session.get(EnrollmentSessionManager.KEY_ACADEMIC_DATA)
+        """
+        Retrieve academic data from the draft
+        
+        Args:
+            request: Django request object
+        
+        Returns:
+            Dictionary containing academic data or None
+        """
+        return EnrollmentSessionManager._get(request, 'academic_data')
     
     @staticmethod
     def get_program_selection(request):
-        """Retrieve program selection from session"""
-        return request.session.get(EnrollmentSessionManager.KEY_PROGRAM_SELECTION)
+        """Retrieve program selection from the draft"""
+        return EnrollmentSessionManager._get(request, 'program_selection')
     
     @staticmethod
     def get_recommendations(request):
         """
-        Retrieve program recommendations from session
+        Retrieve program recommendations from the draft
         
         Args:
             request: Django request object
-            
+        
         Returns:
             Dictionary containing recommendations or None
         """
-        return request.session.get(EnrollmentSessionManager.KEY_RECOMMENDATIONS)
+        return EnrollmentSessionManager._get(request, 'recommendations')
     
     @staticmethod
     def get_lrn(request):
-        """Get LRN from session"""
-        return request.session.get(EnrollmentSessionManager.KEY_LRN)
+        """Get LRN from the draft"""
+        return EnrollmentSessionManager._get(request, 'lrn')
     
     @staticmethod
     def get_all_session_data(request):
         """
-        Retrieve all enrollment data from session
+        Retrieve all enrollment data from the draft (one query)
         
         Returns:
-            dict: All session data
+            dict: All enrollment data, plus lrn and lrn_verified
         """
-        return {
-            'lrn': request.session.get(EnrollmentSessionManager.KEY_LRN),
-            'student_data': request.session.get(EnrollmentSessionManager.KEY_STUDENT_DATA),
-            'family_data': request.session.get(EnrollmentSessionManager.KEY_FAMILY_DATA),
-            'survey_data': request.session.get(EnrollmentSessionManager.KEY_SURVEY_DATA),
-            'academic_data': request.session.get(EnrollmentSessionManager.KEY_ACADEMIC_DATA),
-            'program_selection': request.session.get(EnrollmentSessionManager.KEY_PROGRAM_SELECTION),
-            'recommendations': request.session.get(EnrollmentSessionManager.KEY_RECOMMENDATIONS),
-        }
+        return EnrollmentSessionManager._load(request, 'lrn', 'lrn_verified', *EnrollmentDraft.SECTION_FIELDS)
+    
+    # ------------------------------------------------------------------
+    # Clear
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def clear_academic_data(request):
+        """Clear academic data from the draft"""
+        if EnrollmentSessionManager.get_draft_id(request):
+            EnrollmentSessionManager._save(request, academic_data=None)
     
     @staticmethod
     def clear_session_data(request):
-        """Clear all enrollment data from session"""
+        """Delete the draft and clear all enrollment keys from the session"""
+        draft_id = EnrollmentSessionManager.get_draft_id(request)
+        if draft_id:
+            EnrollmentDraft.objects.filter(pk=draft_id).delete()
+        
         keys_to_delete = [
-            key for key in request.session.keys() 
+            key for key in request.session.keys()
             if key.startswith(EnrollmentSessionManager.SESSION_KEY_PREFIX)
         ]
         for key in keys_to_delete:
             del request.session[key]
         request.session.modified = True
+        setattr(request, EnrollmentSessionManager.REQUEST_CACHE_ATTR, {})
+    
+    @staticmethod
+    def clear_all_enrollment_data(request):
+        """
+        Clear all enrollment-related data
+        Call this after successful enrollment submission
+        """
+        EnrollmentSessionManager.clear_session_data(request)
+        
+        # Legacy key
+        if 'academic_data' in request.session:
+            del request.session['academic_data']
+    
+    @staticmethod
+    def delete_stale_drafts(max_age=None, dry_run=False):
+        """
+        Delete drafts abandoned before they were submitted
+        
+        Args:
+            max_age: Drafts not updated for this many seconds are deleted
+                (default: SESSION_COOKIE_AGE, after which the session is gone)
+            dry_run: Only count them
+        
+        Returns:
+            Number of stale drafts
+        """
+        if max_age is None:
+            max_age = getattr(settings, 'SESSION_COOKIE_AGE', 1209600)
+        stale = EnrollmentDraft.objects.filter(
+            updated_at__lt=timezone.now() - timedelta(seconds=max_age)
+        )
+        if dry_run:
+            return stale.count()
+        return stale.delete()[0]
+    
+    # ------------------------------------------------------------------
+    # LRN verification and completion status
+    # ------------------------------------------------------------------
     
     @staticmethod
     def is_lrn_verified(request):
         """Check if LRN has been verified"""
-        return request.session.get(EnrollmentSessionManager.KEY_LRN_VERIFIED, False)
+        return bool(EnrollmentSessionManager._get(request, 'lrn_verified'))
     
     @staticmethod
     def set_lrn_verified(request, verified=True):
-        """Mark LRN as verified in session"""
-        request.session[EnrollmentSessionManager.KEY_LRN_VERIFIED] = verified
-        if verified:
-            request.session[f'{EnrollmentSessionManager.SESSION_KEY_PREFIX}verified_at'] = timezone.now().isoformat()
-        request.session.modified = True
+        """Mark LRN as verified in the draft"""
+        EnrollmentSessionManager._save(
+            request,
+            lrn_verified=verified,
+            lrn_verified_at=timezone.now() if verified else None,
+        )
     
     @staticmethod
     def is_all_forms_complete(request):
@@ -165,13 +295,11 @@ class EnrollmentSessionManager:
         Returns:
             bool: True if all forms completed
         """
-        return all([
-            request.session.get(EnrollmentSessionManager.KEY_STUDENT_DATA),
-            request.session.get(EnrollmentSessionManager.KEY_FAMILY_DATA),
-            request.session.get(EnrollmentSessionManager.KEY_SURVEY_DATA),
-            request.session.get(EnrollmentSessionManager.KEY_ACADEMIC_DATA),
-            request.session.get(EnrollmentSessionManager.KEY_PROGRAM_SELECTION),
-        ])
+        data = EnrollmentSessionManager._load(
+            request,
+            'student_data', 'family_data', 'survey_data', 'academic_data', 'program_selection',
+        )
+        return all(data.values())
     
     @staticmethod
     def get_completion_status(request):
@@ -181,71 +309,13 @@ class EnrollmentSessionManager:
         Returns:
             dict: Status of each form
         """
+        data = EnrollmentSessionManager._load(request, 'lrn_verified', *EnrollmentDraft.SECTION_FIELDS)
         return {
-            'lrn_verified': EnrollmentSessionManager.is_lrn_verified(request),
-            'student_data_complete': bool(request.session.get(EnrollmentSessionManager.KEY_STUDENT_DATA)),
-            'family_data_complete': bool(request.session.get(EnrollmentSessionManager.KEY_FAMILY_DATA)),
-            'survey_data_complete': bool(request.session.get(EnrollmentSessionManager.KEY_SURVEY_DATA)),
-            'academic_data_complete': bool(request.session.get(EnrollmentSessionManager.KEY_ACADEMIC_DATA)),
-            'program_selection_complete': bool(request.session.get(EnrollmentSessionManager.KEY_PROGRAM_SELECTION)),
+            'lrn_verified': bool(data['lrn_verified']),
+            'student_data_complete': bool(data['student_data']),
+            'family_data_complete': bool(data['family_data']),
+            'survey_data_complete': bool(data['survey_data']),
+            'academic_data_complete': bool(data['academic_data']),
+            'program_selection_complete': bool(data['program_selection']),
             'all_complete': EnrollmentSessionManager.is_all_forms_complete(request)
         }
-        
-# Add these methods to your existing EnrollmentSessionManager class
-
-    @staticmethod
-    def save_academic_data(request, academic_data):
-        """
-        Save academic data to session
-        
-        Args:
-            request: Django request object
-            academic_data: Dictionary containing academic information
-        """
-        request.session['academic_data'] = academic_data
-        request.session.modified = True
-
-    @staticmethod
-    def get_academic_data(request):
-        """
-        Retrieve academic data from session
-        
-        Args:
-            request: Django request object
-            
-        Returns:
-            Dictionary containing academic data or None
-        """
-        return request.session.get('academic_data', None)
-
-    @staticmethod
-    def clear_academic_data(request):
-        """Clear academic data from session"""
-        if 'academic_data' in request.session:
-            del request.session['academic_data']
-            request.session.modified = True
-    
-    @staticmethod
-    def clear_all_enrollment_data(request):
-        """
-        Clear all enrollment-related data from session
-        Call this after successful enrollment submission
-        """
-        keys_to_clear = [
-            EnrollmentSessionManager.KEY_LRN,
-            EnrollmentSessionManager.KEY_LRN_VERIFIED,
-            EnrollmentSessionManager.KEY_STUDENT_DATA,
-            EnrollmentSessionManager.KEY_FAMILY_DATA,
-            EnrollmentSessionManager.KEY_SURVEY_DATA,
-            EnrollmentSessionManager.KEY_ACADEMIC_DATA,
-            EnrollmentSessionManager.KEY_PROGRAM_SELECTION,
-            EnrollmentSessionManager.KEY_RECOMMENDATIONS,
-            f'{EnrollmentSessionManager.SESSION_KEY_PREFIX}verified_at',
-            'academic_data',  # Legacy key
-        ]
-        
-        for key in keys_to_clear:
-            if key in request.session:
-                del request.session[key]
-        
-        request.session.modified = True
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Tabular Export
+Streams rows as CSV or XLSX without building the file in memory
+
+Rows come from a generator (normally a queryset .iterator() over a
+server-side cursor) and are encoded chunk by chunk into a
+StreamingHttpResponse, so memory use does not grow with the row count and
+the header row is sent before the query has finished.
+
+XLSX is written with the standard library: a minimal SpreadsheetML
+workbook (one sheet, inline strings) zipped into an unseekable buffer that
+is drained as the zip grows.
+
+Names come from the public enrollment form, so CSV text cells starting
+with a formula character are prefixed with an apostrophe (Excel would
+otherwise run them). XLSX inline strings are never evaluated as formulas.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from django.http import StreamingHttpResponse
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Rows written between two yields of the XLSX stream
+XLSX_ROWS_PER_CHUNK = 500
+
+# Characters XML 1.0 does not allow
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_INVALID_SHEET_NAME_CHARS = re.compile(r'[\[\]:*?/\\]')
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+# Leading characters that make a spreadsheet treat a CSV cell as a formula
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name={sheet_name} sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+
+class _Echo:
+    """File-like object whose write() returns the data (for csv.writer)"""
+
+    def write(self, value):
+        return value
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, unseekable buffer emptied by drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(header, rows):
+    """
+    CSV lines for a header and rows
+
+    Starts with a UTF-8 BOM so Excel detects the encoding (names with ñ).
+    Text that would start a formula is prefixed with an apostrophe.
+
+    Args:
+        header: Column titles
+        rows: Iterable of row sequences
+
+    Yields:
+        str: One encoded line per row
+    """
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def _xlsx_cell(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_INVALID_XML_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(row):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>'
+
+
+def iter_xlsx(header, rows, sheet_name='Sheet1'):
+    """
+    XLSX file for a header and rows, in chunks
+
+    Args:
+        header: Column titles
+        rows: Iterable of row sequences
+        sheet_name: Worksheet title (cut to Excel's 31 characters)
+
+    Yields:
+        bytes: Parts of the zip file
+    """
+    sheet_name = _INVALID_SHEET_NAME_CHARS.sub('-', sheet_name)[:31] or 'Sheet1'
+    buffer = _ChunkBuffer()
+
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        archive.writestr('_rels/.rels', _ROOT_RELS_XML)
+        archive.writestr('xl/workbook.xml', _WORKBOOK_XML.format(sheet_name=quoteattr(sheet_name)))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write((_SHEET_START + _xlsx_row(header)).encode('utf-8'))
+            yield buffer.drain()
+
+            pending = []
+            for row in rows:
+                pending.append(_xlsx_row(row))
+                if len(pending) >= XLSX_ROWS_PER_CHUNK:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending = []
+                    yield buffer.drain()
+
+            sheet.write((''.join(pending) + _SHEET_END).encode('utf-8'))
+
+    yield buffer.drain()
+
+
+def streaming_export_response(file_format, filename, header, rows, sheet_name='Sheet1'):
+    """
+    StreamingHttpResponse with the rows as a CSV or XLSX attachment
+
+    Args:
+        file_format: 'csv' or 'xlsx' (see EXPORT_FORMATS)
+        filename: Download name without extension
+        header: Column titles
+        rows: Iterable of row sequences (consumed while streaming)
+        sheet_name: Worksheet title for XLSX
+
+    Returns:
+        StreamingHttpResponse
+    """
+    if file_format == 'xlsx':
+        content = iter_xlsx(header, rows, sheet_name)
+    else:
+        content = iter_csv(header, rows)
+
+    filename = _UNSAFE_FILENAME_CHARS.sub('_', filename)
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[file_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    # Keep proxies (e.g. nginx) from buffering the whole download
+    response['X-Accel-Buffering'] = 'no'
+    return response
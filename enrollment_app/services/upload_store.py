@@ -0,0 +1,338 @@
+"""
+Temporary Upload Store
+Holds wizard uploads (student photo, parent photo, report card) until the
+enrollment is submitted
+
+Files are content-addressed: the SHA-256 is computed while the upload is
+streamed to disk, and the file is stored as <aa>/<sha256><ext>. Uploading
+the same photo or report card again reuses the stored file instead of
+writing a new copy.
+
+Enrollment drafts reference files through their *_path keys. Files that no
+live draft (or pending OCR job) references are deleted by the
+cleanup_temp_uploads command once they are older than the TTL.
+
+Preview thumbnails are generated on first request and cached under
+.thumbs/<width>/ (they are garbage-collected like any other file and
+simply re-created when needed).
+
+On submission, link_into_storage() promotes a temp file into MEDIA_ROOT
+with a hard link, so finalizing costs the same for any file size.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# Draft keys that hold temp upload paths
+UPLOAD_PATH_KEYS = {
+    'student_data': ['student_photo_path'],
+    'family_data': ['parent_photo_path'],
+    'academic_data': ['report_card_path'],
+}
+
+INCOMING_DIR = '.incoming'
+THUMBNAIL_DIR = '.thumbs'
+STORED_NAME_RE = re.compile(r'^[0-9a-f]{64}(\.[A-Za-z0-9]{1,10})?$')
+
+# The copy fallback of link_into_storage() is reported once per process
+_link_fallback_reported = False
+
+
+class TempUploadStore:
+    """Content-addressed directory of temporary uploads"""
+
+    def __init__(self, directory, chunk_size=64 * 1024):
+        self.directory = str(directory)
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def _extension(filename):
+        extension = os.path.splitext(filename or '')[1].lower()
+        if not re.match(r'^\.[a-z0-9]{1,10}$', extension):
+            return ''
+        return extension
+
+    def path_for(self, name):
+        """
+        Absolute path of a stored file name (<sha256><ext>)
+
+        Legacy uuid names from the flat layout are resolved in the top directory.
+        Returns None for names that are not store file names.
+        """
+        name = os.path.basename(name or '')
+        if STORED_NAME_RE.match(name):
+            return os.path.join(self.directory, name[:2], name)
+        if name and not name.startswith('.'):
+            return os.path.join(self.directory, name)
+        return None
+
+    def thumbnail_path(self, name, width):
+        """Path of the cached JPEG thumbnail of a stored file"""
+        name = os.path.basename(name)
+        return os.path.join(self.directory, THUMBNAIL_DIR, str(int(width)), name[:2], f"{name}.jpg")
+
+    def get_thumbnail(self, name, width, quality=80):
+        """
+        Cached thumbnail of a stored image, created on first use
+
+        Args:
+            name: Stored file name
+            width: Maximum width and height in pixels
+            quality: JPEG quality
+
+        Returns:
+            Thumbnail path, or None when the file is missing or not an image
+        """
+        from PIL import Image, ImageOps, UnidentifiedImageError
+
+        source = self.path_for(name)
+        if not source or not os.path.exists(source):
+            return None
+
+        path = self.thumbnail_path(name, width)
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source):
+            return path
+
+        try:
+            with Image.open(source) as image:
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((width, width), Image.Resampling.LANCZOS)
+                if image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        image.save(f, format='JPEG', quality=quality, optimize=True)
+                    os.replace(temp_path, path)
+                except Exception:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+        except (UnidentifiedImageError, OSError):
+            return None
+
+        return path
+
+    def save(self, uploaded_file):
+        """
+        Stream an uploaded file into the store
+
+        Args:
+            uploaded_file: Django UploadedFile
+
+        Returns:
+            dict: path, name (<sha256><ext>, used in URLs), sha256, size, deduplicated
+        """
+        incoming = os.path.join(self.directory, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(fd, 'wb') as destination:
+                for chunk in uploaded_file.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    destination.write(chunk)
+                    size += len(chunk)
+
+            sha256 = digest.hexdigest()
+            name = f"{sha256}{self._extension(uploaded_file.name)}"
+            path = self.path_for(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            deduplicated = os.path.exists(path)
+            if deduplicated:
+                # Same content already stored: keep it and refresh its age
+                os.remove(temp_path)
+                os.utime(path)
+            else:
+                os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return {
+            'path': path,
+            'name': name,
+            'sha256': sha256,
+            'size': size,
+            'deduplicated': deduplicated,
+        }
+
+    def iter_files(self):
+        """(path, size, mtime) of every stored file, including legacy and incoming ones"""
+        if not os.path.isdir(self.directory):
+            return
+        for root, _dirs, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def collect_garbage(self, referenced, ttl, dry_run=False):
+        """
+        Delete files that are not referenced and older than ttl seconds
+
+        Args:
+            referenced: Set of absolute paths still in use
+            ttl: Minimum age (seconds since last upload/reference) before deletion
+            dry_run: Only report what would be deleted
+
+        Returns:
+            dict: kept, kept_bytes, deleted, deleted_bytes
+        """
+        referenced = {os.path.abspath(path) for path in referenced}
+        cutoff = time.time() - ttl
+        stats = {'kept': 0, 'kept_bytes': 0, 'deleted': 0, 'deleted_bytes': 0}
+
+        for path, size, mtime in list(self.iter_files()):
+            if os.path.abspath(path) in referenced or mtime > cutoff:
+                stats['kept'] += 1
+                stats['kept_bytes'] += size
+                continue
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            stats['deleted'] += 1
+            stats['deleted_bytes'] += size
+
+        if not dry_run:
+            # Drop shard directories left empty
+            for root, dirs, _names in os.walk(self.directory, topdown=False):
+                for name in dirs:
+                    try:
+                        os.rmdir(os.path.join(root, name))
+                    except OSError:
+                        pass
+
+        return stats
+
+
+def get_referenced_upload_paths(draft_max_age=None):
+    """
+    Temp upload paths referenced by live drafts and unfinished OCR jobs
+
+    Args:
+        draft_max_age: Drafts not updated for this many seconds are considered
+            abandoned (default: SESSION_COOKIE_AGE)
+
+    Returns:
+        set of absolute paths
+    """
+    from ..models import EnrollmentDraft, OCRJob
+
+    if draft_max_age is None:
+        draft_max_age = getattr(settings, 'SESSION_COOKIE_AGE', 1209600)
+    since = timezone.now() - timedelta(seconds=draft_max_age)
+
+    referenced = set()
+    drafts = EnrollmentDraft.objects.filter(updated_at__gte=since).values_list(*UPLOAD_PATH_KEYS)
+    for sections in drafts.iterator(chunk_size=500):
+        for section, keys in zip(sections, UPLOAD_PATH_KEYS.values()):
+            for key in keys:
+                path = (section or {}).get(key)
+                if path:
+                    referenced.add(os.path.abspath(path))
+
+    jobs = OCRJob.objects.filter(status__in=['pending', 'processing']).values_list('image_path', flat=True)
+    referenced.update(os.path.abspath(path) for path in jobs if path)
+
+    return referenced
+
+
+def link_into_storage(temp_path, name, storage=None):
+    """
+    Promote a temp upload into media storage without copying its bytes
+
+    The temp file is hard-linked to its media name (it may still be shared
+    with other drafts, so it is not renamed away); cleanup_temp_uploads later
+    drops the temp link. Names are deterministic, so a retried submission
+    reuses the file it already linked.
+
+    Args:
+        temp_path: Absolute path in the temp upload store
+        name: Storage-relative name (e.g. 'student_photos/<lrn>_<sha>.jpg')
+        storage: Django storage (default: default_storage)
+
+    Returns:
+        The stored name, or None when the temp file no longer exists
+    """
+    storage = storage or default_storage
+
+    if not temp_path or not os.path.exists(temp_path):
+        return None
+
+    try:
+        target = storage.path(name)
+    except NotImplementedError:
+        # Remote storage: the bytes have to be uploaded
+        with open(temp_path, 'rb') as f:
+            return storage.save(name, File(f))
+
+    if os.path.exists(target):
+        return name
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(temp_path, target)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        # Temp dir and MEDIA_ROOT on different filesystems: copy, then rename into place
+        global _link_fallback_reported
+        if not _link_fallback_reported:
+            _link_fallback_reported = True
+            logger.warning("Hard link into media failed (%s); copying uploads instead", e)
+        else:
+            logger.debug("Hard link into media failed (%s); copying %s", e, temp_path)
+        fd, partial_path = tempfile.mkstemp(dir=os.path.dirname(target))
+        try:
+            with os.fdopen(fd, 'wb') as destination, open(temp_path, 'rb') as source:
+                while True:
+                    chunk = source.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    destination.write(chunk)
+            os.replace(partial_path, target)
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+    return name
+
+
+_default_store = None
+
+
+def get_temp_upload_store():
+    """The store configured in settings (TEMP_UPLOAD_DIR)"""
+    global _default_store
+
+    if _default_store is None:
+        _default_store = TempUploadStore(
+            directory=getattr(settings, 'TEMP_UPLOAD_DIR', os.path.join(settings.BASE_DIR, 'temp_uploads')),
+        )
+    return _default_store
@@ -0,0 +1,45 @@
+"""
+Signal handlers for enrollment_app
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from admin_app.models import SchoolYear, StaffMember, SystemSettings, UserProfile
+from .models import Student
+from .services.dashboard_cache import invalidate_dashboard_cache
+from .services.header_context import invalidate_school_year_header, invalidate_user_header
+from .services.landing_cache import invalidate_landing_page
+
+
+@receiver([post_save, post_delete], sender=SystemSettings, dispatch_uid='landing_page_system_settings')
+@receiver([post_save, post_delete], sender=StaffMember, dispatch_uid='landing_page_staff_member')
+def landing_page_content_changed(sender, **kwargs):
+    """Landing page content changed: drop the cached page"""
+    invalidate_landing_page()
+
+
+@receiver([post_save, post_delete], sender=Student, dispatch_uid='dashboard_student')
+@receiver([post_save, post_delete], sender=SchoolYear, dispatch_uid='dashboard_school_year')
+def dashboard_data_changed(sender, **kwargs):
+    """Enrollment status or active school year changed: drop cached dashboard payloads"""
+    invalidate_dashboard_cache()
+
+
+@receiver([post_save, post_delete], sender=SchoolYear, dispatch_uid='header_school_year')
+def header_school_year_changed(sender, **kwargs):
+    """Active school year may have changed: drop the cached header label"""
+    invalidate_school_year_header()
+
+
+@receiver([post_save, post_delete], sender=User, dispatch_uid='header_user')
+def header_user_changed(sender, instance, **kwargs):
+    """Name changed: drop the user's cached header context"""
+    invalidate_user_header(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserProfile, dispatch_uid='header_user_profile')
+def header_user_profile_changed(sender, instance, **kwargs):
+    """Role, program or photo changed: drop the user's cached header context"""
+    invalidate_user_header(instance.user_id)
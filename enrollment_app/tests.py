@@ -1,3 +1,260 @@
+import os
+import random
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.db.models.query import QuerySet
 from django.test import TestCase
+from django.utils import timezone
+
+from admin_app.management.commands.benchmark_ocr_parser import SAMPLE_TEXTS, legacy_parse
+
+from .models import OCRJob
+from .services.batch_recommendation_service import CohortArrays, generate_cohort_recommendations
+from .services.bulk_lrn_verification import LISSnapshot
+from .services.ocr_queue import claim_next_job
+from .services.ocr_service import OCRGradeVerifier
+from .services.recommendation_service import (
+    ProgramRecommendationEngine, generate_academic_recommendations
+)
+
+
+def make_applicant(rnd, index):
+    """Random (lrn, academic_data, survey_data, student_data) in the session format"""
+    engine = ProgramRecommendationEngine
+    academic_data = {
+        subject: rnd.choice(['', 0, rnd.choice([75, 84.9, 85, 88, 89, 90, 92, 95, 100]), str(rnd.randint(80, 100))])
+        for subject in engine.SUBJECT_FIELDS
+    }
+    entered = [float(value) for value in academic_data.values() if value not in ('', 0)]
+    academic_data['overall_average'] = rnd.choice([
+        round(sum(entered) / len(entered), 2) if entered else 0, 89, 89.5, 90, 95,
+    ])
+    academic_data['dost_exam_result'] = rnd.choice(['passed', 'Passed ', 'failed', '', 'not_taken'])
+
+    survey_data = {
+        field: rnd.choice([True, 'Yes', 'no', False, None, 'true'])
+        for field in list(engine.INTEREST_FIELDS) + list(engine.CHARACTERISTIC_FIELDS)
+    }
+    survey_data['interested_program'] = rnd.choice(['STE', 'science', 'Math', 'Language', 'tech', 'arts', '', 'Regular'])
+
+    student_data = {
+        'is_sped': rnd.random() < 0.2,
+        'is_working_student': rnd.random() < 0.2,
+    }
+    return f'{index:012d}', academic_data, survey_data, student_data
+
+
+class CompiledRulesParityTests(TestCase):
+    """The batch engine and the single-student engine evaluate the same compiled rules"""
+
+    def test_batch_matches_single_student_engine(self):
+        rnd = random.Random(20251)
+        applicants = [make_applicant(rnd, i) for i in range(500)]
+
+        batch = generate_cohort_recommendations(CohortArrays.from_records(applicants))
+
+        for applicant in applicants:
+            with self.subTest(lrn=applicant[0]):
+                single = generate_academic_recommendations(*applicant, use_cache=False)
+                self.assertEqual(batch[applicant[0]], single)
+
+        # The random cohort covers more than one top program
+        top_programs = {
+            summary['recommendations'][0]['program_code']
+            for summary in batch.values() if summary['recommendations']
+        }
+        self.assertGreater(len(top_programs), 1)
+
+    def test_fixed_scores_keep_int_type(self):
+        rnd = random.Random(7)
+        applicants = [make_applicant(rnd, i) for i in range(100)]
+        batch = generate_cohort_recommendations(CohortArrays.from_records(applicants))
+
+        for applicant in applicants:
+            single = generate_academic_recommendations(*applicant, use_cache=False)
+            batch_types = [
+                (type(rec['academic_score']), type(rec['non_academic_score']))
+                for rec in batch[applicant[0]].get('all_recommendations', [])
+            ]
+            single_types = [
+                (type(rec['academic_score']), type(rec['non_academic_score']))
+                for rec in single.get('all_recommendations', [])
+            ]
+            self.assertEqual(batch_types, single_types)
+
+
+class LISSnapshotTests(TestCase):
+    """Offline LRN membership checks against a snapshot"""
+
+    def setUp(self):
+        rnd = random.Random(5)
+        self.lis_lrns = {f'{rnd.randrange(10**11, 10**12):012d}' for _ in range(2000)}
+        self.snapshot = LISSnapshot(sorted(self.lis_lrns, reverse=True))
+
+    def test_contains_many_matches_set_membership(self):
+        rnd = random.Random(6)
+        queries = rnd.sample(sorted(self.lis_lrns), 200) + [
+            f'{rnd.randrange(10**11, 10**12):012d}' for _ in range(200)
+        ]
+        queries += ['000000000000', '999999999999', min(self.lis_lrns), max(self.lis_lrns)]
+        rnd.shuffle(queries)
+
+        result = self.snapshot.contains_many(queries).tolist()
+
+        self.assertEqual(result, [lrn in self.lis_lrns for lrn in queries])
+        self.assertEqual(result, [self.snapshot.contains(lrn) for lrn in queries])
+
+    def test_invalid_lrns_are_never_found(self):
+        lrn = min(self.lis_lrns)
+        queries = [lrn, lrn[:11], lrn + '0', 'abcdefghijkl', '', lrn]
+        self.assertEqual(
+            self.snapshot.contains_many(queries).tolist(),
+            [True, False, False, False, False, True],
+        )
+
+    def test_empty_inputs(self):
+        self.assertEqual(len(self.snapshot.contains_many([])), 0)
+        self.assertEqual(LISSnapshot([]).contains_many(['123456789012']).tolist(), [False])
+
+    def test_save_and_load_round_trip(self):
+        built_at = timezone.now()
+        snapshot = LISSnapshot(list(self.lis_lrns), built_at=built_at)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'lis_snapshot.npz')
+            snapshot.save(path)
+            loaded = LISSnapshot.load(path)
+
+        self.assertEqual(len(loaded), len(self.lis_lrns))
+        self.assertEqual(loaded.built_at, built_at)
+        self.assertTrue(loaded.contains_many(sorted(self.lis_lrns)).all())
+
+
+class ClaimNextJobTests(TestCase):
+    """Only one worker can claim an OCR job"""
+
+    def create_jobs(self, count):
+        return [
+            OCRJob.objects.create(student_lrn=f'{i:012d}', image_path=f'/tmp/card{i}.jpg', manual_grades={})
+            for i in range(count)
+        ]
+
+    def claim_while_racing(self, racing_worker):
+        """Claim for worker-a while racing_worker claims between its SELECT and UPDATE"""
+        real_update = QuerySet.update
+        raced = []
+
+        def update(queryset, **kwargs):
+            if not raced and kwargs.get('worker') == 'worker-a':
+                raced.append(claim_next_job(racing_worker))
+            return real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=update):
+            claimed = claim_next_job('worker-a')
+        return claimed, raced[0]
+
+    def test_each_job_is_claimed_once(self):
+        jobs = self.create_jobs(7)
+
+        claimed = [claim_next_job(f'worker-{i % 3}') for i in range(len(jobs))]
+
+        self.assertEqual([job.pk for job in claimed], [job.pk for job in jobs])
+        self.assertIsNone(claim_next_job('worker-x'))
+        self.assertFalse(OCRJob.objects.exclude(status='processing').exists())
+
+    def test_worker_losing_a_race_takes_the_next_job(self):
+        first, second = self.create_jobs(2)
+
+        claimed, raced = self.claim_while_racing('worker-b')
+
+        self.assertEqual(raced.pk, first.pk)
+        self.assertEqual(raced.worker, 'worker-b')
+        self.assertEqual(claimed.pk, second.pk)
+        self.assertEqual(claimed.worker, 'worker-a')
+
+    def test_expired_lease_is_reclaimed_once(self):
+        first, second = self.create_jobs(2)
+        OCRJob.objects.update(status='processing', worker='dead', started_at=timezone.now() - timedelta(hours=1))
+
+        claimed, raced = self.claim_while_racing('worker-b')
+
+        self.assertEqual((raced.pk, raced.attempts), (first.pk, 1))
+        self.assertEqual((claimed.pk, claimed.attempts), (second.pk, 1))
+        self.assertIsNone(claim_next_job('worker-c'))
+
+    def test_job_out_of_attempts_fails_when_lease_expires(self):
+        job, = self.create_jobs(1)
+        OCRJob.objects.update(status='processing', attempts=2, started_at=timezone.now() - timedelta(hours=1))
+
+        self.assertIsNone(claim_next_job('worker-a', max_attempts=3))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 3))
+
+    def test_running_job_is_not_reclaimed(self):
+        self.create_jobs(1)
+        claim_next_job('worker-a')
+
+        self.assertIsNone(claim_next_job('worker-b', lease_seconds=300))
+
+
+class SubjectMatcherTests(TestCase):
+    """The compiled matcher agrees with the previous per-line parser"""
+
+    def setUp(self):
+        self.matcher = OCRGradeVerifier.get_subject_matcher()
+
+    def parse_both(self, text):
+        return (
+            self.matcher.parse(text, 70, 100),
+            legacy_parse(text, OCRGradeVerifier.SUBJECT_ALIASES, 70, 100),
+        )
+
+    def test_sample_report_cards_match_legacy_parser(self):
+        # The first sample has 'EsP' and 'MAPEH' rows the old substring match
+        # gave to Araling Panlipunan ('ap' inside 'pagpapakatao' and 'mapeh')
+        for text in SAMPLE_TEXTS[1:]:
+            with self.subTest(text=text[:40]):
+                current, previous = self.parse_both(text)
+                self.assertEqual(current, previous)
+
+    def test_last_two_or_three_digit_number_is_the_grade(self):
+        lines = [
+            'Math 95 (Grade 6)',
+            'Science 90 Q4',
+            'English 88 1st sem',
+            'Math 95 3',
+            '95 Math',
+            'Filipino 80 82 83 85 83',
+            'Math 120\nMath 88',
+            'Math\n90',
+            'Science 89.5 Passed',
+        ]
+        for line in lines:
+            with self.subTest(line=line):
+                current, previous = self.parse_both(line)
+                self.assertEqual(current, previous)
+
+    def test_aliases_match_whole_words_only(self):
+        text = 'Edukasyon sa Pagpapakatao (EsP) 93\nMAPEH 95\nAP 85'
+        self.assertEqual(self.matcher.parse(text, 70, 100), {
+            'edukasyon_sa_pagpapakatao': 93.0,
+            'mapeh': 95.0,
+            'araling_panlipunan': 85.0,
+        })
+
+    def test_random_lines_match_legacy_parser(self):
+        rnd = random.Random(11)
+        labels = ['Math', 'Sci', 'English', 'Filipino', 'TLE', 'Social Studies', 'Attendance', 'Grade']
+        tokens = ['6', '1st', 'Q4', '(3)', '100', '75', '88.25', '101', '69', 'Passed', '2024-2025']
 
-# Create your tests here.
+        for _ in range(300):
+            text = '\n'.join(
+                ' '.join([rnd.choice(labels)] + rnd.sample(tokens, rnd.randint(0, 4)))
+                for _ in range(rnd.randint(1, 6))
+            )
+            with self.subTest(text=text):
+                current, previous = self.parse_both(text)
+                self.assertEqual(current, previous)
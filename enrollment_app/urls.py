@@ -10,6 +10,7 @@ from .views import (
     serve_temp_image,
     verify_grades_ajax,
     confirm_program_selection_ajax,
+    ocr_job_status_ajax,
 )
 
 app_name = 'enrollment_app'
@@ -32,4 +33,5 @@ urlpatterns = [
     path('temp-image/<str:filename>/', serve_temp_image, name='serve_temp_image'),
     path('verify-grades/', verify_grades_ajax, name='verify_grades_ajax'),
     path('confirm-program/', confirm_program_selection_ajax, name='confirm_program_ajax'),
+    path('ocr-status/', ocr_job_status_ajax, name='ocr_job_status_ajax'),
 ]
\ No newline at end of file
@@ -5,7 +5,7 @@ from .landingpage_view import landing_page, clear_session
 from .studentdata_view import student_data_form
 from .familydata_view import family_data_form
 from .studentnonacademic_view import non_academic_form
-from .studentacademic_view import academic_form, verify_grades_ajax, confirm_program_selection_ajax
+from .studentacademic_view import academic_form, verify_grades_ajax, confirm_program_selection_ajax, ocr_job_status_ajax
 from .sectionplacement_view import section_placement
 from .image_views import serve_temp_image
 
@@ -20,4 +20,5 @@ __all__ = [
     'serve_temp_image',
     'verify_grades_ajax',
     'confirm_program_selection_ajax',
+    'ocr_job_status_ajax',
 ]
\ No newline at end of file
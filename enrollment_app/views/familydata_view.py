@@ -1,10 +1,8 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.conf import settings
 from admin_app.models import SchoolYear
-import os
-import uuid
 from ..services.session_manager import EnrollmentSessionManager
+from ..services.upload_store import get_temp_upload_store
 
 def family_data_form(request):
     """
@@ -63,28 +61,20 @@ def family_data_form(request):
 
         # Preserve existing photo data from session
         family_data['parent_photo_path'] = existing_family_data.get('parent_photo_path', '')
+        family_data['parent_photo_file'] = existing_family_data.get('parent_photo_file', '')
         family_data['parent_photo_name'] = existing_family_data.get('parent_photo_name', '')
 
         # Handle parent photo upload (only update if new file uploaded)
         if 'parent_photo' in request.FILES:
             photo = request.FILES['parent_photo']
             
-            # Create temp directory if it doesn't exist
-            temp_dir = os.path.join(settings.BASE_DIR, 'temp_uploads')
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Generate unique filename
-            file_extension = os.path.splitext(photo.name)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            temp_file_path = os.path.join(temp_dir, unique_filename)
-            
-            # Save file to temp location
-            with open(temp_file_path, 'wb+') as destination:
-                for chunk in photo.chunks():
-                    destination.write(chunk)
+            # Stream into the content-addressed temp store (re-uploads reuse the stored file)
+            stored = get_temp_upload_store().save(photo)
+            temp_file_path = stored['path']
             
             # Store only file path and name in family data (NO base64)
             family_data['parent_photo_path'] = temp_file_path
+            family_data['parent_photo_file'] = stored['name']
             family_data['parent_photo_name'] = photo.name
         
         # Validate guardian selection
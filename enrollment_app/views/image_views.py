@@ -1,15 +1,137 @@
-from django.http import FileResponse, Http404
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from ..services.upload_store import get_temp_upload_store, STORED_NAME_RE
+import mimetypes
 import os
+import re
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 def serve_temp_image(request, filename):
     """
-    Serve temporary uploaded images from temp_uploads directory
+    Serve temporary uploaded images from the temp upload store
+
+    - ?w=<width> returns a cached JPEG thumbnail (widths in TEMP_IMAGE_THUMBNAIL_WIDTHS)
+    - ETag / Last-Modified validators, answered with 304 when unchanged
+    - Single byte ranges (206 / 416)
+    - With TEMP_UPLOAD_SENDFILE set to 'x-sendfile' or 'x-accel-redirect' the
+      body is handed off to the web server
     """
-    file_path = os.path.join(settings.BASE_DIR, 'temp_uploads', filename)
-    
-    if os.path.exists(file_path):
-        return FileResponse(open(file_path, 'rb'))
+    store = get_temp_upload_store()
+    file_path = store.path_for(filename)
+
+    if not file_path or not os.path.exists(file_path):
+        raise Http404("Image not found")
+
+    width = request.GET.get('w')
+    if width:
+        allowed_widths = getattr(settings, 'TEMP_IMAGE_THUMBNAIL_WIDTHS', [160, 320, 640])
+        if not width.isdigit() or int(width) not in allowed_widths:
+            raise Http404("Unsupported thumbnail size")
+        file_path = store.get_thumbnail(filename, int(width))
+        if not file_path:
+            raise Http404("Image not found")
+        content_type = 'image/jpeg'
+    else:
+        content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+
+    stat = os.stat(file_path)
+    name = os.path.basename(filename)
+    if STORED_NAME_RE.match(name):
+        # Content-addressed: the name is the hash of the bytes
+        etag = quote_etag(f"{name.split('.')[0]}-{width or 'full'}")
+    else:
+        etag = quote_etag(f"{int(stat.st_mtime)}-{stat.st_size}-{width or 'full'}")
+
+    # 304 Not Modified when the browser's copy is current
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        return _add_cache_headers(not_modified, name)
+
+    sendfile_mode = getattr(settings, 'TEMP_UPLOAD_SENDFILE', None)
+    if sendfile_mode:
+        response = _sendfile_response(sendfile_mode, file_path, store.directory)
+        response['Content-Type'] = content_type
+    else:
+        response = _file_response(request, file_path, stat.st_size, etag, content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return _add_cache_headers(response, name)
+
+
+def _add_cache_headers(response, name):
+    if STORED_NAME_RE.match(name):
+        patch_cache_control(response, private=True, max_age=365 * 24 * 3600, immutable=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _sendfile_response(mode, file_path, directory):
+    """Empty response telling the web server which file to send"""
+    response = HttpResponse()
+    if mode == 'x-accel-redirect':
+        # nginx: internal location mapped onto the temp upload directory
+        prefix = getattr(settings, 'TEMP_UPLOAD_ACCEL_PREFIX', '/protected/temp_uploads/')
+        relative = os.path.relpath(file_path, directory).replace(os.sep, '/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + relative
     else:
-        raise Http404("Image not found")
\ No newline at end of file
+        # Apache mod_xsendfile / lighttpd
+        response['X-Sendfile'] = file_path
+    return response
+
+
+def _file_response(request, file_path, size, etag, content_type):
+    """Whole file, or a 206/416 for a single byte range"""
+    range_header = request.META.get('HTTP_RANGE', '')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    match = RANGE_RE.match(range_header.strip())
+
+    if not match or (if_range and if_range != etag):
+        response = FileResponse(open(file_path, 'rb'), content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    elif end:
+        # Suffix range: the last N bytes
+        start = max(size - int(end), 0)
+        end = size - 1
+    else:
+        start = size
+
+    if start >= size or start > end:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        _read_range(file_path, start, length),
+        status=206,
+        content_type=content_type,
+    )
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _read_range(file_path, start, length):
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
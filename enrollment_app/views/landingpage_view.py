@@ -1,68 +1,34 @@
-from django.shortcuts import render, redirect
-from admin_app.models import SystemSettings, StaffMember
+from django.shortcuts import redirect
+from django.http import HttpResponse
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from ..services.landing_cache import get_landing_page
+from ..services.session_manager import EnrollmentSessionManager
 
 def landing_page(request):
     """
     Landing page with dynamic content from SystemSettings
+    Served from the landing page cache; answers 304 when the browser's copy is current
     """
-    # Fetch all settings
-    try:
-        settings_qs = SystemSettings.objects.all()
-        settings = {}
-        for setting in settings_qs:
-            settings[setting.setting_type] = {
-                'value': setting.setting_value,
-                'image_url': setting.image.url if setting.image else None
-            }
-    except Exception as e:
-        settings = {}
+    page = get_landing_page()
     
-    # Fetch active staff members
-    try:
-        staff_members = StaffMember.objects.filter(is_active=True).order_by('display_order', 'name')
-    except Exception:
-        staff_members = []
+    not_modified = get_conditional_response(
+        request,
+        etag=page['etag'],
+        last_modified=page['last_modified'],
+    )
+    if not_modified is not None:
+        response = not_modified
+    else:
+        response = HttpResponse(page['html'])
     
-    # Helper function to get setting value safely
-    def get_setting(key, default=''):
-        return settings.get(key, {}).get('value', default)
-    
-    def get_setting_image(key):
-        return settings.get(key, {}).get('image_url', None)
-    
-    context = {
-        # Header
-        'header_logo_school': get_setting_image('header_logo_school'),
-        'header_logo_region': get_setting_image('header_logo_region'),
-        'header_logo_peninsula': get_setting_image('header_logo_peninsula'),
-        'header_logo_matatag': get_setting_image('header_logo_matatag'),
-        'header_caption': get_setting('header_caption', '''
-            <h2 class="text-2xl font-bold mb-4">Welcome to Excellence in Education</h2>
-            <p class="text-lg">Empowering students to achieve their dreams through quality education and innovative programs</p>
-        '''),
-        
-        # Announcements
-        'announcement_image': get_setting_image('announcement_image'),
-        'announcement_caption': get_setting('announcement_caption', 'Stay updated with our latest announcements'),
-        
-        # Contact Information
-        'contact_address': get_setting('contact_address', 'R.T. Lim Boulevard Zamboanga City, Philippines'),
-        'contact_phone': get_setting('contact_phone', '+63 61 0086516'),
-        'contact_email': get_setting('contact_email', 'nationalhighschoolwest@gmail.com'),
-        'contact_facebook': get_setting('contact_facebook', 'https://web.facebook.com/znhs.west'),
-        'contact_hours': get_setting('contact_hours', '''Monday to Friday: 7:00 AM - 5:00 PM
-Saturday: 7:00 AM - 5:00 PM
-Sunday: Closed'''),
-        
-        # Footer
-        'footer_copyright': get_setting('footer_copyright', '© 2025 Zamboanga National High School West. All rights reserved.'),
-        
-        # Staff Members
-        'staff_members': staff_members,
-    }
-    
-    return render(request, 'enrollment_app/landing.html', context)
+    response['ETag'] = page['etag']
+    response['Last-Modified'] = http_date(page['last_modified'])
+    patch_cache_control(response, max_age=getattr(settings, 'LANDING_PAGE_BROWSER_MAX_AGE', 60))
+    return response
 
 def clear_session(request):
+    EnrollmentSessionManager.clear_session_data(request)
     request.session.clear()
     return redirect('enrollment_app:landing')
@@ -2,10 +2,8 @@ from django.shortcuts import render, redirect
 from django.contrib import messages
 from ..services.lrn_verification import LRNVerificationService
 from ..services.session_manager import EnrollmentSessionManager
+from ..services.upload_store import get_temp_upload_store
 from admin_app.models import SchoolYear
-import os
-import uuid
-from django.conf import settings
 
 
 def student_data_form(request):
@@ -55,28 +53,20 @@ def student_data_form(request):
         # Get existing photo data from session first
         existing_data = EnrollmentSessionManager.get_student_data(request) or {}
         form_data['student_photo_path'] = existing_data.get('student_photo_path', '')
+        form_data['student_photo_file'] = existing_data.get('student_photo_file', '')
         form_data['student_photo_name'] = existing_data.get('student_photo_name', '')
         
         # Handle file upload (store file temporarily) - only update if new file uploaded
         if 'student_photo' in request.FILES:
             photo = request.FILES['student_photo']
             
-            # Create temp directory if it doesn't exist
-            temp_dir = os.path.join(settings.BASE_DIR, 'temp_uploads')
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Generate unique filename
-            file_extension = os.path.splitext(photo.name)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            temp_file_path = os.path.join(temp_dir, unique_filename)
-            
-            # Save file to temp location
-            with open(temp_file_path, 'wb+') as destination:
-                for chunk in photo.chunks():
-                    destination.write(chunk)
+            # Stream into the content-addressed temp store (re-uploads reuse the stored file)
+            stored = get_temp_upload_store().save(photo)
+            temp_file_path = stored['path']
             
             # Store only file path and name in session (NO base64)
             form_data['student_photo_path'] = temp_file_path
+            form_data['student_photo_file'] = stored['name']
             form_data['student_photo_name'] = photo.name
         
         # Save to session
@@ -113,9 +113,6 @@ def non_academic_form(request):
                 'student_info': student_data
             })
         
-        # Save complete survey response as backup
-        survey_data['survey_responses_json'] = survey_data.copy()
-        
         # Save to session
         EnrollmentSessionManager.save_survey_data(request, survey_data)
         